@@ -32,6 +32,10 @@ from adapters.types import (
     AdapterStreamCompletion,
     AdapterStreamSyncCompletion,
     AdapterStreamAsyncCompletion,
+    AdapterRawResponse,
+    AdapterRawStream,
+    AdapterRawSyncStream,
+    AdapterRawAsyncStream,
     Provider,
     Vendor,
     ConversationRole,
@@ -76,6 +80,10 @@ __all__ = [
     "AdapterStreamCompletion",
     "AdapterStreamSyncCompletion",
     "AdapterStreamAsyncCompletion",
+    "AdapterRawResponse",
+    "AdapterRawStream",
+    "AdapterRawSyncStream",
+    "AdapterRawAsyncStream",
     "Provider",
     "Vendor",
     "ConversationRole",
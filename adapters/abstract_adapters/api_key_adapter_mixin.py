@@ -1,20 +1,14 @@
 from abc import abstractmethod
-import os
-from typing import List
+
+from adapters.api_key_scheduler import ApiKeyScheduler, get_api_key_scheduler
 
 
 class ApiKeyAdapterMixin:
     _api_key: str = ""
-    _api_keys: List[str] = []
-    _next_api_key = 0
+    _api_key_scheduler: ApiKeyScheduler
 
     def __init__(self) -> None:
-        api_keys = os.environ.get(f"{self.get_api_key_name()}_LIST", None)
-        if api_keys:
-            ApiKeyAdapterMixin._api_keys = api_keys.split(",")
-        else:
-            api_key = os.environ.get(self.get_api_key_name())
-            self._api_keys = [api_key] if api_key else []
+        self._api_key_scheduler = get_api_key_scheduler(self.get_api_key_name())
 
     @staticmethod
     @abstractmethod
@@ -43,12 +37,9 @@ class ApiKeyAdapterMixin:
 
         Returns:
             str: api key for the adapter if it exists, else the env default api key
+                with the most rate limit headroom
         """
 
-        if not self._api_key_was_set_by_user() and self._api_keys:
-            api_key = self._api_keys[self._next_api_key]
-            self._next_api_key += 1
-            if len(self._api_keys) == self._next_api_key:
-                self._next_api_key = 0
-            return api_key
+        if not self._api_key_was_set_by_user():
+            return self._api_key_scheduler.acquire() or ""
         return self._api_key
@@ -18,6 +18,9 @@ from adapters.types import (
 
 
 class BaseAdapter(ABC):
+    # Set on pooled adapters, which are shared between concurrent requests
+    _shared: bool = False
+
     def __str__(self) -> str:
         return f"adapter-{self.get_model().get_path()}"
 
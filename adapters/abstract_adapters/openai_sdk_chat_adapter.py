@@ -1,27 +1,54 @@
-from typing import Any, Callable
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Iterable,
+    Literal,
+    Optional,
+    overload,
+)
 
-from httpx import AsyncClient, Client, Limits, Timeout
 from openai import AsyncOpenAI, OpenAI
-from openai.types.chat import ChatCompletion
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
 from openai.types.completion import Completion
+from openai.types.completion_usage import CompletionUsage
 
 from adapters.abstract_adapters.sdk_chat_adapter import SDKChatAdapter
-from adapters.constants import (
-    HTTP_CONNECT_TIMEOUT,
-    HTTP_TIMEOUT,
-    MAX_CONNECTIONS_PER_PROCESS,
-    MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-)
 from adapters.types import (
     AdapterChatCompletion,
     AdapterChatCompletionChunk,
     AdapterCompletion,
     AdapterCompletionChunk,
+    AdapterException,
+    AdapterRawAsyncStream,
+    AdapterRawResponse,
+    AdapterRawSyncStream,
+    Conversation,
     ConversationRole,
     Cost,
+    Model,
     Turn,
 )
+from adapters.usage_scanner import UsageScanner, extract_usage
+
+
+def _is_empty_chunk(chunk: ChatCompletionChunk) -> bool:
+    if chunk.usage is not None:
+        return False
+    for choice in chunk.choices:
+        delta = choice.delta
+        if (
+            delta.content
+            or delta.tool_calls
+            or delta.function_call
+            or delta.refusal
+            or choice.finish_reason is not None
+            or choice.logprobs is not None
+        ):
+            return False
+    return True
 
 
 class OpenAISDKChatAdapter(SDKChatAdapter[OpenAI, AsyncOpenAI]):
@@ -37,18 +64,19 @@ class OpenAISDKChatAdapter(SDKChatAdapter[OpenAI, AsyncOpenAI]):
     def _call_async(self) -> Callable[..., Any]:
         return self._client_async.chat.completions.create
 
+    # Responses are returned unparsed, see execute_sync_raw
+    def _call_raw_sync(self) -> Callable[..., Any]:
+        return self._client_sync.chat.completions.with_streaming_response.create
+
+    def _call_raw_async(self) -> Callable[..., Any]:
+        return self._client_async.chat.completions.with_streaming_response.create
+
     def _create_client_sync(self, base_url: str, api_key: str) -> OpenAI:
         return OpenAI(
             base_url=base_url,
             api_key=api_key,
             max_retries=0,
-            http_client=Client(
-                limits=Limits(
-                    max_connections=MAX_CONNECTIONS_PER_PROCESS,
-                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-                ),
-                timeout=Timeout(timeout=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
-            ),
+            http_client=self._create_http_client_sync(base_url, api_key),
         )
 
     def _create_client_async(self, base_url: str, api_key: str) -> AsyncOpenAI:
@@ -56,13 +84,7 @@ class OpenAISDKChatAdapter(SDKChatAdapter[OpenAI, AsyncOpenAI]):
             base_url=base_url,
             api_key=api_key,
             max_retries=0,
-            http_client=AsyncClient(
-                limits=Limits(
-                    max_connections=MAX_CONNECTIONS_PER_PROCESS,
-                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-                ),
-                timeout=Timeout(timeout=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
-            ),
+            http_client=self._create_http_client_async(base_url, api_key),
         )
 
     def _extract_response(
@@ -70,75 +92,276 @@ class OpenAISDKChatAdapter(SDKChatAdapter[OpenAI, AsyncOpenAI]):
         request: dict[str, Any],
         response: ChatCompletion,
     ) -> AdapterChatCompletion:
-        prompt_tokens = response.usage.prompt_tokens if response.usage else 0
-        completion_tokens = response.usage.completion_tokens if response.usage else 0
-        reasoning_tokens = (
-            response.usage.completion_tokens_details.reasoning_tokens
-            if response.usage
-            and response.usage.completion_tokens_details
-            and response.usage.completion_tokens_details.reasoning_tokens
-            else 0
-        )
+        model = self.get_model()
+        usage = response.usage
 
-        cost = (
-            self.get_model().cost.prompt * prompt_tokens
-            + self.get_model().cost.completion * completion_tokens
-            + reasoning_tokens * completion_tokens
-            + self.get_model().cost.request
-        )
+        def get_token_counts() -> Cost:
+            return Cost(
+                prompt=usage.prompt_tokens if usage else 0,
+                completion=usage.completion_tokens if usage else 0,
+                request=model.cost.request,
+            )
 
-        return AdapterChatCompletion.model_construct(
-            **response.model_dump(),
-            cost=cost,
+        return AdapterChatCompletion.wrap(
+            response,
+            cost=lambda: self._get_cost(model, usage),
             # Deprecated
-            response=Turn(
+            response=lambda: Turn(
                 role=ConversationRole.assistant,
                 content=response.choices[0].message.content or "",
             ),
-            token_counts=Cost(
-                prompt=prompt_tokens,
-                completion=completion_tokens,
-                request=self.get_model().cost.request,
-            ),
+            token_counts=get_token_counts,
         )
 
     def _extract_stream_response(
         self, request: Any, response: ChatCompletionChunk, state: dict[str, Any]
-    ) -> AdapterChatCompletionChunk:
-        return AdapterChatCompletionChunk.model_construct(
-            **response.model_dump(),
+    ) -> Optional[AdapterChatCompletionChunk]:
+        usage = self._get_chunk_usage(response)
+
+        if state.get("drop_empty_chunks"):
+            if state.get("started") and usage is None and _is_empty_chunk(response):
+                return None
+            state["started"] = True
+
+        if usage is None:
+            return AdapterChatCompletionChunk.wrap(response)
+
+        model = self.get_model()
+        return AdapterChatCompletionChunk.wrap(
+            response,
+            usage=lambda: usage,
+            cost=lambda: self._get_cost(model, usage),
         )
 
+    def _get_chunk_usage(self, chunk: ChatCompletionChunk) -> Optional[CompletionUsage]:
+        # Usage of the stream, on its last chunk
+        return chunk.usage
+
     def _extract_completion_response(
         self,
         request: Any,
         response: Completion,
     ) -> AdapterCompletion:
-        prompt_tokens = response.usage.prompt_tokens if response.usage else 0
-        completion_tokens = response.usage.completion_tokens if response.usage else 0
+        model = self.get_model()
+        usage = response.usage
+
+        return AdapterCompletion.wrap(
+            response,
+            cost=lambda: self._get_cost(model, usage),
+        )
+
+    def _extract_completion_stream_response(
+        self, request: Any, response: Completion, state: dict[str, Any]
+    ) -> AdapterCompletionChunk:
+        return AdapterCompletionChunk.wrap(response)
+
+    @staticmethod
+    def _get_cost(model: Model, usage: Optional[CompletionUsage]) -> float:
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
         reasoning_tokens = (
-            response.usage.completion_tokens_details.reasoning_tokens
-            if response.usage
-            and response.usage.completion_tokens_details
-            and response.usage.completion_tokens_details.reasoning_tokens
+            usage.completion_tokens_details.reasoning_tokens
+            if usage
+            and usage.completion_tokens_details
+            and usage.completion_tokens_details.reasoning_tokens
             else 0
         )
 
-        cost = (
-            self.get_model().cost.prompt * prompt_tokens
-            + self.get_model().cost.completion * completion_tokens
+        return (
+            model.cost.prompt * prompt_tokens
+            + model.cost.completion * completion_tokens
             + reasoning_tokens * completion_tokens
-            + self.get_model().cost.request
+            + model.cost.request
         )
 
-        return AdapterCompletion.model_construct(
-            **response.model_dump(),
-            cost=cost,
+    def _get_raw_cost(
+        self, model: Model, usage: Optional[CompletionUsage]
+    ) -> Optional[float]:
+        # Without usage the cost is unknown, rather than only the request cost
+        return None if usage is None else self._get_cost(model, usage)
+
+    @staticmethod
+    def _get_raw_messages(
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+    ) -> list[ChatCompletionMessageParam]:
+        return list(
+            llm_input.convert_to_openai_format()
+            if isinstance(llm_input, Conversation)
+            else llm_input
         )
 
-    def _extract_completion_stream_response(
-        self, request: Any, response: Completion, state: dict[str, Any]
-    ) -> AdapterCompletionChunk:
-        return AdapterCompletionChunk.model_construct(
-            **response.model_dump(),
+    def _get_raw_params(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: bool,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        # Built as by execute_sync, so raw streams also carry usage
+        messages = self._downscale_images_sync(self._get_raw_messages(llm_input))
+
+        return {
+            "model": self.get_model()._get_api_path(),
+            **self._get_params(
+                messages, stream=stream, **self._with_stream_usage(stream, kwargs)
+            ),
+            **self._get_timeout_params(stream=stream),
+        }
+
+    async def _get_raw_params_async(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: bool,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        messages = await self._downscale_images_async(self._get_raw_messages(llm_input))
+
+        return {
+            "model": self.get_model()._get_api_path(),
+            **await self._get_params_async(
+                messages, stream=stream, **self._with_stream_usage(stream, kwargs)
+            ),
+            **self._get_timeout_params(stream=stream),
+        }
+
+    @overload
+    def execute_sync_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: Literal[False] = False,
+        **kwargs: Any,
+    ) -> AdapterRawResponse: ...
+
+    @overload
+    def execute_sync_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: Literal[True],
+        **kwargs: Any,
+    ) -> AdapterRawSyncStream: ...
+
+    def execute_sync_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> AdapterRawResponse | AdapterRawSyncStream:
+        """Executes a chat completion, returning the upstream body unparsed.
+
+        Requests are built as by execute_sync, the OpenAI compatible response body
+        or SSE bytes are returned as received, with the usage read from them and
+        the cost computed from it, both None if the provider sent no usage.
+        Streams not consumed to the end must be closed with close/aclose.
+
+        Args:
+            llm_input: messages or conversation
+            stream: whether to stream the response
+            kwargs: request parameters, as for execute_sync
+
+        Returns:
+            The response body, or a stream whose usage and cost are set once it
+            is consumed.
+        """
+        model = self.get_model()
+        params = self._get_raw_params(llm_input, stream, **kwargs)
+
+        if not stream:
+            with self._call_raw_sync()(**params) as response:
+                body = response.read()
+            usage = extract_usage(body)
+            return AdapterRawResponse(
+                body=body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                usage=usage,
+                cost=self._get_raw_cost(model, usage),
+            )
+
+        response = self._call_raw_sync()(**params).__enter__()
+
+        def stream_response() -> Generator[bytes, Any, None]:
+            scanner = UsageScanner()
+            try:
+                for chunk in response.iter_bytes():
+                    scanner.feed(chunk)
+                    yield chunk
+            except Exception as e:
+                raise AdapterException(f"Error in streaming response: {e}") from e
+            finally:
+                response.close()
+
+            raw_stream.usage = scanner.usage
+            raw_stream.cost = self._get_raw_cost(model, scanner.usage)
+
+        raw_stream = AdapterRawSyncStream(
+            response=stream_response(),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+        )
+        # The generator only closes the response once iterated
+        raw_stream._close_response = response.close
+        return raw_stream
+
+    @overload
+    async def execute_async_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: Literal[False] = False,
+        **kwargs: Any,
+    ) -> AdapterRawResponse: ...
+
+    @overload
+    async def execute_async_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: Literal[True],
+        **kwargs: Any,
+    ) -> AdapterRawAsyncStream: ...
+
+    async def execute_async_raw(
+        self,
+        llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> AdapterRawResponse | AdapterRawAsyncStream:
+        """Executes a chat completion, returning the upstream body unparsed.
+
+        See execute_sync_raw.
+        """
+        model = self.get_model()
+        params = await self._get_raw_params_async(llm_input, stream, **kwargs)
+
+        if not stream:
+            async with self._call_raw_async()(**params) as response:
+                body = await response.read()
+            usage = extract_usage(body)
+            return AdapterRawResponse(
+                body=body,
+                status_code=response.status_code,
+                headers=dict(response.headers),
+                usage=usage,
+                cost=self._get_raw_cost(model, usage),
+            )
+
+        response = await self._call_raw_async()(**params).__aenter__()
+
+        async def stream_response() -> AsyncGenerator[bytes, None]:
+            scanner = UsageScanner()
+            try:
+                async for chunk in response.iter_bytes():
+                    scanner.feed(chunk)
+                    yield chunk
+            except Exception as e:
+                raise AdapterException(f"Error in streaming response: {e}") from e
+            finally:
+                await response.close()
+
+            raw_stream.usage = scanner.usage
+            raw_stream.cost = self._get_raw_cost(model, scanner.usage)
+
+        raw_stream = AdapterRawAsyncStream(
+            response=stream_response(),
+            status_code=response.status_code,
+            headers=dict(response.headers),
         )
+        raw_stream._close_response = response.close
+        return raw_stream
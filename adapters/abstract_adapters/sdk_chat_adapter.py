@@ -1,5 +1,7 @@
 from abc import abstractmethod
+from contextlib import aclosing
 from typing import (
+    TYPE_CHECKING,
     Any,
     AsyncGenerator,
     Callable,
@@ -13,19 +15,39 @@ from typing import (
     overload,
 )
 
-from openai.types.chat import ChatCompletionMessageParam, ChatCompletionUserMessageParam
+from httpx import AsyncClient as HttpxAsyncClient, Client as HttpxClient, Response
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionMessageParam
 from openai import NOT_GIVEN, NotGiven
 
 from adapters.abstract_adapters.api_key_adapter_mixin import ApiKeyAdapterMixin
 from adapters.abstract_adapters.base_adapter import BaseAdapter
 from adapters.abstract_adapters.provider_adapter_mixin import ProviderAdapterMixin
+from adapters.api_key_scheduler import get_api_key_scheduler
+from adapters.batch_execution import (
+    BatchResult,
+    OnBatchProgress,
+    concurrency_limiters,
+    run_batch_async,
+    run_batch_sync,
+)
 from adapters.client_cache import client_cache
-from adapters.constants import OVERRIDE_ALL_BASE_URLS
+from adapters.constants import BATCH_MAX_CONCURRENCY, OVERRIDE_ALL_BASE_URLS
 from adapters.general_utils import (
-    EMPTY_CONTENT,
-    delete_none_values,
+    MESSAGE_PRUNE_SCHEMA,
+    REQUEST_PRUNE_SCHEMA,
+    prune_none_values,
     stream_generator_auto_close,
 )
+from adapters.image_processing import ImageLimits, image_processor
+from adapters.message_normalizer import MessageNormalizer
+from adapters.stream_coalescing import (
+    ChunkCoalescer,
+    StreamCoalescing,
+    coalesce_async,
+)
+from adapters.transport_config import TransportConfig, transport_configs
+from adapters.transport_pool import transport_pool
 from adapters.types import (
     AdapterChatCompletion,
     AdapterChatCompletionChunk,
@@ -36,13 +58,14 @@ from adapters.types import (
     AdapterStreamAsyncCompletion,
     AdapterStreamSyncChatCompletion,
     AdapterStreamSyncCompletion,
-    ContentType,
     Conversation,
-    ConversationRole,
     Model,
     ModelProperties,
 )
 
+if TYPE_CHECKING:
+    from adapters.batch_jobs import BatchAPI
+
 CLIENT_SYNC = TypeVar("CLIENT_SYNC")
 CLIENT_ASYNC = TypeVar("CLIENT_ASYNC")
 
@@ -53,8 +76,8 @@ class SDKChatAdapter(
     ProviderAdapterMixin,
     Generic[CLIENT_SYNC, CLIENT_ASYNC],
 ):
-    _client_sync: CLIENT_SYNC
-    _client_async: CLIENT_ASYNC
+    _client_api_key: str
+    _message_normalizer: Optional[tuple[Model, MessageNormalizer]] = None
 
     def __init__(
         self,
@@ -62,10 +85,13 @@ class SDKChatAdapter(
         super().__init__()
         self._setup_clients(self.get_api_key())
 
+    def _get_base_url(self) -> str:
+        return OVERRIDE_ALL_BASE_URLS or self.get_base_sdk_url()
+
     def _get_or_create_client(
         self, api_key: str, client_type: Literal["sync", "async"]
     ) -> Any:
-        base_url = OVERRIDE_ALL_BASE_URLS or self.get_base_sdk_url()
+        base_url = self._get_base_url()
         client = client_cache.get_client(base_url, api_key, client_type)
         if not client:
             client = getattr(self, f"_create_client_{client_type}")(
@@ -74,9 +100,78 @@ class SDKChatAdapter(
             client_cache.set_client(base_url, api_key, client_type, client)
         return client
 
+    def _get_provider_name(self) -> str:
+        # Provider names of models are not unique per adapter, api key names are
+        return self.get_api_key_name().removesuffix("_API_KEY").lower()
+
+    def _get_transport_config(self, per_model: bool = False) -> TransportConfig:
+        model_path = (
+            self._current_model.get_path()
+            if per_model and self._current_model
+            else None
+        )
+        return transport_configs.get_config(self._get_provider_name(), model_path)
+
+    def _get_timeout_params(self, stream: bool) -> dict[str, Any]:
+        # Timeouts are set per request, so they can differ between models
+        return {
+            "timeout": self._get_transport_config(per_model=True).get_timeout(stream)
+        }
+
+    def _create_http_client_sync(
+        self, base_url: str, api_key: str, **kwargs: Any
+    ) -> HttpxClient:
+        api_key_name = self.get_api_key_name()
+
+        def observe_response(response: Response) -> None:
+            get_api_key_scheduler(api_key_name).observe(
+                api_key, response.status_code, response.headers
+            )
+
+        return transport_pool.create_http_client_sync(
+            base_url,
+            config=self._get_transport_config(),
+            event_hooks={"response": [observe_response]},
+            **kwargs,
+        )
+
+    def _create_http_client_async(
+        self, base_url: str, api_key: str, **kwargs: Any
+    ) -> HttpxAsyncClient:
+        api_key_name = self.get_api_key_name()
+
+        async def observe_response(response: Response) -> None:
+            get_api_key_scheduler(api_key_name).observe(
+                api_key, response.status_code, response.headers
+            )
+
+        return transport_pool.create_http_client_async(
+            base_url,
+            config=self._get_transport_config(),
+            event_hooks={"response": [observe_response]},
+            **kwargs,
+        )
+
     def _setup_clients(self, api_key: str) -> None:
-        self._client_sync = self._get_or_create_client(api_key, "sync")
-        self._client_async = self._get_or_create_client(api_key, "async")
+        self._client_api_key = api_key
+        # Async clients are cached per event loop, so they are created on first use
+        self._get_or_create_client(api_key, "sync")
+
+    def _get_request_api_key(self) -> str:
+        # Unless set by the user, the env api key is picked per request
+        if self._api_key_was_set_by_user() or len(self._api_key_scheduler) < 2:
+            return self._client_api_key
+        return self._api_key_scheduler.acquire() or self._client_api_key
+
+    # Clients are looked up on every use rather than stored on the adapter, so
+    # long lived (e.g. pooled) adapters pick up a new client once theirs is evicted
+    @property
+    def _client_sync(self) -> CLIENT_SYNC:
+        return self._get_or_create_client(self._get_request_api_key(), "sync")  # type: ignore[no-any-return]
+
+    @property
+    def _client_async(self) -> CLIENT_ASYNC:
+        return self._get_or_create_client(self._get_request_api_key(), "async")  # type: ignore[no-any-return]
 
     @abstractmethod
     def _call_sync(self) -> Callable[..., Any]:
@@ -116,10 +211,12 @@ class SDKChatAdapter(
     ) -> AdapterCompletion:
         pass
 
+    # Returns None for events without content, finish reason, tool calls or usage
+    # when state["drop_empty_chunks"] is set, except for the first one
     @abstractmethod
     def _extract_stream_response(
         self, request: Any, response: Any, state: dict[str, Any]
-    ) -> AdapterChatCompletionChunk:
+    ) -> Optional[AdapterChatCompletionChunk]:
         pass
 
     @abstractmethod
@@ -128,9 +225,61 @@ class SDKChatAdapter(
     ) -> AdapterCompletionChunk:
         pass
 
+    def _get_stream_usage(
+        self, prompt_tokens: int, completion_tokens: int
+    ) -> tuple[CompletionUsage, float]:
+        """returns the usage and cost of a stream converted from another SDK
+
+        Args:
+            prompt_tokens: input tokens reported by the provider
+            completion_tokens: output tokens reported by the provider
+        """
+        cost = self.get_model().cost
+        return (
+            CompletionUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+            cost.prompt * prompt_tokens
+            + cost.completion * completion_tokens
+            + cost.request,
+        )
+
+    def _with_stream_usage(self, stream: Any, kwargs: dict[str, Any]) -> dict[str, Any]:
+        # Streams only report usage on their last chunk when asked to
+        if (
+            stream is True
+            and self.get_model().supports_stream_usage
+            and "stream_options" not in kwargs
+        ):
+            return {**kwargs, "stream_options": {"include_usage": True}}
+        return kwargs
+
     def _adjust_temperature(self, temperature: float) -> float:
         return temperature
 
+    def _get_image_limits(self, detail: str) -> Optional[ImageLimits]:
+        # Overridden by adapters of providers documenting the image sizes they use
+        return None
+
+    def _downscale_images_sync(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> list[ChatCompletionMessageParam]:
+        # Models without vision reject images when params are built
+        if not self.get_model().supports_vision:
+            return messages
+        return image_processor.downscale_messages_sync(messages, self._get_image_limits)
+
+    async def _downscale_images_async(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> list[ChatCompletionMessageParam]:
+        if not self.get_model().supports_vision:
+            return messages
+        return await image_processor.downscale_messages_async(
+            messages, self._get_image_limits
+        )
+
     # TODO: Add tests for exceptions
     def _verify(
         self, messages: list[ChatCompletionMessageParam], **kwargs: Any
@@ -171,25 +320,6 @@ class SDKChatAdapter(
             else:
                 raise AdapterException(f"n is not supported on {self.get_model().name}")
 
-        if not self.get_model().supports_json_content:
-            for message in messages:
-                if not isinstance(message["content"], str):
-                    raise AdapterException(
-                        f"JSON content is not supported on {self.get_model().name}"
-                    )
-
-        if not self.get_model().supports_vision:
-            for message in messages:
-                if not isinstance(message["content"], str) and message["content"]:
-                    for content in message["content"]:
-                        if (
-                            not isinstance(content, str)
-                            and content["type"] == ContentType.image_url.value
-                        ):
-                            raise AdapterException(
-                                f"Vision is not supported on {self.get_model().name}"
-                            )
-
         if (
             not self.get_model().supports_json_output
             and "response_format" in kwargs
@@ -219,159 +349,20 @@ class SDKChatAdapter(
             if not getattr(self.get_model(), attr_flag, False) and kwarg_key in kwargs:
                 del kwargs[kwarg_key]
 
-        return delete_none_values(kwargs)
+        # Unset parameters are dropped here, params assembled from them have none
+        return prune_none_values(kwargs, REQUEST_PRUNE_SCHEMA)  # type: ignore[no-any-return]
 
-    # TODO: Refactor this big method
     # TODO: Check if a "system" message is between two "user" messages
-    # pylint: disable=too-many-statements
     def _get_params(
         self, messages: list[ChatCompletionMessageParam], **kwargs: Any
     ) -> dict[str, Any]:
         self._verify(messages, **kwargs)
         kwargs = self._get_kwargs(**kwargs)
 
-        # Check if messages are empty
-        if len(messages) == 0:
-            messages.append(
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                )
-            )
-
-        # Convert empty string to EMPTY_CONTENT if not supported
-        if not self.get_model().can_empty_content:
-            for message in messages:
-                if (
-                    isinstance(message["content"], str)
-                    and message["content"].strip() == ""
-                ):
-                    message["content"] = EMPTY_CONTENT
-                elif isinstance(message["content"], list):
-                    for content in message["content"]:
-                        if (
-                            isinstance(content, dict)
-                            and "text" in content
-                            and content["text"].strip() == ""
-                        ):
-                            content["text"] = EMPTY_CONTENT
-
-        # Add empty user message if assistant only
-        if (
-            not self.get_model().can_assistant_only
-            and messages[0]["role"] == ConversationRole.assistant.value
-        ):
-            messages.append(
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                )
-            )
-
-        # Add empty user message if system only
-        if (
-            not self.get_model().can_system_only
-            and messages[0]["role"] == ConversationRole.system.value
-        ):
-            messages.append(
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                )
-            )
-
-        # Change system prompt roles to user if not supported
-        if not self.get_model().can_system_multiple:
-            for messageId, message in enumerate(messages[1:], start=1):
-                if message["role"] == ConversationRole.system.value:
-                    messages[messageId] = ChatCompletionUserMessageParam(
-                        role=ConversationRole.user.value, content=message["content"]
-                    )
-
-        # Change system prompt roles to user
-        if not self.get_model().can_system:
-            for messageId, message in enumerate(messages):
-                if message["role"] == ConversationRole.system.value:
-                    messages[messageId] = ChatCompletionUserMessageParam(
-                        role=ConversationRole.user.value, content=message["content"]
-                    )
-
-        # If the first message is assistant, insert an empty user message
-        if (
-            self.get_model().can_assistant_first is False
-            and messages[0]["role"] == ConversationRole.assistant.value
-        ):
-            messages.insert(
-                0,
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                ),
-            )
-
-        # If the last message is assistant, add an empty user message
-        if (
-            self.get_model().can_assistant_last is False
-            and messages[-1]["role"] == ConversationRole.assistant.value
-        ):
-            messages.append(
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                )
-            )
-
-        # If the last message is system, add an empty user message
-        if (
-            self.get_model().can_system_last is False
-            and messages[-1]["role"] == ConversationRole.system.value
-        ):
-            messages.append(
-                ChatCompletionUserMessageParam(
-                    role=ConversationRole.user.value, content=EMPTY_CONTENT
-                )
-            )
-
-        # Join messages from the same role
-        if not self.get_model().can_repeating_roles:
-            result: list[ChatCompletionMessageParam] = []
-            grouped_message: Optional[ChatCompletionMessageParam] = None
-
-            for message in messages:
-                if grouped_message and message["role"] == grouped_message["role"]:
-                    if isinstance(grouped_message["content"], str) and isinstance(
-                        message["content"], str
-                    ):
-                        grouped_message["content"] = (
-                            f"{grouped_message['content']}\n{message['content']}"
-                        )
-                    elif isinstance(grouped_message["content"], list) and isinstance(
-                        message["content"], list
-                    ):
-                        grouped_message["content"].extend(message["content"])
-                    elif isinstance(grouped_message["content"], list) and isinstance(
-                        message["content"], str
-                    ):
-                        grouped_message["content"].append(
-                            {"type": ContentType.text.value, "text": message["content"]}
-                        )
-                    elif isinstance(grouped_message["content"], str) and isinstance(
-                        message["content"], list
-                    ):
-                        grouped_message["content"] = [
-                            {
-                                "type": ContentType.text.value,
-                                "text": grouped_message["content"],
-                            }
-                        ]  # type: ignore
-                        grouped_message["content"].extend(message["content"])  # type: ignore
-                else:
-                    if grouped_message:
-                        result.append(grouped_message)
-                    grouped_message = message
-
-            if grouped_message:
-                result.append(grouped_message)
-
-            messages = result
+        messages = self._get_message_normalizer().normalize(messages)
 
         params: dict[str, Any] = {
-            "messages": messages,
+            "messages": prune_none_values(messages, MESSAGE_PRUNE_SCHEMA),
         }
 
         if kwargs.get("max_tokens") is not None:
@@ -393,6 +384,12 @@ class SDKChatAdapter(
 
         return params
 
+    async def _get_params_async(
+        self, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        # Overridden by adapters doing I/O to build their params, e.g. fetching images
+        return self._get_params(messages, **kwargs)
+
     def get_model(self) -> Model:
         if self._current_model is None:
             raise ValueError("Model is not set")
@@ -404,8 +401,27 @@ class SDKChatAdapter(
                 return model.properties
         raise ValueError(f"Model {model_name} not found")
 
+    def _get_message_normalizer(self) -> MessageNormalizer:
+        model = self.get_model()
+        if self._message_normalizer is None or self._message_normalizer[0] is not model:
+            self._message_normalizer = (model, MessageNormalizer(model))
+        return self._message_normalizer[1]
+
+    def _set_current_model(self, model: Model) -> None:
+        if self._shared:
+            raise AdapterException("Cannot change the model of a pooled adapter")
+        super()._set_current_model(model)
+        # Compiled once per model rather than on every request
+        self._message_normalizer = (model, MessageNormalizer(model))
+
     def set_api_key(self, api_key: str) -> None:
-        super().set_api_key(api_key)
+        if self._shared:
+            raise AdapterException(
+                "Cannot change the api key of a pooled adapter, "
+                "pass api_key to AdapterFactory.get_adapter_by_path instead"
+            )
+        # BaseAdapter.set_api_key comes first in the MRO and does not chain
+        ApiKeyAdapterMixin.set_api_key(self, api_key)
         self._setup_clients(api_key)
 
     @overload
@@ -421,6 +437,8 @@ class SDKChatAdapter(
         self,
         llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
         stream: Literal[True],
+        coalesce: Optional[StreamCoalescing] = None,
+        drop_empty_chunks: bool = False,
         **kwargs: Any,
     ) -> AdapterStreamAsyncChatCompletion: ...
 
@@ -428,6 +446,8 @@ class SDKChatAdapter(
         self,
         llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
         stream: Optional[Literal[False]] | Literal[True] | NotGiven = NOT_GIVEN,
+        coalesce: Optional[StreamCoalescing] = None,
+        drop_empty_chunks: bool = False,
         **kwargs: Any,
     ) -> AdapterChatCompletion | AdapterStreamAsyncChatCompletion:
         messages = list(
@@ -436,23 +456,51 @@ class SDKChatAdapter(
             else llm_input
         )
 
-        params = delete_none_values(self._get_params(messages, stream=stream, **kwargs))
+        messages = await self._downscale_images_async(messages)
+        params = await self._get_params_async(
+            messages, stream=stream, **self._with_stream_usage(stream, kwargs)
+        )
 
         response = await self._call_async()(
-            model=self.get_model()._get_api_path(), **params
+            model=self.get_model()._get_api_path(),
+            **params,
+            **self._get_timeout_params(stream=bool(stream)),
         )
 
         if not stream:
             return self._extract_response(request=llm_input, response=response)
 
+        coalescer = ChunkCoalescer(coalesce) if coalesce else None
+
         async def stream_response() -> AsyncGenerator[AdapterChatCompletionChunk, None]:
-            state: dict[str, Any] = {}
+            state: dict[str, Any] = {"drop_empty_chunks": drop_empty_chunks}
+
+            async def extract_chunks() -> (
+                AsyncGenerator[AdapterChatCompletionChunk, None]
+            ):
+                async for chunk in response:
+                    extracted = self._extract_stream_response(
+                        request=llm_input, response=chunk, state=state
+                    )
+                    if extracted is not None:
+                        yield extracted
+
             async with stream_generator_auto_close(response):
                 try:
-                    async for chunk in response:
-                        yield self._extract_stream_response(
-                            request=llm_input, response=chunk, state=state
-                        )
+                    if coalescer is None:
+                        async for extracted in extract_chunks():
+                            yield extracted
+                    else:
+                        # Closed in order, the chunk awaited last is cancelled
+                        # before the stream is closed
+                        async with aclosing(extract_chunks()) as chunks, aclosing(
+                            coalesce_async(chunks, coalescer)
+                        ) as coalesced_chunks:
+                            async for coalesced in coalesced_chunks:
+                                stream_completion.merged_chunks = (
+                                    coalescer.merged_chunks
+                                )
+                                yield coalesced
                 except Exception as e:
                     raise AdapterException(f"Error in streaming response: {e}") from e
                 finally:
@@ -461,7 +509,8 @@ class SDKChatAdapter(
                     # elif hasattr(response, "aclose"):  # For Cohere SDK
                     # await response.aclose()
 
-        return AdapterStreamAsyncChatCompletion(response=stream_response())
+        stream_completion = AdapterStreamAsyncChatCompletion(response=stream_response())
+        return stream_completion
 
     @overload
     def execute_sync(
@@ -476,6 +525,8 @@ class SDKChatAdapter(
         self,
         llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
         stream: Literal[True],
+        coalesce: Optional[StreamCoalescing] = None,
+        drop_empty_chunks: bool = False,
         **kwargs: Any,
     ) -> AdapterStreamSyncChatCompletion: ...
 
@@ -483,6 +534,8 @@ class SDKChatAdapter(
         self,
         llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
         stream: Optional[Literal[False]] | Literal[True] | NotGiven = NOT_GIVEN,
+        coalesce: Optional[StreamCoalescing] = None,
+        drop_empty_chunks: bool = False,
         **kwargs: Any,
     ) -> AdapterChatCompletion | AdapterStreamSyncChatCompletion:
         messages = list(
@@ -491,26 +544,145 @@ class SDKChatAdapter(
             else llm_input
         )
 
-        params = delete_none_values(self._get_params(messages, stream=stream, **kwargs))
+        messages = self._downscale_images_sync(messages)
+        params = self._get_params(
+            messages, stream=stream, **self._with_stream_usage(stream, kwargs)
+        )
 
-        response = self._call_sync()(model=self.get_model()._get_api_path(), **params)
+        response = self._call_sync()(
+            model=self.get_model()._get_api_path(),
+            **params,
+            **self._get_timeout_params(stream=bool(stream)),
+        )
 
         if not stream:
             return self._extract_response(request=llm_input, response=response)
 
+        coalescer = ChunkCoalescer(coalesce) if coalesce else None
+
         def stream_response() -> Generator[AdapterChatCompletionChunk, Any, None]:
-            state: dict[str, Any] = {}
+            state: dict[str, Any] = {"drop_empty_chunks": drop_empty_chunks}
             try:
                 for chunk in response:
-                    yield self._extract_stream_response(
+                    extracted = self._extract_stream_response(
                         request=llm_input, response=chunk, state=state
                     )
+                    if extracted is None:
+                        continue
+                    if coalescer is None:
+                        yield extracted
+                        continue
+                    for coalesced in coalescer.add(extracted):
+                        stream_completion.merged_chunks = coalescer.merged_chunks
+                        yield coalesced
+                if coalescer is not None:
+                    for coalesced in coalescer.flush():
+                        stream_completion.merged_chunks = coalescer.merged_chunks
+                        yield coalesced
             except Exception as e:
                 raise AdapterException(f"Error in streaming response: {e}") from e
             finally:
                 response.close()
 
-        return AdapterStreamSyncChatCompletion(response=stream_response())
+        stream_completion = AdapterStreamSyncChatCompletion(response=stream_response())
+        return stream_completion
+
+    def _get_batch_api(self) -> "BatchAPI":
+        # Overridden by adapters of providers with a batch API, see BatchJob
+        raise AdapterException(
+            f"Batch jobs are not supported by {self._get_provider_name()}"
+        )
+
+    def _get_batch_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        if kwargs.pop("stream", None):
+            raise AdapterException("Streaming is not supported in batches")
+        return kwargs
+
+    async def execute_batch_async(
+        self,
+        inputs: Iterable[Iterable[ChatCompletionMessageParam] | Conversation],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        return_exceptions: bool = False,
+        ordered: bool = False,
+        on_progress: Optional[OnBatchProgress] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[BatchResult[AdapterChatCompletion], None]:
+        """Executes chat completions of many inputs, with bounded concurrency.
+
+        At most max_concurrency inputs are executed at once, and no more than the
+        max_concurrency of the provider transport config (max_connections by
+        default) across every batch of the provider. Inputs are consumed as results
+        are, so they can be a generator of any length.
+
+        Args:
+            inputs: messages or conversations
+            max_concurrency: maximum inputs of this batch executed at once
+            return_exceptions: whether failed inputs are yielded with their
+                exception rather than raised, cancelling the batch
+            ordered: whether results are yielded in input order rather than as
+                they complete
+            on_progress: called with the progress of the batch on every result
+            kwargs: request parameters, as for execute_async, without stream
+
+        Returns:
+            Results with the index of their input
+        """
+        kwargs = self._get_batch_kwargs(kwargs)
+        limiter = concurrency_limiters.get_limiter_async(
+            self._get_provider_name(),
+            self._get_transport_config().get_max_concurrency(),
+        )
+
+        async def execute(
+            llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        ) -> AdapterChatCompletion:
+            return await self.execute_async(llm_input, stream=False, **kwargs)
+
+        async for result in run_batch_async(
+            execute,
+            inputs,
+            max_concurrency,
+            ordered=ordered,
+            return_exceptions=return_exceptions,
+            on_progress=on_progress,
+            limiter=limiter,
+        ):
+            yield result
+
+    def execute_batch_sync(
+        self,
+        inputs: Iterable[Iterable[ChatCompletionMessageParam] | Conversation],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        return_exceptions: bool = False,
+        ordered: bool = False,
+        on_progress: Optional[OnBatchProgress] = None,
+        **kwargs: Any,
+    ) -> Generator[BatchResult[AdapterChatCompletion], None, None]:
+        """Executes chat completions of many inputs in a thread pool, with bounded
+        concurrency.
+
+        See execute_batch_async.
+        """
+        kwargs = self._get_batch_kwargs(kwargs)
+        limiter = concurrency_limiters.get_limiter_sync(
+            self._get_provider_name(),
+            self._get_transport_config().get_max_concurrency(),
+        )
+
+        def execute(
+            llm_input: Iterable[ChatCompletionMessageParam] | Conversation,
+        ) -> AdapterChatCompletion:
+            return self.execute_sync(llm_input, stream=False, **kwargs)
+
+        yield from run_batch_sync(
+            execute,
+            inputs,
+            max_concurrency,
+            ordered=ordered,
+            return_exceptions=return_exceptions,
+            on_progress=on_progress,
+            limiter=limiter,
+        )
 
     @overload
     def execute_completion_sync(
@@ -539,6 +711,7 @@ class SDKChatAdapter(
             prompt=prompt,
             stream=stream,
             extra_body=self._get_kwargs(**kwargs),
+            **self._get_timeout_params(stream=bool(stream)),
         )
 
         if not stream:
@@ -585,6 +758,7 @@ class SDKChatAdapter(
             prompt=prompt,
             stream=stream,
             extra_body=self._get_kwargs(**kwargs),
+            **self._get_timeout_params(stream=bool(stream)),
         )
 
         if not stream:
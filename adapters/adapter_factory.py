@@ -1,67 +1,49 @@
-import inspect
+import importlib
 import os
-import sys
+from typing import Iterable, Mapping, Optional
 
-from adapters.abstract_adapters import BaseAdapter
+from adapters.abstract_adapters import BaseAdapter, SDKChatAdapter
 from adapters.abstract_adapters.provider_adapter_mixin import ProviderAdapterMixin
-from adapters.provider_adapters.anthropic_sdk_chat_provider_adapter import (
-    AnthropicSDKChatProviderAdapter,
-)
-from adapters.provider_adapters.gemini_sdk_chat_provider_adapter import (
-    GeminiSDKChatProviderAdapter,
-)
-from adapters.provider_adapters.openai_sdk_chat_provider_adapter import (
-    OpenAISDKChatProviderAdapter,
-)
+from adapters.adapter_pool import adapter_pool
+from adapters.model_index import ModelIndex, NameFilter
+from adapters.provider_manifest import PROVIDER_MANIFEST, ProviderManifestEntry
 from adapters.types import Model
+from adapters.warmup import WarmupTarget, warmup_async, warmup_sync
 
 
-class AdapterFactory:
-    @staticmethod
-    def _create_adapter_registry() -> dict[str, type[BaseAdapter]]:
-        adapters_classes: dict[str, type[BaseAdapter]] = {}
+def _get_manifest_models(entry: ProviderManifestEntry) -> list[Model]:
+    models: list[Model] = importlib.import_module(entry.models_module).MODELS
+    return models
 
-        for _, obj in inspect.getmembers(sys.modules["adapters.provider_adapters"]):
-            if (
-                inspect.isclass(obj)
-                and issubclass(obj, ProviderAdapterMixin)
-                and issubclass(obj, BaseAdapter)
-            ):
-                for model in obj.get_supported_models():
-                    adapters_classes[model.get_path()] = obj
 
-        for model in OpenAISDKChatProviderAdapter.get_supported_models():
-            adapters_classes[model.name] = OpenAISDKChatProviderAdapter
+class AdapterFactory:
+    @staticmethod
+    def _create_manifest_registry() -> dict[str, ProviderManifestEntry]:
+        manifest: dict[str, ProviderManifestEntry] = {}
 
-        for model in AnthropicSDKChatProviderAdapter.get_supported_models():
-            adapters_classes[model.name] = AnthropicSDKChatProviderAdapter
+        for entry in PROVIDER_MANIFEST:
+            for model in _get_manifest_models(entry):
+                manifest[model.get_path()] = entry
 
-        for model in GeminiSDKChatProviderAdapter.get_supported_models():
-            adapters_classes[model.name] = GeminiSDKChatProviderAdapter
+        for entry in PROVIDER_MANIFEST:
+            if entry.register_model_names:
+                for model in _get_manifest_models(entry):
+                    manifest[model.name] = entry
 
-        return adapters_classes
+        return manifest
 
     @staticmethod
     def _create_model_registry() -> dict[str, Model]:
         models: dict[str, Model] = {}
 
-        for _, obj in inspect.getmembers(sys.modules["adapters.provider_adapters"]):
-            if (
-                inspect.isclass(obj)
-                and issubclass(obj, ProviderAdapterMixin)
-                and issubclass(obj, BaseAdapter)
-            ):
-                for model in obj.get_supported_models():
-                    models[model.get_path()] = model
-
-        for model in OpenAISDKChatProviderAdapter.get_supported_models():
-            models[model.name] = model
+        for entry in PROVIDER_MANIFEST:
+            for model in _get_manifest_models(entry):
+                models[model.get_path()] = model
 
-        for model in AnthropicSDKChatProviderAdapter.get_supported_models():
-            models[model.name] = model
-
-        for model in GeminiSDKChatProviderAdapter.get_supported_models():
-            models[model.name] = model
+        for entry in PROVIDER_MANIFEST:
+            if entry.register_model_names:
+                for model in _get_manifest_models(entry):
+                    models[model.name] = model
 
         return models
 
@@ -69,28 +51,49 @@ class AdapterFactory:
     def _create_model_list() -> list[Model]:
         models: list[Model] = []
 
-        for _, obj in inspect.getmembers(sys.modules["adapters.provider_adapters"]):
-            if (
-                inspect.isclass(obj)
-                and issubclass(obj, ProviderAdapterMixin)
-                and issubclass(obj, BaseAdapter)
-            ):
-                for model in obj.get_supported_models():
-                    models.append(model)
+        for entry in PROVIDER_MANIFEST:
+            models.extend(_get_manifest_models(entry))
 
         return models
 
-    _adapter_registry = _create_adapter_registry()
+    _manifest_registry = _create_manifest_registry()
+    # Adapter classes are imported lazily, so provider SDKs are only loaded when used
+    _adapter_registry: dict[ProviderManifestEntry, type[BaseAdapter]] = {}
 
     _model_registry = _create_model_registry()
     _model_list = _create_model_list()
+    _model_index = ModelIndex(_model_list)
+
+    _disabled_models_env = ""
+    _disabled_models: frozenset[str] = frozenset({""})
+
+    @staticmethod
+    def _get_adapter_class(model_path: str) -> type[BaseAdapter] | None:
+        entry = AdapterFactory._manifest_registry.get(model_path)
+
+        if entry is None:
+            return None
+
+        adapter_class = AdapterFactory._adapter_registry.get(entry)
+        if adapter_class is None:
+            module = importlib.import_module(entry.adapter_module)
+            adapter_class = getattr(module, entry.adapter_class)
+            AdapterFactory._adapter_registry[entry] = adapter_class
+
+        return adapter_class
 
     @staticmethod
-    def get_adapter_by_path(model_path: str) -> BaseAdapter | None:
-        adapter_class = AdapterFactory._adapter_registry.get(model_path)
+    def _create_adapter(
+        model_path: str, api_key: Optional[str] = None
+    ) -> BaseAdapter | None:
         model = AdapterFactory._model_registry.get(model_path)
 
-        if adapter_class is None or model is None:
+        if model is None:
+            return None
+
+        adapter_class = AdapterFactory._get_adapter_class(model_path)
+
+        if adapter_class is None:
             return None
 
         adapter = adapter_class()
@@ -98,11 +101,95 @@ class AdapterFactory:
         if isinstance(adapter, ProviderAdapterMixin):
             adapter._set_current_model(model)
 
+        if api_key:
+            adapter.set_api_key(api_key)
+
         return adapter
 
+    @staticmethod
+    def get_adapter_by_path(
+        model_path: str, api_key: Optional[str] = None, pooled: bool = False
+    ) -> BaseAdapter | None:
+        """returns an adapter for the model path
+
+        Args:
+            model_path: model path, e.g. "openai/openai/gpt-4o"
+            api_key: api key to use instead of the env default
+            pooled: return a shared adapter from the pool instead of creating one.
+                Pooled adapters are safe to use concurrently, but their api key and
+                model cannot be changed.
+
+        Returns:
+            BaseAdapter | None: adapter, or None if the model path is unknown
+        """
+        if pooled:
+            return adapter_pool.get_or_create(
+                model_path,
+                api_key,
+                lambda: AdapterFactory._create_adapter(model_path, api_key),
+            )
+
+        return AdapterFactory._create_adapter(model_path, api_key)
+
+    @staticmethod
+    def _get_warmup_targets(model_paths: Iterable[str]) -> list[WarmupTarget]:
+        targets: list[WarmupTarget] = []
+
+        for model_path in model_paths:
+            # Creating the adapter also creates its cached clients
+            adapter = AdapterFactory._create_adapter(model_path)
+
+            if adapter is None:
+                raise ValueError(f"Unknown model path: {model_path}")
+
+            if isinstance(adapter, SDKChatAdapter):
+                targets.append(
+                    WarmupTarget(
+                        base_url=adapter._get_base_url(),
+                        config=adapter._get_transport_config(),
+                    )
+                )
+
+        return targets
+
+    @staticmethod
+    def warmup(
+        model_paths: Iterable[str], connections_per_host: int = 1
+    ) -> dict[str, float]:
+        """creates the clients of the models and opens keep-alive connections to
+        their hosts ahead of traffic
+
+        Args:
+            model_paths: model paths, e.g. ["openai/openai/gpt-4o"]
+            connections_per_host: number of connections to open to each host
+
+        Returns:
+            dict[str, float]: seconds spent warming up each host, by host name
+        """
+        return warmup_sync(
+            AdapterFactory._get_warmup_targets(model_paths), connections_per_host
+        )
+
+    @staticmethod
+    async def warmup_async(
+        model_paths: Iterable[str], connections_per_host: int = 1
+    ) -> dict[str, float]:
+        """async variant of `warmup`, warming up the connections used by async calls
+
+        Args:
+            model_paths: model paths, e.g. ["openai/openai/gpt-4o"]
+            connections_per_host: number of connections to open to each host
+
+        Returns:
+            dict[str, float]: seconds spent warming up each host, by host name
+        """
+        return await warmup_async(
+            AdapterFactory._get_warmup_targets(model_paths), connections_per_host
+        )
+
     @staticmethod
     def get_adapter(model: Model) -> BaseAdapter | None:
-        adapter_class = AdapterFactory._adapter_registry.get(model.get_path())
+        adapter_class = AdapterFactory._get_adapter_class(model.get_path())
 
         if adapter_class is None:
             return None
@@ -118,7 +205,17 @@ class AdapterFactory:
     def get_model_by_path(model_path: str) -> Model | None:
         return AdapterFactory._model_registry.get(model_path)
 
-    # TODO: add more supports filtering
+    @staticmethod
+    def _get_disabled_models() -> frozenset[str]:
+        disabled_models = os.getenv("ADAPTER_DISABLED_MODELS", "")
+
+        # Only re-split the env variable when it changes
+        if disabled_models != AdapterFactory._disabled_models_env:
+            AdapterFactory._disabled_models = frozenset(disabled_models.split(","))
+            AdapterFactory._disabled_models_env = disabled_models
+
+        return AdapterFactory._disabled_models
+
     @staticmethod
     def get_supported_models(
         supports_streaming: bool = False,
@@ -128,21 +225,51 @@ class AdapterFactory:
         supports_n: bool = False,
         supports_json_output: bool = False,
         supports_json_content: bool = False,
+        *,
+        capabilities: Optional[Mapping[str, bool]] = None,
+        provider: NameFilter = None,
+        vendor: NameFilter = None,
+        min_context_length: Optional[int] = None,
+        max_context_length: Optional[int] = None,
     ) -> list[Model]:
-        disabled_models = os.getenv("ADAPTER_DISABLED_MODELS", "").split(",")
-
-        return [
-            model
-            for model in AdapterFactory._model_list
-            if (not supports_streaming or model.supports_streaming)
-            and (not supports_vision or model.supports_vision)
-            and (not supports_functions or model.supports_functions)
-            and (not supports_tools or model.supports_tools)
-            and (not supports_n or model.supports_n)
-            and (not supports_json_output or model.supports_json_output)
-            and (not supports_json_content or model.supports_json_content)
-            and model.name not in disabled_models
-        ]
+        """returns the supported models matching all the given filters
+
+        Args:
+            supports_*: only include models supporting the feature when True
+            capabilities: any `supports_*`/`can_*` model flag mapped to the
+                required value, e.g. {"can_system": True, "can_top_k": False}
+            provider: provider name or names to include
+            vendor: vendor name or names to include
+            min_context_length: minimum context length, inclusive
+            max_context_length: maximum context length, inclusive
+
+        Returns:
+            list[Model]: matching models, excluding ADAPTER_DISABLED_MODELS
+        """
+        required = {
+            flag: True
+            for flag, value in (
+                ("supports_streaming", supports_streaming),
+                ("supports_vision", supports_vision),
+                ("supports_functions", supports_functions),
+                ("supports_tools", supports_tools),
+                ("supports_n", supports_n),
+                ("supports_json_output", supports_json_output),
+                ("supports_json_content", supports_json_content),
+            )
+            if value
+        }
+
+        return list(
+            AdapterFactory._model_index.query(
+                capabilities={**required, **(capabilities or {})},
+                provider=provider,
+                vendor=vendor,
+                min_context_length=min_context_length,
+                max_context_length=max_context_length,
+                excluded_names=AdapterFactory._get_disabled_models(),
+            )
+        )
 
 
 __all__ = ["AdapterFactory"]
@@ -0,0 +1,59 @@
+from collections import OrderedDict
+import threading
+from typing import Callable, Optional
+
+from adapters.abstract_adapters.base_adapter import BaseAdapter
+from adapters.constants import ADAPTER_POOL_MAX_SIZE
+
+AdapterPoolKey = tuple[str, Optional[str]]
+
+
+class AdapterPool:
+    """Thread safe LRU pool of shared adapter instances keyed by (model path, api key).
+
+    Pooled adapters are shared between concurrent requests, so they are marked as
+    shared and refuse changes to their api key or model.
+    """
+
+    def __init__(self, max_size: int = ADAPTER_POOL_MAX_SIZE) -> None:
+        self._max_size = max_size
+        self._adapters: OrderedDict[AdapterPoolKey, BaseAdapter] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(
+        self,
+        model_path: str,
+        api_key: Optional[str],
+        create_adapter: Callable[[], Optional[BaseAdapter]],
+    ) -> Optional[BaseAdapter]:
+        key = (model_path, api_key)
+
+        with self._lock:
+            adapter = self._adapters.get(key)
+            if adapter is not None:
+                self._adapters.move_to_end(key)
+                return adapter
+
+        # Create outside of the lock, a concurrent duplicate is simply dropped
+        adapter = create_adapter()
+        if adapter is None:
+            return None
+        adapter._shared = True
+
+        with self._lock:
+            adapter = self._adapters.setdefault(key, adapter)
+            self._adapters.move_to_end(key)
+            while len(self._adapters) > self._max_size:
+                self._adapters.popitem(last=False)
+
+        return adapter
+
+    def clear(self) -> None:
+        with self._lock:
+            self._adapters.clear()
+
+    def __len__(self) -> int:
+        return len(self._adapters)
+
+
+adapter_pool = AdapterPool()
@@ -0,0 +1,253 @@
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import os
+import re
+import threading
+import time
+from typing import Mapping, NamedTuple, Optional
+
+from adapters.constants import API_KEY_COOLDOWN
+
+RATE_LIMIT_KINDS = ("requests", "tokens")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class WeightedApiKey(NamedTuple):
+    api_key: str
+    weight: float = 1.0
+
+
+def parse_weighted_api_key(value: str) -> WeightedApiKey:
+    """parses an api key with an optional weight suffix, e.g. "sk-123:2"
+
+    Args:
+        value: api key, optionally followed by ":<weight>"
+    """
+    value = value.strip()
+    api_key, separator, weight = value.rpartition(":")
+    if separator and api_key:
+        try:
+            parsed_weight = float(weight)
+        except ValueError:
+            pass
+        else:
+            if parsed_weight > 0:
+                return WeightedApiKey(api_key, parsed_weight)
+    return WeightedApiKey(value)
+
+
+def _parse_seconds(value: Optional[str], now: float) -> Optional[float]:
+    """parses a delay in seconds from a retry-after or rate limit reset header
+
+    Supports seconds ("20"), durations ("1m30s", "250ms"), HTTP dates and ISO
+    timestamps.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if parts and "".join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+    for parse in (datetime.fromisoformat, parsedate_to_datetime):
+        try:
+            return max(parse(value).timestamp() - now, 0.0)
+        except (TypeError, ValueError):
+            continue
+
+    return None
+
+
+def _get_rate_limit_header(
+    headers: Mapping[str, str], kind: str, field: str
+) -> Optional[str]:
+    # OpenAI style "x-ratelimit-remaining-requests" and
+    # Anthropic style "anthropic-ratelimit-requests-remaining"
+    return headers.get(f"x-ratelimit-{field}-{kind}") or headers.get(
+        f"anthropic-ratelimit-{kind}-{field}"
+    )
+
+
+class _ApiKeyState:
+    def __init__(self, weighted_api_key: WeightedApiKey) -> None:
+        self.api_key = weighted_api_key.api_key
+        self.weight = weighted_api_key.weight
+        # Fraction of the rate limit left, per kind, until the reset time
+        self.headroom: dict[str, tuple[float, float]] = {}
+        self.cooldown_until = 0.0
+        # Smooth weighted round robin counter
+        self.current = 0.0
+
+    def get_headroom(self, now: float) -> float:
+        headroom = 1.0
+        for kind, (fraction, reset_at) in list(self.headroom.items()):
+            if now >= reset_at:
+                del self.headroom[kind]
+            else:
+                headroom = min(headroom, fraction)
+        return headroom
+
+
+class ApiKeyScheduler:
+    """Spreads requests over api keys by weight and rate limit headroom.
+
+    Headroom is learned from the rate limit headers of responses, until their reset
+    time. Keys answering with 429 are put on cooldown. Thread and task safe.
+    """
+
+    def __init__(
+        self, api_keys: list[WeightedApiKey], cooldown: float = API_KEY_COOLDOWN
+    ) -> None:
+        self._states = {
+            weighted_api_key.api_key: _ApiKeyState(weighted_api_key)
+            for weighted_api_key in api_keys
+        }
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, api_key: object) -> bool:
+        return api_key in self._states
+
+    def acquire(self) -> Optional[str]:
+        """returns the api key to send the next request with
+
+        Returns:
+            Optional[str]: api key, or None if the scheduler has no keys
+        """
+        if not self._states:
+            return None
+
+        now = time.time()
+
+        with self._lock:
+            available = [
+                state for state in self._states.values() if state.cooldown_until <= now
+            ]
+
+            if not available:
+                # Every key is cooling down, use the one available first
+                state = min(self._states.values(), key=lambda s: s.cooldown_until)
+                return state.api_key
+
+            # Smooth weighted round robin over weight * headroom, so traffic is split
+            # in proportion to the quota left on each key
+            weights = [state.weight * state.get_headroom(now) for state in available]
+            if not any(weights):
+                weights = [state.weight for state in available]
+            total = sum(weights)
+
+            for state, weight in zip(available, weights):
+                state.current += weight
+            state = max(available, key=lambda state: state.current)
+            state.current -= total
+
+            return state.api_key
+
+    def observe(
+        self, api_key: str, status_code: int, headers: Mapping[str, str]
+    ) -> None:
+        """updates the state of a key from a response it received
+
+        Args:
+            api_key: api key the request was sent with
+            status_code: status code of the response
+            headers: headers of the response
+        """
+        state = self._states.get(api_key)
+        if state is None:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            for kind in RATE_LIMIT_KINDS:
+                remaining = _get_rate_limit_header(headers, kind, "remaining")
+                limit = _get_rate_limit_header(headers, kind, "limit")
+                if remaining is None:
+                    continue
+
+                try:
+                    remaining_value = float(remaining)
+                    limit_value = float(limit) if limit else 0.0
+                except ValueError:
+                    continue
+
+                if limit_value > 0:
+                    fraction = min(remaining_value / limit_value, 1.0)
+                else:
+                    fraction = 1.0 if remaining_value > 0 else 0.0
+
+                reset = _parse_seconds(
+                    _get_rate_limit_header(headers, kind, "reset"), now
+                )
+                reset_at = now + (reset if reset is not None else self._cooldown)
+                state.headroom[kind] = (fraction, reset_at)
+
+            if status_code == 429:
+                retry_after = _parse_seconds(headers.get("retry-after"), now)
+                retry_after_ms = headers.get("retry-after-ms")
+                if retry_after_ms:
+                    try:
+                        retry_after = float(retry_after_ms) / 1000
+                    except ValueError:
+                        pass
+
+                state.cooldown_until = now + (
+                    retry_after if retry_after is not None else self._cooldown
+                )
+
+
+_schedulers: dict[str, tuple[tuple[str, str], ApiKeyScheduler]] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_api_key_scheduler(api_key_name: str) -> ApiKeyScheduler:
+    """returns the shared scheduler of the api keys configured in the env
+
+    Keys are read from `<api_key_name>_LIST`, comma separated and optionally
+    weighted (e.g. "sk-1:3,sk-2"), or else from `<api_key_name>`.
+
+    Args:
+        api_key_name: api key env variable name, e.g. "OPENAI_API_KEY"
+    """
+    api_key_list = os.environ.get(f"{api_key_name}_LIST", "")
+    api_key = os.environ.get(api_key_name, "")
+
+    with _schedulers_lock:
+        cached = _schedulers.get(api_key_name)
+
+        # Rebuilt when the env changes
+        if cached is None or cached[0] != (api_key_list, api_key):
+            if api_key_list:
+                api_keys = [
+                    parse_weighted_api_key(value)
+                    for value in api_key_list.split(",")
+                    if value.strip()
+                ]
+            else:
+                api_keys = [WeightedApiKey(api_key)] if api_key else []
+
+            cached = ((api_key_list, api_key), ApiKeyScheduler(api_keys))
+            _schedulers[api_key_name] = cached
+
+        return cached[1]
+
+
+__all__ = [
+    "ApiKeyScheduler",
+    "WeightedApiKey",
+    "get_api_key_scheduler",
+    "parse_weighted_api_key",
+]
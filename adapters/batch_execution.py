@@ -0,0 +1,277 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import threading
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Generator,
+    Generic,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Sized,
+    TypeVar,
+)
+import weakref
+
+T = TypeVar("T")
+
+
+class BatchResult(NamedTuple, Generic[T]):
+    # Position of the input in the batch
+    input_index: int
+    response: Optional[T]
+    exception: Optional[Exception]
+
+
+class BatchProgress(NamedTuple):
+    submitted: int
+    completed: int
+    failed: int
+    in_flight: int
+    # None for inputs of unknown length, e.g. generators
+    total: Optional[int]
+
+
+OnBatchProgress = Callable[[BatchProgress], None]
+
+
+class _BatchResults(Generic[T]):
+    """Tracks the progress of a batch and the order its results are returned in."""
+
+    def __init__(
+        self,
+        inputs: Iterable[Any],
+        max_concurrency: int,
+        ordered: bool,
+        return_exceptions: bool,
+        on_progress: Optional[OnBatchProgress],
+    ) -> None:
+        self._inputs = iter(inputs)
+        self._total = len(inputs) if isinstance(inputs, Sized) else None
+        self._max_concurrency = max_concurrency
+        self._ordered = ordered
+        self._return_exceptions = return_exceptions
+        self._on_progress = on_progress
+        # Results completed ahead of an earlier one, when ordered
+        self._buffer: dict[int, BatchResult[T]] = {}
+        self._next_index = 0
+        self._exhausted = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    def get_next_input(self, in_flight: int) -> Optional[tuple[int, Any]]:
+        # Inputs are only pulled once there is room for them, so results held back
+        # behind a slow one also count
+        if (
+            self._exhausted
+            or in_flight >= self._max_concurrency
+            or len(self._buffer) >= self._max_concurrency
+        ):
+            return None
+
+        try:
+            llm_input = next(self._inputs)
+        except StopIteration:
+            self._exhausted = True
+            return None
+
+        index = self.submitted
+        self.submitted += 1
+        return index, llm_input
+
+    def add(self, result: BatchResult[T], in_flight: int) -> list[BatchResult[T]]:
+        """returns the results to send once result is completed"""
+        if result.exception is not None:
+            if not self._return_exceptions:
+                raise result.exception
+            self.failed += 1
+        else:
+            self.completed += 1
+
+        if self._on_progress is not None:
+            self._on_progress(
+                BatchProgress(
+                    submitted=self.submitted,
+                    completed=self.completed,
+                    failed=self.failed,
+                    in_flight=in_flight,
+                    total=self._total,
+                )
+            )
+
+        if not self._ordered:
+            return [result]
+
+        self._buffer[result.input_index] = result
+        results = []
+        while self._next_index in self._buffer:
+            results.append(self._buffer.pop(self._next_index))
+            self._next_index += 1
+        return results
+
+
+async def run_batch_async(
+    execute: Callable[[Any], Awaitable[T]],
+    inputs: Iterable[Any],
+    max_concurrency: int,
+    ordered: bool = False,
+    return_exceptions: bool = False,
+    on_progress: Optional[OnBatchProgress] = None,
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> AsyncGenerator[BatchResult[T], None]:
+    """yields the results of execute on every input, as they complete or in order
+
+    At most max_concurrency inputs are executed at once, and inputs are only
+    consumed as results are, so inputs can be a generator of any length. Inputs in
+    flight are cancelled if the generator is closed early or an exception raised.
+
+    Args:
+        execute: coroutine function executing one input
+        inputs: inputs of the batch
+        max_concurrency: maximum inputs executed at once
+        ordered: whether results are yielded in input order rather than as they
+            complete
+        return_exceptions: whether exceptions are yielded as results rather than
+            raised
+        on_progress: called with the progress of the batch on every result
+        limiter: semaphore shared with other batches, e.g. of the same provider
+    """
+    results: _BatchResults[T] = _BatchResults(
+        inputs, max_concurrency, ordered, return_exceptions, on_progress
+    )
+
+    async def run(index: int, llm_input: Any) -> BatchResult[T]:
+        try:
+            if limiter is None:
+                return BatchResult(index, await execute(llm_input), None)
+            async with limiter:
+                return BatchResult(index, await execute(llm_input), None)
+        except Exception as e:  # pylint: disable=broad-except
+            return BatchResult(index, None, e)
+
+    pending: set[asyncio.Task[BatchResult[T]]] = set()
+    try:
+        while True:
+            while (next_input := results.get_next_input(len(pending))) is not None:
+                pending.add(asyncio.create_task(run(*next_input)))
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                for result in results.add(task.result(), len(pending)):
+                    yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def run_batch_sync(
+    execute: Callable[[Any], T],
+    inputs: Iterable[Any],
+    max_concurrency: int,
+    ordered: bool = False,
+    return_exceptions: bool = False,
+    on_progress: Optional[OnBatchProgress] = None,
+    limiter: Optional[threading.Semaphore] = None,
+) -> Generator[BatchResult[T], None, None]:
+    """yields the results of execute on every input, run in a thread pool, see
+    run_batch_async
+
+    Inputs not started yet are cancelled if the generator is closed early or an
+    exception raised, those in flight complete in the background.
+    """
+    results: _BatchResults[T] = _BatchResults(
+        inputs, max_concurrency, ordered, return_exceptions, on_progress
+    )
+
+    def run(index: int, llm_input: Any) -> BatchResult[T]:
+        try:
+            if limiter is None:
+                return BatchResult(index, execute(llm_input), None)
+            with limiter:
+                return BatchResult(index, execute(llm_input), None)
+        except Exception as e:  # pylint: disable=broad-except
+            return BatchResult(index, None, e)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="adapters-batch"
+    )
+    pending: set[Future[BatchResult[T]]] = set()
+    try:
+        while True:
+            while (next_input := results.get_next_input(len(pending))) is not None:
+                pending.add(executor.submit(run, *next_input))
+            if not pending:
+                return
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for result in results.add(future.result(), len(pending)):
+                    yield result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ConcurrencyLimiters:
+    """Semaphores capping the requests in flight per provider, shared by batches.
+
+    Async semaphores are bound to their event loop, so they are kept per running
+    loop. Limits are read when a provider is first seen.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._limiters_sync: dict[str, threading.Semaphore] = {}
+        # Semaphores waited on reference their loop, so they are dropped once their
+        # loop is closed rather than along with it, see TransportPool
+        self._limiters_async: dict[
+            weakref.ref[asyncio.AbstractEventLoop], dict[str, asyncio.Semaphore]
+        ] = {}
+
+    def get_limiter_sync(self, provider: str, limit: int) -> threading.Semaphore:
+        with self._lock:
+            limiter = self._limiters_sync.get(provider)
+            if limiter is None:
+                limiter = threading.Semaphore(limit)
+                self._limiters_sync[provider] = limiter
+            return limiter
+
+    def get_limiter_async(self, provider: str, limit: int) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._drop_closed_loops()
+            limiters = self._limiters_async.setdefault(weakref.ref(loop), {})
+            limiter = limiters.get(provider)
+            if limiter is None:
+                limiter = asyncio.Semaphore(limit)
+                limiters[provider] = limiter
+            return limiter
+
+    def _drop_closed_loops(self) -> None:
+        # Must hold the lock
+        for loop_ref in list(self._limiters_async):
+            loop = loop_ref()
+            if loop is None or loop.is_closed():
+                del self._limiters_async[loop_ref]
+
+
+concurrency_limiters = ConcurrencyLimiters()
+
+__all__ = [
+    "BatchProgress",
+    "BatchResult",
+    "ConcurrencyLimiters",
+    "OnBatchProgress",
+    "concurrency_limiters",
+    "run_batch_async",
+    "run_batch_sync",
+]
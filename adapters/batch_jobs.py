@@ -0,0 +1,519 @@
+from abc import ABC, abstractmethod
+import asyncio
+from enum import Enum
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generator,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Optional,
+)
+
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+from pydantic import BaseModel, ConfigDict
+from pydantic_core import to_jsonable_python
+
+from adapters.constants import BATCH_JOB_POLL_INTERVAL
+from adapters.types import AdapterChatCompletion, AdapterException, Conversation
+
+if TYPE_CHECKING:
+    from adapters.abstract_adapters.sdk_chat_adapter import SDKChatAdapter
+
+BatchInput = Iterable[ChatCompletionMessageParam] | Conversation
+
+# Results read between two checkpoint saves
+CHECKPOINT_INTERVAL = 100
+
+
+class BatchJobStatus(str, Enum):
+    in_progress = "in_progress"
+    cancelling = "cancelling"
+    # Ended, the results of the requests processed are available
+    completed = "completed"
+    cancelled = "cancelled"
+    expired = "expired"
+    failed = "failed"
+
+
+ENDED_BATCH_JOB_STATUSES = (
+    BatchJobStatus.completed,
+    BatchJobStatus.cancelled,
+    BatchJobStatus.expired,
+    BatchJobStatus.failed,
+)
+
+
+class BatchJobState(BaseModel):
+    status: BatchJobStatus
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    # Provider ids of the results, e.g. the OpenAI output and error files
+    results_ids: list[str] = []
+
+    @property
+    def is_ended(self) -> bool:
+        return self.status in ENDED_BATCH_JOB_STATUSES
+
+
+class BatchJobResult(NamedTuple):
+    custom_id: str
+    response: Optional[AdapterChatCompletion]
+    # Provider error of failed, cancelled or expired requests
+    error: Optional[str]
+
+
+class BatchJobCheckpoint(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_path: str
+    batch_id: str
+    state: BatchJobState
+    # Results already returned, by results id
+    results_read: dict[str, int] = {}
+
+
+def _get_messages(llm_input: BatchInput) -> list[ChatCompletionMessageParam]:
+    return list(
+        llm_input.convert_to_openai_format()
+        if isinstance(llm_input, Conversation)
+        else llm_input
+    )
+
+
+class BatchAPI(ABC):
+    """Batch endpoints of a provider, requests are built and responses extracted
+    by the adapter of the batch model."""
+
+    # Price of batch requests relative to the model cost
+    cost_factor: float = 1.0
+
+    def __init__(self, adapter: "SDKChatAdapter[Any, Any]") -> None:
+        self._adapter = adapter
+
+    def _get_client(self) -> Any:
+        # Batches belong to the api key that created them, so the key of the adapter
+        # is used rather than one picked per request
+        return self._adapter._get_or_create_client(
+            self._adapter._client_api_key, "sync"
+        )
+
+    def _get_params(
+        self, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        messages = self._adapter._downscale_images_sync(messages)
+        params = self._adapter._get_params(messages, **kwargs)
+        params.pop("stream", None)
+        return {
+            "model": self._adapter.get_model()._get_api_path(),
+            **to_jsonable_python(params),
+        }
+
+    def _extract_response(self, response: Any) -> AdapterChatCompletion:
+        completion = self._adapter._extract_response(request=None, response=response)
+        completion.cost = completion.cost * self.cost_factor
+        return completion
+
+    @abstractmethod
+    def get_request(
+        self, custom_id: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def submit(self, requests: Iterable[dict[str, Any]]) -> str:
+        pass
+
+    @abstractmethod
+    def get_state(self, batch_id: str) -> BatchJobState:
+        pass
+
+    @abstractmethod
+    def iter_results(self, results_id: str) -> Generator[str, None, None]:
+        pass
+
+    @abstractmethod
+    def extract_result(self, line: str) -> BatchJobResult:
+        pass
+
+    @abstractmethod
+    def cancel(self, batch_id: str) -> None:
+        pass
+
+
+OPENAI_BATCH_STATUSES = {
+    "validating": BatchJobStatus.in_progress,
+    "in_progress": BatchJobStatus.in_progress,
+    "finalizing": BatchJobStatus.in_progress,
+    "cancelling": BatchJobStatus.cancelling,
+    "completed": BatchJobStatus.completed,
+    "cancelled": BatchJobStatus.cancelled,
+    "expired": BatchJobStatus.expired,
+    "failed": BatchJobStatus.failed,
+}
+
+
+class OpenAIBatchAPI(BatchAPI):
+    """OpenAI batches, requests are uploaded as a JSONL file and results read from
+    the output and error files."""
+
+    # Batches are billed at half the price
+    cost_factor = 0.5
+
+    def get_request(
+        self, custom_id: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        params = self._get_params(messages, **kwargs)
+        # The SDK merges extra_body into the request body
+        extra_body = params.pop("extra_body", {})
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {**params, **extra_body},
+        }
+
+    def submit(self, requests: Iterable[dict[str, Any]]) -> str:
+        client = self._get_client()
+        # Requests are written to disk rather than held in memory
+        with tempfile.TemporaryFile() as file:
+            for request in requests:
+                file.write(json.dumps(request, separators=(",", ":")).encode("utf-8"))
+                file.write(b"\n")
+            file.seek(0)
+            input_file = client.files.create(
+                file=("batch.jsonl", file, "application/jsonl"), purpose="batch"
+            )
+
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return str(batch.id)
+
+    def get_state(self, batch_id: str) -> BatchJobState:
+        batch = self._get_client().batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return BatchJobState(
+            status=OPENAI_BATCH_STATUSES.get(batch.status, BatchJobStatus.in_progress),
+            total=counts.total if counts else 0,
+            succeeded=counts.completed if counts else 0,
+            failed=counts.failed if counts else 0,
+            results_ids=[
+                file_id
+                for file_id in (batch.output_file_id, batch.error_file_id)
+                if file_id
+            ],
+        )
+
+    def iter_results(self, results_id: str) -> Generator[str, None, None]:
+        with self._get_client().files.with_streaming_response.content(
+            results_id
+        ) as response:
+            yield from response.iter_lines()
+
+    def extract_result(self, line: str) -> BatchJobResult:
+        result = json.loads(line)
+        response = result.get("response") or {}
+        body = response.get("body") or {}
+
+        if result.get("error") or response.get("status_code") != 200:
+            error = result.get("error") or body.get("error") or body
+            return BatchJobResult(result["custom_id"], None, json.dumps(error))
+
+        completion = self._extract_response(ChatCompletion.model_validate(body))
+        return BatchJobResult(result["custom_id"], completion, None)
+
+    def cancel(self, batch_id: str) -> None:
+        self._get_client().batches.cancel(batch_id)
+
+
+ANTHROPIC_BATCH_STATUSES = {
+    "in_progress": BatchJobStatus.in_progress,
+    "canceling": BatchJobStatus.cancelling,
+    "ended": BatchJobStatus.completed,
+}
+
+
+class AnthropicBatchAPI(BatchAPI):
+    """Anthropic message batches, requests are sent inline and results read from
+    the results of the batch."""
+
+    # Batches are billed at half the price
+    cost_factor = 0.5
+    # Requests per batch accepted by Anthropic
+    max_requests = 100_000
+
+    def get_request(
+        self, custom_id: str, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        return {"custom_id": custom_id, "params": self._get_params(messages, **kwargs)}
+
+    def submit(self, requests: Iterable[dict[str, Any]]) -> str:
+        # Requests are sent inline in one body, so unlike OpenAI ones they are held
+        # in memory, no more than the batch limit before it is rejected
+        batch_requests = list(itertools.islice(requests, self.max_requests + 1))
+        if len(batch_requests) > self.max_requests:
+            raise AdapterException(
+                f"Anthropic batches are limited to {self.max_requests} requests"
+            )
+
+        batch = self._get_client().beta.messages.batches.create(requests=batch_requests)
+        return str(batch.id)
+
+    def get_state(self, batch_id: str) -> BatchJobState:
+        batch = self._get_client().beta.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        status = ANTHROPIC_BATCH_STATUSES.get(
+            batch.processing_status, BatchJobStatus.in_progress
+        )
+        if status == BatchJobStatus.completed and batch.cancel_initiated_at:
+            status = BatchJobStatus.cancelled
+
+        return BatchJobState(
+            status=status,
+            total=counts.processing
+            + counts.succeeded
+            + counts.errored
+            + counts.canceled
+            + counts.expired,
+            succeeded=counts.succeeded,
+            failed=counts.errored + counts.canceled + counts.expired,
+            results_ids=[batch.id] if batch.results_url else [],
+        )
+
+    def iter_results(self, results_id: str) -> Generator[str, None, None]:
+        # Lines are read from the streamed response rather than decoded by the SDK,
+        # as for OpenAI
+        response = self._get_client().beta.messages.batches.results(results_id)
+        assert response.http_response is not None
+        try:
+            yield from response.http_response.iter_lines()
+        finally:
+            response.http_response.close()
+
+    def extract_result(self, line: str) -> BatchJobResult:
+        result = json.loads(line)
+        outcome = result["result"]
+
+        if outcome["type"] != "succeeded":
+            error = outcome.get("error") or {"type": outcome["type"]}
+            return BatchJobResult(result["custom_id"], None, json.dumps(error))
+
+        # Imported here as provider SDKs are only loaded with their adapters
+        from anthropic.types import Message
+
+        completion = self._extract_response(Message.model_validate(outcome["message"]))
+        return BatchJobResult(result["custom_id"], completion, None)
+
+    def cancel(self, batch_id: str) -> None:
+        self._get_client().beta.messages.batches.cancel(batch_id)
+
+
+class BatchJob:
+    """A job of the batch API of a provider, for offline workloads at a discount.
+
+    Requests are built by the adapter of the model as for execute_sync, and results
+    extracted into AdapterChatCompletions. With a checkpoint path, the job and the
+    results already read are saved, so it can be resumed by another process.
+    """
+
+    def __init__(
+        self,
+        adapter: "SDKChatAdapter[Any, Any]",
+        checkpoint: BatchJobCheckpoint,
+        checkpoint_path: Optional[str] = None,
+    ) -> None:
+        self._adapter = adapter
+        self._api = adapter._get_batch_api()
+        self._checkpoint = checkpoint
+        self._checkpoint_path = checkpoint_path
+
+    @property
+    def batch_id(self) -> str:
+        return self._checkpoint.batch_id
+
+    @property
+    def state(self) -> BatchJobState:
+        return self._checkpoint.state
+
+    @classmethod
+    def submit(
+        cls,
+        adapter: "SDKChatAdapter[Any, Any]",
+        inputs: Mapping[str, BatchInput] | Iterable[BatchInput],
+        checkpoint_path: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "BatchJob":
+        """returns the job of the inputs, submitted to the batch API of the provider
+
+        If the checkpoint exists, the job it saved is resumed instead, so a process
+        restarted after submitting does not submit the inputs again.
+
+        Args:
+            adapter: adapter of the model
+            inputs: messages or conversations, by custom id, or in a sequence whose
+                indexes are used as custom ids
+            checkpoint_path: file the job is saved to
+            kwargs: request parameters, as for execute_sync, without stream
+        """
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            return cls.resume(checkpoint_path, adapter=adapter)
+
+        if kwargs.get("stream"):
+            raise AdapterException("Streaming is not supported in batches")
+
+        api = adapter._get_batch_api()
+        items = (
+            inputs.items()
+            if isinstance(inputs, Mapping)
+            else ((str(index), llm_input) for index, llm_input in enumerate(inputs))
+        )
+        batch_id = api.submit(
+            api.get_request(custom_id, _get_messages(llm_input), **kwargs)
+            for custom_id, llm_input in items
+        )
+
+        job = cls(
+            adapter,
+            BatchJobCheckpoint(
+                model_path=adapter.get_model().get_path(),
+                batch_id=batch_id,
+                state=BatchJobState(status=BatchJobStatus.in_progress),
+            ),
+            checkpoint_path,
+        )
+        job._save()
+        return job
+
+    @classmethod
+    def resume(
+        cls,
+        checkpoint_path: str,
+        api_key: Optional[str] = None,
+        adapter: Optional["SDKChatAdapter[Any, Any]"] = None,
+    ) -> "BatchJob":
+        """returns the job saved to a checkpoint
+
+        Args:
+            checkpoint_path: file the job was saved to
+            api_key: api key the job was submitted with, if not the env one
+            adapter: adapter to use, instead of one created for the model
+        """
+        with open(checkpoint_path, "r", encoding="utf-8") as file:
+            checkpoint = BatchJobCheckpoint.model_validate_json(file.read())
+
+        if adapter is None:
+            # Imported here as adapter modules import this one when loaded by the
+            # factory
+            from adapters.adapter_factory import AdapterFactory
+
+            adapter = AdapterFactory.get_adapter_by_path(  # type: ignore[assignment]
+                checkpoint.model_path, api_key=api_key
+            )
+            if adapter is None:
+                raise AdapterException(f"Model {checkpoint.model_path} not found")
+
+        return cls(adapter, checkpoint, checkpoint_path)
+
+    def _save(self) -> None:
+        if self._checkpoint_path is None:
+            return
+
+        # Written to a temporary file first, so a crash never leaves half a file
+        temporary_path = f"{self._checkpoint_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            file.write(self._checkpoint.model_dump_json())
+        os.replace(temporary_path, self._checkpoint_path)
+
+    def refresh(self) -> BatchJobState:
+        """returns the state of the job, fetched from the provider"""
+        if not self.state.is_ended:
+            self._checkpoint.state = self._api.get_state(self.batch_id)
+            self._save()
+        return self.state
+
+    def wait(
+        self,
+        poll_interval: float = BATCH_JOB_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> BatchJobState:
+        """returns the state of the job once it has ended
+
+        Args:
+            poll_interval: seconds between two state fetches
+            timeout: seconds to wait for, past which an AdapterException is raised
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.refresh().is_ended:
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise AdapterException(f"Batch {self.batch_id} has not ended yet")
+            time.sleep(poll_interval)
+        return self.state
+
+    async def wait_async(
+        self,
+        poll_interval: float = BATCH_JOB_POLL_INTERVAL,
+        timeout: Optional[float] = None,
+    ) -> BatchJobState:
+        """returns the state of the job once it has ended, see wait"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not (await asyncio.to_thread(self.refresh)).is_ended:
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                raise AdapterException(f"Batch {self.batch_id} has not ended yet")
+            await asyncio.sleep(poll_interval)
+        return self.state
+
+    def results(self) -> Generator[BatchJobResult, None, None]:
+        """yields the results of the job, once it has ended, streamed from the
+        provider
+
+        Results returned are saved to the checkpoint, a resumed job only yields
+        the following ones. The result being handled when a process stops is
+        yielded again on resume.
+        """
+        if not self.refresh().is_ended:
+            raise AdapterException(f"Batch {self.batch_id} has not ended yet")
+
+        results_read = self._checkpoint.results_read
+        try:
+            for results_id in self.state.results_ids:
+                skipped = results_read.get(results_id, 0)
+                for index, line in enumerate(self._api.iter_results(results_id)):
+                    if index < skipped or not line.strip():
+                        continue
+                    yield self._api.extract_result(line)
+
+                    results_read[results_id] = index + 1
+                    if (index + 1) % CHECKPOINT_INTERVAL == 0:
+                        self._save()
+        finally:
+            self._save()
+
+    def cancel(self) -> BatchJobState:
+        """returns the state of the job, once asked to be cancelled"""
+        self._api.cancel(self.batch_id)
+        self._checkpoint.state = self._api.get_state(self.batch_id)
+        self._save()
+        return self.state
+
+
+__all__ = [
+    "AnthropicBatchAPI",
+    "BatchAPI",
+    "BatchInput",
+    "BatchJob",
+    "BatchJobCheckpoint",
+    "BatchJobResult",
+    "BatchJobState",
+    "BatchJobStatus",
+    "OpenAIBatchAPI",
+]
@@ -0,0 +1,86 @@
+from typing import Any, Optional, TypeVar
+
+from openai.types import CompletionUsage
+from openai.types.chat.chat_completion_chunk import Choice as ChoiceChunk, ChoiceDelta
+from pydantic import BaseModel
+
+from adapters.types import AdapterChatCompletionChunk, ConversationRole
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _construct(
+    template: ModelT, fields: dict[str, Any], fields_set: set[str]
+) -> ModelT:
+    instance = template.__class__.__new__(template.__class__)
+    object.__setattr__(instance, "__dict__", fields)
+    object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+    for name in ("__pydantic_extra__", "__pydantic_private__"):
+        value = getattr(template, name)
+        object.__setattr__(instance, name, None if value is None else dict(value))
+    return instance
+
+
+class ChunkTemplate:
+    """Builds the chunks of a stream converted from another SDK's events.
+
+    The chunk, choice and delta are validated once per stream, chunks are then
+    built from their fields without validation, as the SDK has already parsed the
+    events. Only the content and finish reason differ between chunks.
+    """
+
+    def __init__(self, id: str, created: int, model: str) -> None:
+        self._chunk = AdapterChatCompletionChunk(
+            id=id,
+            choices=[
+                ChoiceChunk(
+                    index=0,
+                    delta=ChoiceDelta(
+                        role=ConversationRole.assistant.value, content=""
+                    ),
+                )
+            ],
+            created=created,
+            model=model,
+            object="chat.completion.chunk",
+        )
+        self._choice = self._chunk.choices[0]
+        self._delta = self._choice.delta
+
+    def create(
+        self,
+        content: str = "",
+        finish_reason: Optional[str] = None,
+        usage: Optional[CompletionUsage] = None,
+        cost: Optional[float] = None,
+    ) -> AdapterChatCompletionChunk:
+        """returns a chunk with a single choice
+
+        Args:
+            content: delta content
+            finish_reason: finish reason of the choice, a valid OpenAI finish reason
+            usage: usage of the stream, set on its final chunk
+            cost: cost of the stream, set with usage
+        """
+        delta = _construct(
+            self._delta,
+            {**self._delta.__dict__, "content": content},
+            set(self._delta.__pydantic_fields_set__),
+        )
+
+        choice_fields = {**self._choice.__dict__, "delta": delta}
+        choice_fields_set = set(self._choice.__pydantic_fields_set__)
+        if finish_reason is not None:
+            choice_fields["finish_reason"] = finish_reason
+            choice_fields_set.add("finish_reason")
+        choice = _construct(self._choice, choice_fields, choice_fields_set)
+
+        chunk_fields = {**self._chunk.__dict__, "choices": [choice]}
+        chunk_fields_set = set(self._chunk.__pydantic_fields_set__)
+        if usage is not None:
+            chunk_fields.update(usage=usage, cost=cost)
+            chunk_fields_set.update(("usage", "cost"))
+        return _construct(self._chunk, chunk_fields, chunk_fields_set)
+
+
+__all__ = ["ChunkTemplate"]
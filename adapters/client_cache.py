@@ -1,20 +1,264 @@
-from typing import Any, Dict, Literal
+import asyncio
+from collections import OrderedDict
+import inspect
+import threading
+import time
+from typing import Any, Coroutine, Literal, NamedTuple, Optional
+import weakref
+
+from adapters.constants import CLIENT_CACHE_MAX_SIZE, CLIENT_CACHE_TTL
+
+LoopRef = weakref.ref[asyncio.AbstractEventLoop]
+
+# Async clients are also keyed by the event loop running when they were created
+ClientCacheKey = tuple[str, str, Literal["sync", "async"], Optional[LoopRef]]
+
+
+class ClientCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class _ClientCacheEntry(NamedTuple):
+    client: Any
+    last_used: float
+
+
+def _get_running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _is_loop_gone(loop_ref: Optional[LoopRef]) -> bool:
+    if loop_ref is None:
+        return False
+    loop = loop_ref()
+    return loop is None or loop.is_closed()
+
+
+def _get_close_method(client: Any) -> Any:
+    # openai and anthropic clients close their http client themselves
+    close = getattr(client, "close", None)
+    if callable(close):
+        return close
+
+    # cohere clients only expose the underlying httpx client
+    httpx_client = getattr(
+        getattr(getattr(client, "_client_wrapper", None), "httpx_client", None),
+        "httpx_client",
+        None,
+    )
+    for name in ("aclose", "close"):
+        close = getattr(httpx_client, name, None)
+        if callable(close):
+            return close
+
+    return None
 
 
-# TODO: Add time based expiration if leaks connections or memory
 class ClientCache:
-    def __init__(self) -> None:
-        self._client_cache: Dict[str, Any] = {}
+    """Thread safe LRU cache of SDK clients, bounded by size and idle time.
+
+    Async clients are bound to the event loop they were created on, so they are
+    cached per running loop. Loops are only weakly referenced, clients of a loop that
+    is closed or garbage collected are dropped.
+
+    Evicted clients are closed so their connection pools are released.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CLIENT_CACHE_MAX_SIZE,
+        ttl: Optional[float] = CLIENT_CACHE_TTL,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._client_cache: OrderedDict[ClientCacheKey, _ClientCacheEntry] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._closing_tasks: set[asyncio.Task[Any]] = set()
+        # Set from weakref callbacks, which may run at any point, even while the
+        # lock is held, so the clients of collected loops are dropped later
+        self._loop_collected = False
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _on_loop_collected(self, _: LoopRef) -> None:
+        self._loop_collected = True
+
+    def _get_key(
+        self, base_url: str, api_key: str, mode: Literal["sync", "async"]
+    ) -> ClientCacheKey:
+        if mode == "sync":
+            return (base_url, api_key, mode, None)
+
+        loop = _get_running_loop()
+        loop_ref = weakref.ref(loop, self._on_loop_collected) if loop else None
+        return (base_url, api_key, mode, loop_ref)
+
+    def _is_expired(self, entry: _ClientCacheEntry, now: float) -> bool:
+        return self._ttl is not None and now - entry.last_used > self._ttl
+
+    def _drop_gone_loops(self) -> None:
+        # Must hold the lock. Clients of a gone loop cannot be closed anymore, their
+        # connections are released along with the loop.
+        self._loop_collected = False
+        for key in [key for key in self._client_cache if _is_loop_gone(key[3])]:
+            del self._client_cache[key]
+            self._evictions += 1
 
     def get_client(
         self, base_url: str, api_key: str, mode: Literal["sync", "async"]
     ) -> Any:
-        return self._client_cache.get(f"{base_url}-{api_key}-{mode}")
+        key = self._get_key(base_url, api_key, mode)
+        now = time.monotonic()
+        expired: Optional[_ClientCacheEntry] = None
+
+        with self._lock:
+            if self._loop_collected:
+                self._drop_gone_loops()
+
+            entry = self._client_cache.get(key)
+
+            if entry is not None and self._is_expired(entry, now):
+                expired = self._client_cache.pop(key)
+                self._evictions += 1
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._client_cache[key] = entry._replace(last_used=now)
+                self._client_cache.move_to_end(key)
+
+        if expired is not None:
+            self._close_client(expired.client, key[3])
+
+        return entry.client if entry is not None else None
 
     def set_client(
         self, base_url: str, api_key: str, mode: Literal["sync", "async"], client: Any
     ) -> None:
-        self._client_cache[f"{base_url}-{api_key}-{mode}"] = client
+        key = self._get_key(base_url, api_key, mode)
+        now = time.monotonic()
+        evicted: list[tuple[Any, Optional[LoopRef]]] = []
+
+        with self._lock:
+            if mode == "async" or self._loop_collected:
+                self._drop_gone_loops()
+
+            # A replaced client may still be in use by its caller, so it is not closed
+            self._client_cache.pop(key, None)
+            self._client_cache[key] = _ClientCacheEntry(client=client, last_used=now)
+
+            # Least recently used entries are first, so expired ones are too
+            while self._client_cache:
+                oldest_key, oldest = next(iter(self._client_cache.items()))
+                if (
+                    len(self._client_cache) <= self._max_size
+                    and not self._is_expired(oldest, now)
+                ) or oldest_key == key:
+                    break
+                del self._client_cache[oldest_key]
+                evicted.append((oldest.client, oldest_key[3]))
+
+            self._evictions += len(evicted)
+
+        for evicted_client, loop_ref in evicted:
+            self._close_client(evicted_client, loop_ref)
+
+    def get_stats(self) -> ClientCacheStats:
+        with self._lock:
+            return ClientCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._client_cache),
+            )
+
+    def _pop_all(self) -> list[tuple[Any, Optional[LoopRef]]]:
+        with self._lock:
+            clients = [
+                (entry.client, key[3]) for key, entry in self._client_cache.items()
+            ]
+            self._client_cache.clear()
+            return clients
+
+    def shutdown(self) -> None:
+        """closes every cached client and empties the cache
+
+        Async clients are closed on their event loop if it is running.
+        Use `ashutdown` from async code to wait for them to close.
+        """
+        for client, loop_ref in self._pop_all():
+            self._close_client(client, loop_ref)
+
+    async def ashutdown(self) -> None:
+        """closes every cached client, awaiting the async clients of the running
+        event loop, and empties the cache"""
+        loop = asyncio.get_running_loop()
+
+        for client, loop_ref in self._pop_all():
+            if loop_ref is None or loop_ref() is loop:
+                result = self._call_close(client)
+                if inspect.isawaitable(result):
+                    await result
+            else:
+                self._close_client(client, loop_ref)
+
+        if self._closing_tasks:
+            await asyncio.gather(*self._closing_tasks, return_exceptions=True)
+
+    @staticmethod
+    def _call_close(client: Any) -> Any:
+        close = _get_close_method(client)
+        if close is None:
+            return None
+        return close()
+
+    def _close_client(self, client: Any, loop_ref: Optional[LoopRef]) -> None:
+        if _is_loop_gone(loop_ref):
+            return
+
+        try:
+            result = self._call_close(client)
+        except Exception:  # pylint: disable=broad-except
+            return
+
+        if not inspect.isawaitable(result):
+            return
+
+        self._schedule_close(result, loop_ref() if loop_ref else None)  # type: ignore[arg-type]
+
+    def _schedule_close(
+        self,
+        coroutine: Coroutine[Any, Any, Any],
+        client_loop: Optional[asyncio.AbstractEventLoop],
+    ) -> None:
+        running_loop = _get_running_loop()
+
+        if running_loop is not None and client_loop in (None, running_loop):
+            task: asyncio.Task[Any] = running_loop.create_task(coroutine)
+            self._closing_tasks.add(task)
+            task.add_done_callback(self._closing_tasks.discard)
+        elif client_loop is not None and client_loop.is_running():
+            asyncio.run_coroutine_threadsafe(coroutine, client_loop)
+        elif client_loop is None:
+            try:
+                asyncio.run(coroutine)
+            except Exception:  # pylint: disable=broad-except
+                pass
+        else:
+            # The loop of the client is idle, its connections are released with it
+            coroutine.close()
 
 
 client_cache = ClientCache()
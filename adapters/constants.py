@@ -21,3 +21,50 @@ HTTP_TIMEOUT = float(
 HTTP_CONNECT_TIMEOUT = float(
     os.getenv("ADAPTERS_HTTP_CONNECT_TIMEOUT", os.getenv("HTTP_CONNECT_TIMEOUT", "5.0"))
 )
+
+# Maximum number of pooled adapters, see AdapterFactory.get_adapter_by_path(pooled=True)
+ADAPTER_POOL_MAX_SIZE = int(os.getenv("ADAPTERS_ADAPTER_POOL_MAX_SIZE", "1024"))
+
+# Client cache bounds. The TTL is an idle timeout and should stay above
+# ADAPTERS_HTTP_TIMEOUT so in-flight requests never lose their client.
+CLIENT_CACHE_MAX_SIZE = int(os.getenv("ADAPTERS_CLIENT_CACHE_MAX_SIZE", "512"))
+CLIENT_CACHE_TTL = float(os.getenv("ADAPTERS_CLIENT_CACHE_TTL", "3600.0"))
+
+# HTTP/2 for SDK clients: "1"/"true"/"all" for every provider, or a comma separated
+# list of providers (e.g. "openai,anthropic"). Requires the h2 package.
+HTTP2 = os.getenv("ADAPTERS_HTTP2", "")
+
+# Seconds an api key is left unused after a 429 without a retry-after header
+API_KEY_COOLDOWN = float(os.getenv("ADAPTERS_API_KEY_COOLDOWN", "60.0"))
+
+# Seconds an idle keep-alive connection is kept in the pool
+KEEPALIVE_EXPIRY = float(os.getenv("ADAPTERS_KEEPALIVE_EXPIRY", "5.0"))
+
+# JSON object of transport settings by provider name or model path, e.g.
+# {"groq": {"read_timeout": 30}, "openai/openai/gpt-4o": {"stream_idle_timeout": 20}}
+TRANSPORT_CONFIG = os.getenv("ADAPTERS_TRANSPORT_CONFIG", "")
+
+# Remote images of vision requests: total seconds and maximum size of each fetch, and
+# the number of images fetched at once per request
+IMAGE_FETCH_TIMEOUT = float(os.getenv("ADAPTERS_IMAGE_FETCH_TIMEOUT", "10.0"))
+IMAGE_MAX_BYTES = int(os.getenv("ADAPTERS_IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("ADAPTERS_IMAGE_FETCH_CONCURRENCY", "8"))
+
+# Resolved images are cached in memory up to IMAGE_CACHE_MAX_BYTES of base64 data,
+# and on disk in IMAGE_CACHE_DIR, if set, up to IMAGE_CACHE_DISK_MAX_BYTES
+IMAGE_CACHE_MAX_BYTES = int(
+    os.getenv("ADAPTERS_IMAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+IMAGE_CACHE_DIR = os.getenv("ADAPTERS_IMAGE_CACHE_DIR", "")
+IMAGE_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("ADAPTERS_IMAGE_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+
+# Threads downscaling the images of async vision requests
+IMAGE_PROCESSING_WORKERS = int(os.getenv("ADAPTERS_IMAGE_PROCESSING_WORKERS", "4"))
+
+# Inputs executed at once by a batch, see SDKChatAdapter.execute_batch_async
+BATCH_MAX_CONCURRENCY = int(os.getenv("ADAPTERS_BATCH_MAX_CONCURRENCY", "32"))
+
+# Seconds between two state fetches of a batch job waited for
+BATCH_JOB_POLL_INTERVAL = float(os.getenv("ADAPTERS_BATCH_JOB_POLL_INTERVAL", "30.0"))
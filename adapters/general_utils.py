@@ -1,9 +1,6 @@
-import base64
-import os
-from typing import Any
-
-import httpx
+from typing import Any, Mapping, Optional
 
+from adapters.image_resolver import image_resolver
 from adapters.types import Cost
 
 YUAN_TO_USD = 0.14
@@ -24,39 +21,67 @@ def delete_none_values(dictionary: dict[str, Any]) -> dict[str, Any]:
     return dictionary
 
 
+# Where None values are pruned from a request: the schema of a dict maps its keys to
+# the schemas of their values, or of the items of lists. Values of other keys, e.g.
+# the JSON schema of a tool or a base64 image, are never traversed.
+PruneSchema = Mapping[str, "PruneSchema"]
+
+MESSAGE_PRUNE_SCHEMA: PruneSchema = {
+    "content": {"image_url": {}},
+    "tool_calls": {"function": {}},
+    "function_call": {},
+}
+REQUEST_PRUNE_SCHEMA: PruneSchema = {
+    "messages": MESSAGE_PRUNE_SCHEMA,
+    "tools": {"function": {}},
+    "functions": {},
+    "tool_choice": {"function": {}},
+    "response_format": {"json_schema": {}},
+    "stream_options": {},
+}
+
+
+def prune_none_values(value: Any, schema: PruneSchema) -> Any:
+    """returns the value without None values, following the schema
+
+    Unlike delete_none_values, only the keys of the schema are traversed, and dicts
+    and lists are copied if they change rather than modified.
+
+    Args:
+        value: dict, or list of dicts
+        schema: keys to traverse, see PruneSchema
+    """
+    if isinstance(value, list):
+        pruned_items: Optional[list[Any]] = None
+        for index, item in enumerate(value):
+            pruned_item = prune_none_values(item, schema)
+            if pruned_item is not item:
+                if pruned_items is None:
+                    pruned_items = list(value)
+                pruned_items[index] = pruned_item
+        return value if pruned_items is None else pruned_items
+
+    if not isinstance(value, dict):
+        return value
+
+    pruned: Optional[dict[str, Any]] = None
+    for key, item in value.items():
+        if item is None:
+            if pruned is None:
+                pruned = dict(value)
+            del pruned[key]
+        elif key in schema:
+            pruned_item = prune_none_values(item, schema[key])
+            if pruned_item is not item:
+                if pruned is None:
+                    pruned = dict(value)
+                pruned[key] = pruned_item
+    return value if pruned is None else pruned
+
+
 def process_image_url_anthropic(image_url: str) -> dict[str, Any]:
-    httpx_client = httpx.Client()
-
-    if image_url.startswith("data:"):
-        media_type, _, base64_data = image_url.partition(";base64,")
-        media_type = media_type.split(":")[1]
-        return {
-            "type": "image",
-            "source": {
-                "type": "base64",
-                "media_type": media_type,
-                "data": base64_data,
-            },
-        }
-    else:
-        image_data = base64.b64encode(httpx_client.get(image_url).content).decode(
-            "utf-8"
-        )
-
-        _, extension = os.path.splitext(image_url)
-        extension = extension.lstrip(".").lower()
-        if extension == "jpg":
-            extension = "jpeg"
-        media_type = f"image/{extension}"
-
-        return {
-            "type": "image",
-            "source": {
-                "type": "base64",
-                "media_type": media_type,
-                "data": image_data,
-            },
-        }
+    # Remote images are fetched with the pooled client of the image resolver
+    return image_resolver.fetch_sync(image_url)
 
 
 def get_dynamic_cost(model_name: str, token_count: int) -> Cost:
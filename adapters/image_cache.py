@@ -0,0 +1,241 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+from typing import Any, NamedTuple, Optional
+
+from adapters.constants import (
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_DISK_MAX_BYTES,
+    IMAGE_CACHE_MAX_BYTES,
+)
+
+# Anthropic image content block, {"type": "image", "source": {...}}
+ImageBlock = dict[str, Any]
+
+
+class ImageCacheStats(NamedTuple):
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    size: int
+    bytes: int
+
+
+def get_image_cache_key(url: str, variant: str = "") -> str:
+    """returns the cache key of an image url, the url itself or the hash of a data:
+    url, which holds the whole image
+
+    Args:
+        url: http(s) or data: url
+        variant: processing applied to the image, e.g. downscaling
+    """
+    if url.startswith("data:"):
+        url = "sha256:" + hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return f"{url}#{variant}" if variant else url
+
+
+def _get_block_size(block: ImageBlock) -> int:
+    return len(block["source"]["data"])
+
+
+class ImageCache:
+    """Thread safe LRU cache of resolved image blocks, bounded by their size.
+
+    Blocks are keyed by url, or by hash for data: urls, and hold the base64 data
+    along with its media type. They are shared by every request and must not be
+    modified.
+
+    With a directory, blocks evicted from memory are still found on disk, where the
+    least recently used files are removed past disk_max_bytes. Files are named by
+    the hash of their key so they can be shared by processes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+        directory: Optional[str] = IMAGE_CACHE_DIR or None,
+        disk_max_bytes: int = IMAGE_CACHE_DISK_MAX_BYTES,
+    ) -> None:
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._disk_max_bytes = disk_max_bytes
+        self._blocks: OrderedDict[str, ImageBlock] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def has_disk(self) -> bool:
+        return self._directory is not None
+
+    def get(self, url: str, variant: str = "") -> Optional[ImageBlock]:
+        """returns the cached image block of an image url, or None
+
+        Args:
+            url: http(s) or data: url
+            variant: processing applied to the image, e.g. downscaling
+        """
+        key = get_image_cache_key(url, variant)
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is not None:
+                self._blocks.move_to_end(key)
+                self._hits += 1
+                return block
+
+        block = self._read(key)
+
+        with self._lock:
+            if block is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._put(key, block)
+        return block
+
+    def set(self, url: str, block: ImageBlock, variant: str = "") -> None:
+        """caches the image block of an image url, in memory and on disk
+
+        Args:
+            url: http(s) or data: url
+            block: resolved image block
+            variant: processing applied to the image, e.g. downscaling
+        """
+        key = get_image_cache_key(url, variant)
+        with self._lock:
+            self._put(key, block)
+        self._write(key, block)
+
+    def get_stats(self) -> ImageCacheStats:
+        with self._lock:
+            return ImageCacheStats(
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._blocks),
+                bytes=self._bytes,
+            )
+
+    def clear(self) -> None:
+        """empties the memory cache, files on disk are kept"""
+        with self._lock:
+            self._blocks.clear()
+            self._bytes = 0
+
+    def _put(self, key: str, block: ImageBlock) -> None:
+        # Must hold the lock. Blocks larger than the cache are only kept on disk.
+        size = _get_block_size(block)
+        previous = self._blocks.pop(key, None)
+        if previous is not None:
+            self._bytes -= _get_block_size(previous)
+        if size > self._max_bytes:
+            return
+
+        self._blocks[key] = block
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            _, evicted = self._blocks.popitem(last=False)
+            self._bytes -= _get_block_size(evicted)
+            self._evictions += 1
+
+    def _get_path(self, key: str) -> str:
+        assert self._directory is not None
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self._directory, f"{name}.json")
+
+    def _read(self, key: str) -> Optional[ImageBlock]:
+        if self._directory is None:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                source = json.load(file)
+            # Recently used files are the last removed
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return {"type": "image", "source": source}
+
+    def _write(self, key: str, block: ImageBlock) -> None:
+        if self._directory is None:
+            return
+
+        path = self._get_path(key)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(block["source"], file)
+            os.replace(temporary_path, path)
+        except OSError:
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._get_disk_bytes()
+            else:
+                self._disk_bytes += os.path.getsize(path)
+            if self._disk_bytes > self._disk_max_bytes:
+                self._evict_disk()
+
+    def _list_files(self) -> list[os.DirEntry[str]]:
+        assert self._directory is not None
+        with os.scandir(self._directory) as entries:
+            return [entry for entry in entries if entry.name.endswith(".json")]
+
+    def _get_disk_bytes(self) -> int:
+        total = 0
+        for entry in self._list_files():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict_disk(self) -> None:
+        # Must hold the disk lock. Other processes may share the directory, so its
+        # files are listed again rather than tracked.
+        files = []
+        for entry in self._list_files():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self._disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self._evictions += 1
+
+        self._disk_bytes = total
+
+
+image_cache = ImageCache()
+
+__all__ = [
+    "ImageBlock",
+    "ImageCache",
+    "ImageCacheStats",
+    "get_image_cache_key",
+    "image_cache",
+]
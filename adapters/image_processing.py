@@ -0,0 +1,305 @@
+import asyncio
+import base64
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import io
+import math
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+
+from adapters.constants import IMAGE_PROCESSING_WORKERS
+from adapters.image_cache import ImageCache, image_cache
+from adapters.types import ImageDetailsType
+
+JPEG_QUALITY = 85
+EXIF_ORIENTATION = 0x0112
+# Orientations of images stored rotated by 90 degrees
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+class ImageLimits(NamedTuple):
+    """Largest image a provider uses at a detail level, larger ones are downscaled
+    by the provider anyway."""
+
+    max_long_side: int
+    max_short_side: Optional[int] = None
+    max_pixels: Optional[int] = None
+
+    def get_cache_variant(self) -> str:
+        return f"{self.max_long_side}x{self.max_short_side}x{self.max_pixels}"
+
+
+# Returns the limits of a detail level, None to keep images as is
+GetImageLimits = Callable[[str], Optional[ImageLimits]]
+
+
+def get_image_detail(part: Any) -> str:
+    """returns the detail level of an image_url content part
+
+    Args:
+        part: OpenAI format image_url content part
+    """
+    image_url = part["image_url"]
+    # "details" is the name used by VisionImageDetails
+    detail = image_url.get("detail") or image_url.get("details")
+    return str(detail or ImageDetailsType.auto.value)
+
+
+def get_scaled_size(width: int, height: int, limits: ImageLimits) -> tuple[int, int]:
+    """returns the size of an image fitting the limits, keeping its aspect ratio
+
+    Args:
+        width: image width
+        height: image height
+        limits: limits to fit
+    """
+    scale = min(1.0, limits.max_long_side / max(width, height))
+    if limits.max_short_side is not None:
+        scale = min(scale, limits.max_short_side / min(width, height))
+    if limits.max_pixels is not None:
+        scale = min(scale, math.sqrt(limits.max_pixels / (width * height)))
+
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _load_pillow() -> Optional[Any]:
+    # Pillow is optional, installed with the images extra, images are sent as is
+    # without it
+    try:
+        return importlib.import_module("PIL.Image")
+    except ImportError:
+        return None
+
+
+def downscale_image(content: bytes, limits: ImageLimits) -> Optional[tuple[bytes, str]]:
+    """returns the image downscaled to fit the limits, and its media type, or None
+    if it already fits or cannot be downscaled
+
+    Images with transparency are encoded as PNG, others as JPEG. Requires Pillow,
+    installed with `pip install martian-adapters[images]`.
+
+    Args:
+        content: image bytes
+        limits: limits to fit
+    """
+    pillow = _load_pillow()
+    if pillow is None:
+        return None
+
+    try:
+        image = pillow.open(io.BytesIO(content))
+        # Animated images would lose their frames
+        if getattr(image, "n_frames", 1) > 1:
+            return None
+
+        # Sizes are read from the header, images are only decoded when resized
+        width, height = image.size
+        rotated = image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS
+        if rotated:
+            width, height = height, width
+        size = get_scaled_size(width, height, limits)
+        if size == (width, height):
+            return None
+
+        # JPEG images are decoded at the smallest scale still larger than the size
+        image.draft("RGB", size[::-1] if rotated else size)
+        image = importlib.import_module("PIL.ImageOps").exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image = image.resize(size, pillow.Resampling.LANCZOS)
+
+        output = io.BytesIO()
+        if has_alpha:
+            image.save(output, format="PNG", optimize=True)
+        else:
+            image.save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    except (OSError, ValueError, pillow.DecompressionBombError):
+        return None
+
+    downscaled = output.getvalue()
+    if len(downscaled) >= len(content):
+        return None
+    return downscaled, "image/png" if has_alpha else "image/jpeg"
+
+
+def _get_data_url(media_type: str, data: str) -> str:
+    return f"data:{media_type};base64,{data}"
+
+
+class ImageProcessor:
+    """Downscales the images of vision requests to the provider limits of their
+    detail level before they are uploaded.
+
+    Work is done in a thread pool on async, Pillow releasing the GIL while resizing
+    and encoding, so the event loop is never blocked. Downscaled data: urls are
+    cached by hash, as conversations resend them every turn.
+    """
+
+    def __init__(
+        self,
+        workers: int = IMAGE_PROCESSING_WORKERS,
+        cache: Optional[ImageCache] = None,
+    ) -> None:
+        self._workers = workers
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._workers, thread_name_prefix="adapters-images"
+                )
+            return self._executor
+
+    async def run_async(self, function: Callable[..., Any], *args: Any) -> Any:
+        """returns the result of a function run in the thread pool
+
+        Args:
+            function: function to run
+            args: function arguments
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), function, *args)
+
+    def downscale_data_url(self, url: str, limits: ImageLimits) -> str:
+        """returns the data: url downscaled to fit the limits, or the url as is
+
+        Args:
+            url: data: url
+            limits: limits to fit
+        """
+        variant = limits.get_cache_variant()
+        if self._cache is not None:
+            block = self._cache.get(url, variant)
+            if block is not None:
+                source = block["source"]
+                return _get_data_url(source["media_type"], source["data"])
+
+        _, _, data = url.partition(";base64,")
+        try:
+            content = base64.b64decode(data, validate=True)
+        except binascii.Error:
+            return url
+
+        downscaled = downscale_image(content, limits)
+        if downscaled is None:
+            return url
+
+        content, media_type = downscaled
+        encoded = base64.b64encode(content).decode("utf-8")
+        if self._cache is not None:
+            self._cache.set(
+                url,
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": media_type,
+                        "data": encoded,
+                    },
+                },
+                variant,
+            )
+        return _get_data_url(media_type, encoded)
+
+    def _get_data_url_parts(
+        self, messages: list[Any], get_limits: GetImageLimits
+    ) -> dict[tuple[int, int], tuple[str, ImageLimits]]:
+        parts: dict[tuple[int, int], tuple[str, ImageLimits]] = {}
+        for message_index, message in enumerate(messages):
+            content = message.get("content")
+            if not isinstance(content, list):
+                continue
+            for part_index, part in enumerate(content):
+                if part.get("type") != "image_url":
+                    continue
+                url = part["image_url"]["url"]
+                limits = get_limits(get_image_detail(part))
+                if limits is not None and url.startswith("data:"):
+                    parts[(message_index, part_index)] = (url, limits)
+        return parts
+
+    @staticmethod
+    def _replace_urls(
+        messages: list[Any], urls: dict[tuple[int, int], str]
+    ) -> list[Any]:
+        # Rewritten messages are copies, leaving the caller's untouched
+        messages = list(messages)
+        for (message_index, part_index), url in urls.items():
+            message = messages[message_index]
+            content = list(message["content"])
+            part = content[part_index]
+            if part["image_url"]["url"] == url:
+                continue
+            content[part_index] = {
+                **part,
+                "image_url": {**part["image_url"], "url": url},
+            }
+            messages[message_index] = {**message, "content": content}
+        return messages
+
+    def downscale_messages_sync(
+        self, messages: list[Any], get_limits: GetImageLimits
+    ) -> list[Any]:
+        """returns the messages with their data: url images downscaled to the
+        limits of their detail level
+
+        Args:
+            messages: OpenAI format messages
+            get_limits: returns the limits of a detail level
+        """
+        parts = self._get_data_url_parts(messages, get_limits)
+        if not parts:
+            return messages
+
+        urls = {
+            index: self.downscale_data_url(url, limits)
+            for index, (url, limits) in parts.items()
+        }
+        return self._replace_urls(messages, urls)
+
+    async def downscale_messages_async(
+        self, messages: list[Any], get_limits: GetImageLimits
+    ) -> list[Any]:
+        """returns the messages with their data: url images downscaled, in the
+        thread pool, see downscale_messages_sync"""
+        parts = self._get_data_url_parts(messages, get_limits)
+        if not parts:
+            return messages
+
+        downscaled = await asyncio.gather(
+            *(
+                self.run_async(self.downscale_data_url, url, limits)
+                for url, limits in parts.values()
+            )
+        )
+        return self._replace_urls(messages, dict(zip(parts, downscaled)))
+
+    def shutdown(self) -> None:
+        """stops the thread pool, it is started again when needed"""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+image_processor = ImageProcessor(cache=image_cache)
+
+__all__ = [
+    "GetImageLimits",
+    "ImageLimits",
+    "ImageProcessor",
+    "downscale_image",
+    "get_image_detail",
+    "get_scaled_size",
+    "image_processor",
+]
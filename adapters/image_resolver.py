@@ -0,0 +1,364 @@
+import asyncio
+import base64
+import mimetypes
+import socket
+import threading
+import time
+from typing import Any, Callable, Iterable, Mapping, Optional, TypeVar
+from urllib.parse import urlsplit
+import weakref
+
+from httpx import AsyncClient, Client, HTTPError, Limits, Response, Timeout
+
+from adapters.constants import (
+    IMAGE_FETCH_CONCURRENCY,
+    IMAGE_FETCH_TIMEOUT,
+    IMAGE_MAX_BYTES,
+)
+from adapters.image_cache import ImageBlock, ImageCache, image_cache
+from adapters.image_processing import (
+    ImageLimits,
+    downscale_image,
+    get_image_detail,
+    image_processor,
+)
+from adapters.types import AdapterException, ImageDetailsType
+
+T = TypeVar("T")
+LoopRef = weakref.ref[asyncio.AbstractEventLoop]
+
+
+# Detail levels from the least to the most detailed
+_DETAIL_RANKS = {
+    ImageDetailsType.low.value: 0,
+    ImageDetailsType.auto.value: 1,
+    ImageDetailsType.high.value: 2,
+}
+
+
+def get_image_details(messages: Iterable[Any]) -> dict[str, str]:
+    """returns the detail levels of the unique image urls of the messages, in
+    order, the most detailed one for urls used several times
+
+    Args:
+        messages: OpenAI format messages
+    """
+    details: dict[str, str] = {}
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if part.get("type") != "image_url":
+                continue
+            url = part["image_url"]["url"]
+            detail = get_image_detail(part)
+            if _DETAIL_RANKS.get(detail, 1) >= _DETAIL_RANKS.get(
+                details.get(url, ""), -1
+            ):
+                details[url] = detail
+    return details
+
+
+def get_image_urls(messages: Iterable[Any]) -> list[str]:
+    """returns the unique image urls of the messages, in order
+
+    Args:
+        messages: OpenAI format messages
+    """
+    return list(get_image_details(messages))
+
+
+def _get_image_block(media_type: str, data: str) -> ImageBlock:
+    return {
+        "type": "image",
+        "source": {"type": "base64", "media_type": media_type, "data": data},
+    }
+
+
+def _get_data_url_block(url: str) -> ImageBlock:
+    media_type, _, data = url.partition(";base64,")
+    return _get_image_block(media_type.split(":")[1], data)
+
+
+def _get_media_type(url: str, response: Response) -> str:
+    content_type = str(response.headers.get("content-type", "")).split(";")[0].strip()
+    if content_type.startswith("image/"):
+        return content_type
+
+    media_type, _ = mimetypes.guess_type(urlsplit(url).path)
+    if media_type is None or not media_type.startswith("image/"):
+        raise AdapterException(f"Unknown media type of image {url}")
+    return media_type
+
+
+def _shutdown_stream(response: Response) -> None:
+    # Wakes up a read blocked on the connection of the response, which then fails
+    network_stream = response.extensions.get("network_stream")
+    sock = network_stream.get_extra_info("socket") if network_stream else None
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class ImageResolver:
+    """Turns the image urls of vision requests into base64 image blocks.
+
+    data: urls are decoded in place, remote images are fetched with pooled clients
+    shared by every request, concurrently on async. Each fetch is bounded by a total
+    timeout and a size limit.
+
+    Async clients are bound to their event loop, so one is kept per running loop.
+
+    With a cache, fetched images are reused by later requests, e.g. the following
+    turns of a conversation.
+    """
+
+    def __init__(
+        self,
+        timeout: float = IMAGE_FETCH_TIMEOUT,
+        max_bytes: int = IMAGE_MAX_BYTES,
+        concurrency: int = IMAGE_FETCH_CONCURRENCY,
+        cache: Optional[ImageCache] = None,
+    ) -> None:
+        self._cache = cache
+        self._timeout = timeout
+        self._max_bytes = max_bytes
+        self._concurrency = concurrency
+        self._lock = threading.Lock()
+        self._client_sync: Optional[Client] = None
+        # Open connections reference their loop, so clients are dropped once their
+        # loop is closed, see TransportPool
+        self._clients_async: dict[LoopRef, AsyncClient] = {}
+
+    def _get_client_kwargs(self) -> dict[str, Any]:
+        return {
+            "timeout": Timeout(self._timeout),
+            "limits": Limits(max_keepalive_connections=self._concurrency),
+            "follow_redirects": True,
+        }
+
+    def _get_client_sync(self) -> Client:
+        with self._lock:
+            if self._client_sync is None:
+                self._client_sync = Client(**self._get_client_kwargs())
+            return self._client_sync
+
+    def _get_client_async(self) -> AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._drop_closed_loops()
+            client = self._clients_async.get(weakref.ref(loop))
+            if client is None:
+                client = AsyncClient(**self._get_client_kwargs())
+                self._clients_async[weakref.ref(loop)] = client
+            return client
+
+    def _drop_closed_loops(self) -> None:
+        # Must hold the lock. Clients of a closed loop cannot be closed anymore,
+        # their connections are released once dropped.
+        for loop_ref in list(self._clients_async):
+            loop = loop_ref()
+            if loop is None or loop.is_closed():
+                del self._clients_async[loop_ref]
+
+    def _check_size(self, url: str, size: int) -> None:
+        if size > self._max_bytes:
+            raise AdapterException(
+                f"Image {url} is larger than {self._max_bytes} bytes"
+            )
+
+    @staticmethod
+    def _get_block(
+        url: str, response: Response, content: bytes, limits: Optional[ImageLimits]
+    ) -> ImageBlock:
+        media_type = _get_media_type(url, response)
+        downscaled = downscale_image(content, limits) if limits else None
+        if downscaled is not None:
+            content, media_type = downscaled
+        return _get_image_block(media_type, base64.b64encode(content).decode("utf-8"))
+
+    def fetch_sync(self, url: str, limits: Optional[ImageLimits] = None) -> ImageBlock:
+        """returns the image block of an image url
+
+        Args:
+            url: http(s) or data: url
+            limits: limits remote images are downscaled to fit
+        """
+        # Decoding a data: url in place is cheaper than hashing it for the cache
+        if url.startswith("data:"):
+            return _get_data_url_block(url)
+
+        variant = limits.get_cache_variant() if limits else ""
+        if self._cache is not None:
+            block = self._cache.get(url, variant)
+            if block is not None:
+                return block
+
+        block = self._download_sync(url, limits)
+        if self._cache is not None:
+            self._cache.set(url, block, variant)
+        return block
+
+    async def fetch_async(
+        self, url: str, limits: Optional[ImageLimits] = None
+    ) -> ImageBlock:
+        """returns the image block of an image url, see fetch_sync"""
+        if url.startswith("data:"):
+            return _get_data_url_block(url)
+
+        variant = limits.get_cache_variant() if limits else ""
+        if self._cache is not None:
+            block = await self._call_cache(self._cache.get, url, variant)
+            if block is not None:
+                return block
+
+        block = await self._download_async(url, limits)
+        if self._cache is not None:
+            await self._call_cache(self._cache.set, url, block, variant)
+        return block
+
+    async def _call_cache(self, method: Callable[..., T], *args: Any) -> T:
+        assert self._cache is not None
+        # Keeps disk reads and writes off the event loop
+        if self._cache.has_disk:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def _download_sync(self, url: str, limits: Optional[ImageLimits]) -> ImageBlock:
+        deadline = time.monotonic() + self._timeout
+        try:
+            with self._get_client_sync().stream("GET", url) as response:
+                response.raise_for_status()
+                self._check_size(url, int(response.headers.get("content-length", 0)))
+                # Each read waits up to the read timeout, so the connection is shut
+                # down at the deadline rather than checked between chunks only
+                watchdog = threading.Timer(
+                    max(deadline - time.monotonic(), 0.0), _shutdown_stream, (response,)
+                )
+                watchdog.start()
+                try:
+                    content = bytearray()
+                    for chunk in response.iter_bytes():
+                        content += chunk
+                        self._check_size(url, len(content))
+                        if time.monotonic() > deadline:
+                            raise AdapterException(f"Timed out fetching image {url}")
+                finally:
+                    watchdog.cancel()
+        except HTTPError as e:
+            if time.monotonic() > deadline:
+                raise AdapterException(f"Timed out fetching image {url}") from e
+            raise AdapterException(f"Failed to fetch image {url}: {e}") from e
+
+        return self._get_block(url, response, bytes(content), limits)
+
+    async def _download_async(
+        self, url: str, limits: Optional[ImageLimits]
+    ) -> ImageBlock:
+        async def fetch() -> tuple[Response, bytes]:
+            async with self._get_client_async().stream("GET", url) as response:
+                response.raise_for_status()
+                self._check_size(url, int(response.headers.get("content-length", 0)))
+                content = bytearray()
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    self._check_size(url, len(content))
+            return response, bytes(content)
+
+        try:
+            response, content = await asyncio.wait_for(fetch(), self._timeout)
+        except asyncio.TimeoutError as e:
+            raise AdapterException(f"Timed out fetching image {url}") from e
+        except HTTPError as e:
+            raise AdapterException(f"Failed to fetch image {url}: {e}") from e
+
+        if limits is None:
+            return self._get_block(url, response, content, limits)
+        # Downscaling is done in the thread pool, off the event loop
+        block: ImageBlock = await image_processor.run_async(
+            self._get_block, url, response, content, limits
+        )
+        return block
+
+    def resolve_sync(
+        self,
+        urls: Iterable[str],
+        limits: Optional[Mapping[str, Optional[ImageLimits]]] = None,
+    ) -> dict[str, ImageBlock]:
+        """returns the image blocks of image urls, by url
+
+        Args:
+            urls: http(s) or data: urls
+            limits: limits remote images are downscaled to fit, by url
+        """
+        limits = limits or {}
+        return {
+            url: self.fetch_sync(url, limits.get(url)) for url in dict.fromkeys(urls)
+        }
+
+    async def resolve_async(
+        self,
+        urls: Iterable[str],
+        limits: Optional[Mapping[str, Optional[ImageLimits]]] = None,
+    ) -> dict[str, ImageBlock]:
+        """returns the image blocks of image urls, by url, fetched concurrently
+
+        Args:
+            urls: http(s) or data: urls
+            limits: limits remote images are downscaled to fit, by url
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        semaphore = asyncio.Semaphore(self._concurrency)
+        url_limits = limits or {}
+
+        async def fetch(url: str) -> ImageBlock:
+            async with semaphore:
+                return await self.fetch_async(url, url_limits.get(url))
+
+        blocks = await asyncio.gather(*(fetch(url) for url in unique_urls))
+        return dict(zip(unique_urls, blocks))
+
+    def shutdown(self) -> None:
+        """closes the sync client, and the async ones on their event loop if it is
+        running, async clients of closed loops are dropped
+
+        Use `ashutdown` from async code to wait for the async client of its loop to
+        close.
+        """
+        with self._lock:
+            client = self._client_sync
+            clients_async = list(self._clients_async.items())
+            self._client_sync = None
+            self._clients_async.clear()
+
+        if client is not None:
+            client.close()
+        for loop_ref, client_async in clients_async:
+            loop = loop_ref()
+            if loop is not None and loop.is_running():
+                asyncio.run_coroutine_threadsafe(client_async.aclose(), loop)
+
+    async def ashutdown(self) -> None:
+        """closes the sync client and the async ones, awaiting the one of the
+        running loop, see shutdown"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client_async = self._clients_async.pop(weakref.ref(loop), None)
+        self.shutdown()
+
+        if client_async is not None:
+            await client_async.aclose()
+
+
+image_resolver = ImageResolver(cache=image_cache)
+
+__all__ = [
+    "ImageBlock",
+    "ImageResolver",
+    "get_image_details",
+    "get_image_urls",
+    "image_resolver",
+]
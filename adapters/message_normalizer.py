@@ -0,0 +1,245 @@
+from typing import Any, Iterable, Optional
+
+from openai.types.chat import ChatCompletionMessageParam, ChatCompletionUserMessageParam
+
+from adapters.general_utils import EMPTY_CONTENT
+from adapters.types import AdapterException, ContentType, ConversationRole, Model
+
+USER = ConversationRole.user.value
+ASSISTANT = ConversationRole.assistant.value
+SYSTEM = ConversationRole.system.value
+
+
+def _get_empty_user_message() -> ChatCompletionMessageParam:
+    return ChatCompletionUserMessageParam(
+        role=ConversationRole.user.value, content=EMPTY_CONTENT
+    )
+
+
+class MessageNormalizer:
+    """Rewrites messages into a conversation the model accepts, in a single pass.
+
+    The transforms are compiled once per model from its flags, so a call only runs
+    the ones the model needs: a model accepting any conversation just gets its
+    messages back.
+
+    Messages are never modified: rewritten messages are shallow copies, sharing
+    every part they do not change (e.g. images) with the caller's messages.
+    """
+
+    def __init__(self, model: Model) -> None:
+        self._model_name = model.name
+
+        self._check_json_content = not model.supports_json_content
+        self._check_vision = not model.supports_vision
+        self._fill_empty_content = not model.can_empty_content
+
+        # Index from which system messages are sent as user messages
+        self._system_to_user_from: Optional[int] = None
+        if not model.can_system:
+            self._system_to_user_from = 0
+        elif not model.can_system_multiple:
+            self._system_to_user_from = 1
+
+        # Roles of the first message that get an empty user message prepended
+        self._prepend_user_roles = (
+            frozenset((ASSISTANT,))
+            if model.can_assistant_first is False
+            else frozenset()
+        )
+        # Roles of the first message that get an empty user message appended
+        self._append_user_first_roles = frozenset(
+            role
+            for role, allowed in (
+                (ASSISTANT, model.can_assistant_only),
+                (SYSTEM, model.can_system_only),
+            )
+            if not allowed
+        )
+        # Roles of the last message that get an empty user message appended
+        self._append_user_last_roles = frozenset(
+            role
+            for role, allowed in (
+                (ASSISTANT, model.can_assistant_last),
+                (SYSTEM, model.can_system_last),
+            )
+            if allowed is False
+        )
+        self._merge_repeating_roles = not model.can_repeating_roles
+
+        self._rewrites_messages = (
+            self._check_json_content
+            or self._check_vision
+            or self._fill_empty_content
+            or self._system_to_user_from is not None
+        )
+        self._is_noop = not (
+            self._rewrites_messages
+            or self._prepend_user_roles
+            or self._append_user_first_roles
+            or self._append_user_last_roles
+            or self._merge_repeating_roles
+        )
+
+    def normalize(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> list[ChatCompletionMessageParam]:
+        """returns the messages to send to the model
+
+        Args:
+            messages: messages of the conversation
+
+        Raises:
+            AdapterException: if the messages have content the model does not support
+        """
+        if len(messages) == 0:
+            messages = [_get_empty_user_message()]
+
+        if self._is_noop:
+            return messages
+
+        first_role = messages[0]["role"]
+        result: list[ChatCompletionMessageParam] = []
+
+        if first_role in self._prepend_user_roles:
+            result.append(_get_empty_user_message())
+
+        # Hoisted out of the loop, which runs once per message
+        rewrites_messages = self._rewrites_messages
+        check_json_content = self._check_json_content
+        check_vision = self._check_vision
+        fill_empty_content = self._fill_empty_content
+        system_to_user_from = (
+            len(messages)
+            if self._system_to_user_from is None
+            else self._system_to_user_from
+        )
+        merge_repeating_roles = self._merge_repeating_roles
+        # Last message joined by the normalizer, the only one it can update in place
+        merged_message: Optional[ChatCompletionMessageParam] = None
+
+        for index, message in enumerate(messages):
+            if rewrites_messages:
+                content: Any = message.get("content")
+
+                if isinstance(content, str):
+                    if fill_empty_content and content.strip() == "":
+                        message = _with_content(message, EMPTY_CONTENT)
+                else:
+                    if check_json_content:
+                        raise AdapterException(
+                            f"JSON content is not supported on {self._model_name}"
+                        )
+                    if check_vision and content:
+                        self._verify_vision(content)
+                    if fill_empty_content and isinstance(content, list):
+                        filled_content = _fill_empty_parts(content)
+                        if filled_content is not None:
+                            message = _with_content(message, filled_content)
+
+                if index >= system_to_user_from and message["role"] == SYSTEM:
+                    message = ChatCompletionUserMessageParam(
+                        role=ConversationRole.user.value,
+                        content=message["content"],  # type: ignore[typeddict-item]
+                    )
+
+            if (
+                merge_repeating_roles
+                and result
+                and result[-1]["role"] == message["role"]
+            ):
+                merged_message = _merge_messages(
+                    result[-1], message, owned=result[-1] is merged_message
+                )
+                result[-1] = merged_message
+            else:
+                result.append(message)
+
+        # Role the last message is sent with
+        last_role: str = messages[-1]["role"]
+        if last_role == SYSTEM and len(messages) > system_to_user_from:
+            last_role = USER
+
+        if (
+            first_role in self._append_user_first_roles
+            or last_role in self._append_user_last_roles
+        ):
+            if merge_repeating_roles and result[-1]["role"] == USER:
+                result[-1] = _merge_messages(
+                    result[-1],
+                    _get_empty_user_message(),
+                    owned=result[-1] is merged_message,
+                )
+            else:
+                result.append(_get_empty_user_message())
+
+        return result
+
+    def _verify_vision(self, content: Iterable[Any]) -> None:
+        for part in content:
+            if (
+                not isinstance(part, str)
+                and part["type"] == ContentType.image_url.value
+            ):
+                raise AdapterException(f"Vision is not supported on {self._model_name}")
+
+
+def _with_content(
+    message: ChatCompletionMessageParam, content: Any
+) -> ChatCompletionMessageParam:
+    return {**message, "content": content}  # type: ignore[return-value]
+
+
+def _fill_empty_parts(content: list[Any]) -> Optional[list[Any]]:
+    # Returns a copy of the content with empty text parts filled, or None if it has
+    # none
+    filled_content: Optional[list[Any]] = None
+
+    for index, part in enumerate(content):
+        if isinstance(part, dict) and "text" in part and part["text"].strip() == "":
+            if filled_content is None:
+                filled_content = list(content)
+            filled_content[index] = {**part, "text": EMPTY_CONTENT}
+
+    return filled_content
+
+
+def _merge_messages(
+    grouped_message: ChatCompletionMessageParam,
+    message: ChatCompletionMessageParam,
+    owned: bool,
+) -> ChatCompletionMessageParam:
+    """joins a message into the previous one, sent with the same role
+
+    Args:
+        grouped_message: previous message
+        message: message to join
+        owned: whether grouped_message was created by a previous join, and can be
+            updated in place rather than copied
+    """
+    grouped: Any = grouped_message if owned else {**grouped_message}
+    grouped_content = grouped["content"]
+    content = message["content"]
+
+    # A copied message gets its own content list, even when nothing is joined to it
+    # (e.g. a tool call without content), so the next join can extend it in place
+    if not owned and isinstance(grouped_content, list):
+        grouped_content = list(grouped_content)
+        grouped["content"] = grouped_content
+
+    if isinstance(grouped_content, str) and isinstance(content, str):
+        grouped["content"] = f"{grouped_content}\n{content}"
+    elif isinstance(grouped_content, list) and isinstance(content, list):
+        grouped_content.extend(content)
+    elif isinstance(grouped_content, list) and isinstance(content, str):
+        grouped_content.append({"type": ContentType.text.value, "text": content})
+    elif isinstance(grouped_content, str) and isinstance(content, list):
+        grouped["content"] = [
+            {"type": ContentType.text.value, "text": grouped_content},
+            *content,
+        ]
+
+    return grouped  # type: ignore[no-any-return]
+
+
+__all__ = ["MessageNormalizer"]
@@ -0,0 +1,189 @@
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Iterable, Mapping, Optional, Union
+
+from adapters.types import Model
+
+CAPABILITY_PREFIXES = ("supports_", "can_")
+
+# Every boolean `supports_*` / `can_*` field of Model, in declaration order
+CAPABILITY_FLAGS: tuple[str, ...] = tuple(
+    name
+    for name, field in Model.model_fields.items()
+    if field.annotation is bool and name.startswith(CAPABILITY_PREFIXES)
+)
+
+CAPABILITY_BITS: dict[str, int] = {
+    flag: 1 << bit for bit, flag in enumerate(CAPABILITY_FLAGS)
+}
+
+NameFilter = Optional[Union[str, Iterable[str]]]
+
+
+def get_capability_mask(model: Model) -> int:
+    mask = 0
+    for flag, bit in CAPABILITY_BITS.items():
+        if getattr(model, flag):
+            mask |= bit
+    return mask
+
+
+def _freeze_names(names: NameFilter) -> Optional[frozenset[str]]:
+    if names is None:
+        return None
+    if isinstance(names, str):
+        return frozenset((names,))
+    return frozenset(names)
+
+
+class ModelIndex:
+    """Answers model queries with bitwise operations over a fixed list of models.
+
+    Bit ``i`` of every bitset refers to ``models[i]``, so results keep the order of
+    the model list. Query results are memoized.
+    """
+
+    def __init__(self, models: list[Model]) -> None:
+        self._models = tuple(models)
+        self._all = (1 << len(models)) - 1
+
+        # Capability flags compiled per model at build time
+        self._capability_masks = tuple(get_capability_mask(model) for model in models)
+
+        # Bitsets of models having each capability
+        self._capabilities: dict[str, int] = dict.fromkeys(CAPABILITY_FLAGS, 0)
+        self._providers: dict[str, int] = {}
+        self._vendors: dict[str, int] = {}
+        self._names: dict[str, int] = {}
+
+        for index, model in enumerate(models):
+            bit = 1 << index
+            for flag, flag_bit in CAPABILITY_BITS.items():
+                if self._capability_masks[index] & flag_bit:
+                    self._capabilities[flag] |= bit
+            self._providers[model.provider_name] = (
+                self._providers.get(model.provider_name, 0) | bit
+            )
+            self._vendors[model.vendor_name] = (
+                self._vendors.get(model.vendor_name, 0) | bit
+            )
+            self._names[model.name] = self._names.get(model.name, 0) | bit
+
+        # Bitsets of models with context length >= / <= each distinct length
+        self._context_lengths = sorted({model.context_length for model in models})
+        self._context_at_least: list[int] = []
+        self._context_at_most: list[int] = []
+        for length in self._context_lengths:
+            at_least = at_most = 0
+            for index, model in enumerate(models):
+                if model.context_length >= length:
+                    at_least |= 1 << index
+                if model.context_length <= length:
+                    at_most |= 1 << index
+            self._context_at_least.append(at_least)
+            self._context_at_most.append(at_most)
+
+        self._query = lru_cache(maxsize=1024)(self._query_uncached)
+
+    @property
+    def models(self) -> tuple[Model, ...]:
+        return self._models
+
+    def get_capability_mask(self, index: int) -> int:
+        return self._capability_masks[index]
+
+    def query(
+        self,
+        capabilities: Optional[Mapping[str, bool]] = None,
+        provider: NameFilter = None,
+        vendor: NameFilter = None,
+        min_context_length: Optional[int] = None,
+        max_context_length: Optional[int] = None,
+        excluded_names: Iterable[str] = (),
+    ) -> tuple[Model, ...]:
+        """Returns models matching every given filter, in model list order.
+
+        Args:
+            capabilities: capability flag names mapped to the required value
+            provider: provider name or names to include
+            vendor: vendor name or names to include
+            min_context_length: minimum context length, inclusive
+            max_context_length: maximum context length, inclusive
+            excluded_names: model names to leave out
+        """
+        required = excluded = 0
+        for flag, value in (capabilities or {}).items():
+            bit = CAPABILITY_BITS.get(flag)
+            if bit is None:
+                raise ValueError(f"Unknown capability: {flag}")
+            if value:
+                required |= bit
+            else:
+                excluded |= bit
+
+        return self._query(
+            required,
+            excluded,
+            _freeze_names(provider),
+            _freeze_names(vendor),
+            min_context_length,
+            max_context_length,
+            frozenset(excluded_names),
+        )
+
+    def _query_uncached(
+        self,
+        required: int,
+        excluded: int,
+        providers: Optional[frozenset[str]],
+        vendors: Optional[frozenset[str]],
+        min_context_length: Optional[int],
+        max_context_length: Optional[int],
+        excluded_names: frozenset[str],
+    ) -> tuple[Model, ...]:
+        selected = self._all
+
+        for flag, bit in CAPABILITY_BITS.items():
+            if required & bit:
+                selected &= self._capabilities[flag]
+            elif excluded & bit:
+                selected &= ~self._capabilities[flag]
+
+        if providers is not None:
+            selected &= self._union(self._providers, providers)
+
+        if vendors is not None:
+            selected &= self._union(self._vendors, vendors)
+
+        if min_context_length is not None:
+            position = bisect_left(self._context_lengths, min_context_length)
+            selected &= (
+                self._context_at_least[position]
+                if position < len(self._context_lengths)
+                else 0
+            )
+
+        if max_context_length is not None:
+            position = bisect_right(self._context_lengths, max_context_length) - 1
+            selected &= self._context_at_most[position] if position >= 0 else 0
+
+        if excluded_names:
+            selected &= ~self._union(self._names, excluded_names)
+
+        return tuple(self._iter_models(selected))
+
+    @staticmethod
+    def _union(bitsets: dict[str, int], names: frozenset[str]) -> int:
+        result = 0
+        for name in names:
+            result |= bitsets.get(name, 0)
+        return result
+
+    def _iter_models(self, selected: int) -> Iterable[Model]:
+        while selected:
+            lowest = selected & -selected
+            yield self._models[lowest.bit_length() - 1]
+            selected ^= lowest
+
+
+__all__ = ["CAPABILITY_FLAGS", "ModelIndex", "NameFilter", "get_capability_mask"]
@@ -1,25 +1,47 @@
-from .ai21_sdk_chat_provider_adapter import AI21SDKChatProviderAdapter
-from .anthropic_sdk_chat_provider_adapter import AnthropicSDKChatProviderAdapter
-
-# from .azure_sdk_chat_provider_adapter import AzureSDKChatProviderAdapter
-from .cerebras_sdk_chat_provider_adapter import CerebrasSDKChatProviderAdapter
-from .cohere_sdk_chat_provider_adapter import CohereSDKChatProviderAdapter
-
-# from .databricks_sdk_chat_provider_adapter import DatabricksSDKChatProviderAdapter
-from .deepinfra_sdk_chat_provider_adapter import DeepInfraSDKChatProviderAdapter
-from .fireworks_sdk_chat_provider_adapter import FireworksSDKChatProviderAdapter
-from .moescape_sdk_chat_provider_adapter import MoescapeSDKChatProviderAdapter
-from .tensoropera_sdk_chat_provider_adapter import TensorOperaSDKChatProviderAdapter
-from .gemini_sdk_chat_provider_adapter import GeminiSDKChatProviderAdapter
-from .groq_sdk_chat_provider_adapter import GroqSDKChatProviderAdapter
-from .lepton_sdk_chat_provider_adapter import LeptonSDKChatProviderAdapter
-from .moonshot_sdk_chat_provider_adapter import MoonshotSDKChatProviderAdapter
-from .octoai_sdk_chat_provider_adapter import OctoaiSDKChatProviderAdapter
-from .openai_sdk_chat_provider_adapter import OpenAISDKChatProviderAdapter
-from .openrouter_sdk_chat_provider_adapter import OpenRouterSDKChatProviderAdapter
-from .perplexity_sdk_chat_provider_adapter import PerplexitySDKChatProviderAdapter
-from .together_sdk_chat_provider_adapter import TogetherSDKChatProviderAdapter
-from .bigmodel_provider_adapter import BigModelSDKChatProviderAdapter
+import importlib
+from typing import TYPE_CHECKING, Any
+
+from adapters.provider_manifest import PROVIDER_MANIFEST
+
+if TYPE_CHECKING:
+    from .ai21_sdk_chat_provider_adapter import AI21SDKChatProviderAdapter
+    from .anthropic_sdk_chat_provider_adapter import AnthropicSDKChatProviderAdapter
+
+    # from .azure_sdk_chat_provider_adapter import AzureSDKChatProviderAdapter
+    from .cerebras_sdk_chat_provider_adapter import CerebrasSDKChatProviderAdapter
+    from .cohere_sdk_chat_provider_adapter import CohereSDKChatProviderAdapter
+
+    # from .databricks_sdk_chat_provider_adapter import DatabricksSDKChatProviderAdapter
+    from .deepinfra_sdk_chat_provider_adapter import DeepInfraSDKChatProviderAdapter
+    from .fireworks_sdk_chat_provider_adapter import FireworksSDKChatProviderAdapter
+    from .moescape_sdk_chat_provider_adapter import MoescapeSDKChatProviderAdapter
+    from .tensoropera_sdk_chat_provider_adapter import TensorOperaSDKChatProviderAdapter
+    from .gemini_sdk_chat_provider_adapter import GeminiSDKChatProviderAdapter
+    from .groq_sdk_chat_provider_adapter import GroqSDKChatProviderAdapter
+    from .lepton_sdk_chat_provider_adapter import LeptonSDKChatProviderAdapter
+    from .moonshot_sdk_chat_provider_adapter import MoonshotSDKChatProviderAdapter
+    from .octoai_sdk_chat_provider_adapter import OctoaiSDKChatProviderAdapter
+    from .openai_sdk_chat_provider_adapter import OpenAISDKChatProviderAdapter
+    from .openrouter_sdk_chat_provider_adapter import OpenRouterSDKChatProviderAdapter
+    from .perplexity_sdk_chat_provider_adapter import PerplexitySDKChatProviderAdapter
+    from .together_sdk_chat_provider_adapter import TogetherSDKChatProviderAdapter
+    from .bigmodel_provider_adapter import BigModelSDKChatProviderAdapter
+
+# Adapters are imported on first access so that provider SDKs are only loaded when used
+_ADAPTER_MODULES: dict[str, str] = {
+    entry.adapter_class: entry.adapter_module for entry in PROVIDER_MANIFEST
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _ADAPTER_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    adapter_class = getattr(importlib.import_module(module), name)
+    globals()[name] = adapter_class
+    return adapter_class
+
 
 __all__ = [
     "AI21SDKChatProviderAdapter",
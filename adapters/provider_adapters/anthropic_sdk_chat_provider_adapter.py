@@ -18,6 +18,7 @@ from anthropic.types import (
     RawContentBlockDeltaEvent,
     RawMessageDeltaEvent,
     RawMessageStartEvent,
+    RawMessageStopEvent,
     RawMessageStreamEvent,
 )
 from anthropic.types.message_create_params import (
@@ -31,11 +32,9 @@ from anthropic.types.message_param import MessageParam
 from anthropic.types.text_delta import TextDelta
 from anthropic.types.text_block_param import TextBlockParam
 from anthropic.types.tool_param import ToolParam
-from httpx import AsyncClient, Client, Limits, Timeout
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionMessage
 from openai.types.chat.chat_completion import Choice
-from openai.types.chat.chat_completion_chunk import Choice as ChoiceChunk, ChoiceDelta
 from openai.types.chat.chat_completion_message_tool_call import (
     ChatCompletionMessageToolCall,
     Function,
@@ -43,13 +42,11 @@ from openai.types.chat.chat_completion_message_tool_call import (
 from pydantic import BaseModel
 
 from adapters.abstract_adapters.sdk_chat_adapter import SDKChatAdapter
-from adapters.constants import (
-    HTTP_CONNECT_TIMEOUT,
-    HTTP_TIMEOUT,
-    MAX_CONNECTIONS_PER_PROCESS,
-    MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-)
-from adapters.general_utils import process_image_url_anthropic
+from adapters.batch_jobs import AnthropicBatchAPI, BatchAPI
+from adapters.chunk_template import ChunkTemplate
+from adapters.general_utils import prune_none_values
+from adapters.image_processing import ImageLimits
+from adapters.image_resolver import ImageBlock, get_image_details, image_resolver
 from adapters.types import (
     AdapterChatCompletion,
     AdapterChatCompletionChunk,
@@ -57,97 +54,17 @@ from adapters.types import (
     Conversation,
     ConversationRole,
     Cost,
+    ImageDetailsType,
     Model,
-    Provider,
     Turn,
-    Vendor,
+)
+from adapters.provider_adapters.anthropic_models import (
+    MODELS,
+    AnthropicModel as AnthropicModel,
 )
 from openai.types.chat import ChatCompletionMessageParam
 
 
-class AnthropicModel(Model):
-    vendor_name: str = Vendor.anthropic.value
-    provider_name: str = Provider.anthropic.value
-
-    supports_completion: bool = False
-    supports_vision: bool = False
-    supports_n: bool = False
-
-    can_system: bool = False
-    can_empty_content: bool = False
-
-
-MODELS: list[Model] = [
-    AnthropicModel(
-        name="claude-3-haiku-20240307",
-        cost=Cost(prompt=0.25e-6, completion=1.25e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    # AnthropicModel(
-    #     name="claude-3-haiku-latest",
-    #     cost=Cost(prompt=0.25e-6, completion=1.25e-6),
-    #     context_length=200000,
-    #     completion_length=4096,
-    # ),
-    AnthropicModel(
-        name="claude-3-sonnet-20240229",
-        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    # AnthropicModel(
-    #     name="claude-3-sonnet-latest",
-    #     cost=Cost(prompt=3.0e-6, completion=15.0e-6),
-    #     context_length=200000,
-    #     completion_length=4096,
-    # ),
-    AnthropicModel(
-        name="claude-3-opus-20240229",
-        cost=Cost(prompt=15.00e-6, completion=75.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    AnthropicModel(
-        name="claude-3-opus-latest",
-        cost=Cost(prompt=15.00e-6, completion=75.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    AnthropicModel(
-        name="claude-3-5-haiku-20241022",
-        cost=Cost(prompt=0.80e-6, completion=4.00e-6),
-        context_length=200000,
-        completion_length=8192,
-        supports_vision=False,
-    ),
-    AnthropicModel(
-        name="claude-3-5-sonnet-20240620",
-        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    AnthropicModel(
-        name="claude-3-5-sonnet-20241022",
-        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-    AnthropicModel(
-        name="claude-3-5-haiku-latest",
-        cost=Cost(prompt=1.00e-6, completion=5.00e-6),
-        context_length=200000,
-        completion_length=8192,
-    ),
-    AnthropicModel(
-        name="claude-3-5-sonnet-latest",
-        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
-        context_length=200000,
-        completion_length=4096,
-    ),
-]
-
-
 class AnthropicFinishReason(str, Enum):
     end_turn = "end_turn"
     max_tokens = "max_tokens"
@@ -162,6 +79,14 @@ FINISH_REASON_MAPPING: Dict[AnthropicFinishReason, AdapterFinishReason] = {
     AnthropicFinishReason.tool_use: AdapterFinishReason.tool_calls,
 }
 
+# Larger images are downscaled by Anthropic, which has no detail levels. Low detail
+# images are downscaled as by OpenAI, to about 350 rather than 1600 tokens.
+ANTHROPIC_IMAGE_LIMITS: Dict[str, ImageLimits] = {
+    ImageDetailsType.low.value: ImageLimits(max_long_side=512),
+    ImageDetailsType.high.value: ImageLimits(max_long_side=1568, max_pixels=1_150_000),
+    ImageDetailsType.auto.value: ImageLimits(max_long_side=1568, max_pixels=1_150_000),
+}
+
 
 class AnthropicCreate(BaseModel):
     max_tokens: int
@@ -206,13 +131,7 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
             base_url=base_url,
             api_key=api_key,
             max_retries=0,
-            http_client=Client(
-                limits=Limits(
-                    max_connections=MAX_CONNECTIONS_PER_PROCESS,
-                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-                ),
-                timeout=Timeout(timeout=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
-            ),
+            http_client=self._create_http_client_sync(base_url, api_key),
         )
 
     def _create_client_async(self, base_url: str, api_key: str) -> AsyncAnthropic:
@@ -220,20 +139,48 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
             base_url=base_url,
             api_key=api_key,
             max_retries=0,
-            http_client=AsyncClient(
-                limits=Limits(
-                    max_connections=MAX_CONNECTIONS_PER_PROCESS,
-                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
-                ),
-                timeout=Timeout(timeout=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
-            ),
+            http_client=self._create_http_client_async(base_url, api_key),
         )
 
     def _adjust_temperature(self, temperature: float) -> float:
         return temperature / 2
 
+    def _get_image_limits(self, detail: str) -> Optional[ImageLimits]:
+        return ANTHROPIC_IMAGE_LIMITS.get(detail)
+
+    def _get_batch_api(self) -> BatchAPI:
+        return AnthropicBatchAPI(self)
+
+    def _get_images_limits(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> dict[str, Optional[ImageLimits]]:
+        # Models without vision reject images when params are built
+        if not self.get_model().supports_vision:
+            return {}
+        return {
+            url: self._get_image_limits(detail)
+            for url, detail in get_image_details(messages).items()
+        }
+
     def _get_params(
         self, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        limits = self._get_images_limits(messages)
+        images = image_resolver.resolve_sync(limits.keys(), limits)
+        return self._get_anthropic_params(messages, images, **kwargs)
+
+    async def _get_params_async(
+        self, messages: list[ChatCompletionMessageParam], **kwargs: Any
+    ) -> dict[str, Any]:
+        limits = self._get_images_limits(messages)
+        images = await image_resolver.resolve_async(limits.keys(), limits)
+        return self._get_anthropic_params(messages, images, **kwargs)
+
+    def _get_anthropic_params(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        images: dict[str, ImageBlock],
+        **kwargs: Any,
     ) -> dict[str, Any]:
         system_prompt: Optional[Union[str, Iterable[TextBlockParam]]] = None
 
@@ -244,22 +191,34 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
 
         params = super()._get_params(messages, **kwargs)
 
-        anthropic_messages = params["messages"]
+        # Messages are rewritten into a new list, leaving the caller's untouched
+        anthropic_messages: list[Any] = list(params["messages"])
 
         # Remove trailing whitespace from the last assistant message
-        if len(messages) and messages[-1]["role"] == ConversationRole.assistant.value:
-            if isinstance(messages[-1]["content"], str):
-                messages[-1]["content"] = messages[-1]["content"].rstrip()
-            elif messages[-1]["content"]:
-                messages_content_list = list(messages[-1]["content"])
+        if (
+            len(anthropic_messages)
+            and anthropic_messages[-1]["role"] == ConversationRole.assistant.value
+        ):
+            last_message = anthropic_messages[-1]
+            if isinstance(last_message["content"], str):
+                anthropic_messages[-1] = {
+                    **last_message,
+                    "content": last_message["content"].rstrip(),
+                }
+            elif last_message["content"]:
+                messages_content_list = list(last_message["content"])
                 if messages_content_list[-1]["type"] == "text":
-                    messages_content_list[-1]["text"] = messages_content_list[-1][
-                        "text"
-                    ].rstrip()
-                messages[-1]["content"] = messages_content_list
+                    messages_content_list[-1] = {
+                        **messages_content_list[-1],
+                        "text": messages_content_list[-1]["text"].rstrip(),
+                    }
+                anthropic_messages[-1] = {
+                    **last_message,
+                    "content": messages_content_list,
+                }
 
         # Include base64-encoded images in the request
-        for message in anthropic_messages:
+        for index, message in enumerate(anthropic_messages):
             if (
                 isinstance(message["content"], list)
                 and message["role"] == ConversationRole.user.value
@@ -270,11 +229,9 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
                     if content["type"] == "text":
                         anthropic_content.append(content)
                     elif content["type"] == "image_url":
-                        anthropic_content.append(
-                            process_image_url_anthropic(content["image_url"]["url"])
-                        )
+                        anthropic_content.append(images[content["image_url"]["url"]])
 
-                message["content"] = anthropic_content
+                anthropic_messages[index] = {**message, "content": anthropic_content}
 
         # Convert tools to anthropic format
         openai_tools = params.get("tools")
@@ -313,7 +270,7 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
                 type="tool",
             )
 
-        return AnthropicCreate(
+        anthropic_params = AnthropicCreate(
             max_tokens=params.get("max_tokens", self.get_model().completion_length),
             messages=anthropic_messages,
             metadata=params.get("metadata"),
@@ -327,6 +284,11 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
             top_p=params.get("top_p"),
         ).model_dump()
 
+        # Unset parameters are dumped as None
+        return prune_none_values(  # type: ignore[no-any-return]
+            anthropic_params, {"tools": {}, "tool_choice": {}}
+        )
+
     def _extract_response(
         self, request: Conversation, response: Message
     ) -> AdapterChatCompletion:
@@ -404,32 +366,52 @@ class AnthropicSDKChatProviderAdapter(SDKChatAdapter[Anthropic, AsyncAnthropic])
 
     def _extract_stream_response(
         self, request: Any, response: RawMessageStreamEvent, state: dict[str, Any]
-    ) -> AdapterChatCompletionChunk:
-        choice_chunk = ChoiceChunk(
-            index=0,
-            delta=ChoiceDelta(role=ConversationRole.assistant.value, content=""),
-        )
+    ) -> Optional[AdapterChatCompletionChunk]:
+        content = ""
+        finish_reason: Optional[str] = None
+        usage: Optional[CompletionUsage] = None
+        cost: Optional[float] = None
 
         if isinstance(response, RawMessageStartEvent):
-            state["id"] = response.message.id
-            state["created"] = int(time.time())
+            state["chunk_template"] = ChunkTemplate(
+                id=response.message.id,
+                created=int(time.time()),
+                model=self.get_model().name,
+            )
+            state["prompt_tokens"] = response.message.usage.input_tokens
         elif isinstance(response, RawContentBlockDeltaEvent) and isinstance(
             response.delta, TextDelta
         ):
-            choice_chunk.delta.content = response.delta.text
-        elif isinstance(response, RawMessageDeltaEvent) and response.delta.stop_reason:
-            choice_chunk.finish_reason = FINISH_REASON_MAPPING.get(
-                AnthropicFinishReason(response.delta.stop_reason),
-                AdapterFinishReason.stop,
-            ).value
-
-        return AdapterChatCompletionChunk(
-            id=state["id"],
-            choices=[choice_chunk],
-            created=state["created"],
-            model=self.get_model().name,
-            object="chat.completion.chunk",
-        )
+            content = response.delta.text
+        elif isinstance(response, RawMessageDeltaEvent):
+            if response.delta.stop_reason:
+                finish_reason = FINISH_REASON_MAPPING.get(
+                    AnthropicFinishReason(response.delta.stop_reason),
+                    AdapterFinishReason.stop,
+                ).value
+            # Output tokens are cumulative, the last message delta has the total
+            state["usage"] = self._get_stream_usage(
+                state["prompt_tokens"], response.usage.output_tokens
+            )
+            # Usage is sent on the final chunk, message_stop, or with the stop
+            # reason when empty chunks, message_stop included, are dropped
+            if finish_reason is not None and state.get("drop_empty_chunks"):
+                usage, cost = state.pop("usage")
+        elif isinstance(response, RawMessageStopEvent) and "usage" in state:
+            usage, cost = state.pop("usage")
+
+        # The message start chunk is kept, it is the first one and carries the role
+        if (
+            state.get("drop_empty_chunks")
+            and not content
+            and finish_reason is None
+            and usage is None
+            and not isinstance(response, RawMessageStartEvent)
+        ):
+            return None
+
+        chunk_template: ChunkTemplate = state["chunk_template"]
+        return chunk_template.create(content, finish_reason, usage, cost)
 
     def _extract_completion_response(
         self,
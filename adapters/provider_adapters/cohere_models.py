@@ -0,0 +1,108 @@
+from adapters.types import Cost, Model, Provider, Vendor
+
+
+class CohereModel(Model):
+    provider_name: str = Provider.cohere.value
+    vendor_name: str = Vendor.cohere.value
+
+    supports_completion: bool = False
+    supports_n: bool = False
+    supports_vision: bool = False
+    supports_tools_choice: bool = False
+    supports_max_completion_tokens: bool = False
+    supports_stop: bool = False
+
+    can_empty_content: bool = False
+    can_system_only: bool = False
+    can_min_p: bool = False
+    can_top_p: bool = False
+    can_top_k: bool = False
+
+    def _get_api_path(self) -> str:
+        return self.name
+
+
+MODELS: list[Model] = [
+    CohereModel(
+        name="command-r-plus-04-2024",
+        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command-r-plus-08-2024",
+        cost=Cost(prompt=2.50e-6, completion=10.00e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command-r-plus",
+        cost=Cost(prompt=2.50e-6, completion=10.00e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command-r-03-2024",
+        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command-r-08-2024",
+        cost=Cost(prompt=0.15e-6, completion=0.60e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command-r",
+        cost=Cost(prompt=0.15e-6, completion=0.60e-6),
+        context_length=128000,
+        completion_length=4000,
+    ),
+    CohereModel(
+        name="command",
+        cost=Cost(prompt=1.00e-6, completion=2.00e-6),
+        context_length=4000,
+        completion_length=4000,
+        supports_json_output=False,
+        supports_tools=False,
+    ),
+    CohereModel(
+        name="command-nightly",
+        cost=Cost(prompt=1.00e-6, completion=2.00e-6),
+        context_length=128000,
+        completion_length=128000,
+    ),
+    CohereModel(
+        name="command-light",
+        cost=Cost(prompt=0.30e-6, completion=0.60e-6),
+        context_length=4000,
+        completion_length=4000,
+        supports_json_output=False,
+        supports_tools=False,
+    ),
+    CohereModel(
+        name="command-light-nightly",
+        cost=Cost(prompt=0.30e-6, completion=0.60e-6),
+        context_length=4000,
+        completion_length=4000,
+        supports_json_output=False,
+        supports_tools=False,
+    ),
+    CohereModel(
+        name="c4ai-aya-expanse-8b",
+        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
+        context_length=8000,
+        completion_length=4000,
+        supports_json_output=False,
+        supports_tools=False,
+    ),
+    CohereModel(
+        name="c4ai-aya-expanse-32b",
+        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
+        context_length=128000,
+        completion_length=4000,
+        supports_json_output=False,
+        supports_tools=False,
+    ),
+]
@@ -1,6 +1,6 @@
 from enum import Enum
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from cohere import (
     AsyncClientV2,
@@ -18,9 +18,9 @@ from cohere import (
 from openai.types import CompletionUsage
 from openai.types.chat import ChatCompletionMessage
 from openai.types.chat.chat_completion import Choice
-from openai.types.chat.chat_completion_chunk import Choice as ChoiceChunk, ChoiceDelta
 
 from adapters.abstract_adapters.sdk_chat_adapter import SDKChatAdapter
+from adapters.chunk_template import ChunkTemplate
 from adapters.types import (
     AdapterChatCompletion,
     AdapterChatCompletionChunk,
@@ -28,9 +28,11 @@ from adapters.types import (
     ConversationRole,
     Cost,
     Model,
-    Provider,
     Turn,
-    Vendor,
+)
+from adapters.provider_adapters.cohere_models import (
+    MODELS,
+    CohereModel as CohereModel,
 )
 from openai.types.chat.chat_completion_message_tool_call import (
     ChatCompletionMessageToolCall,
@@ -40,113 +42,6 @@ from openai.types.chat.chat_completion_message_tool_call import (
 from openai.types.chat import ChatCompletionMessageParam
 
 
-class CohereModel(Model):
-    provider_name: str = Provider.cohere.value
-    vendor_name: str = Vendor.cohere.value
-
-    supports_completion: bool = False
-    supports_n: bool = False
-    supports_vision: bool = False
-    supports_tools_choice: bool = False
-    supports_max_completion_tokens: bool = False
-    supports_stop: bool = False
-
-    can_empty_content: bool = False
-    can_system_only: bool = False
-    can_min_p: bool = False
-    can_top_p: bool = False
-    can_top_k: bool = False
-
-    def _get_api_path(self) -> str:
-        return self.name
-
-
-MODELS: list[Model] = [
-    CohereModel(
-        name="command-r-plus-04-2024",
-        cost=Cost(prompt=3.00e-6, completion=15.00e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command-r-plus-08-2024",
-        cost=Cost(prompt=2.50e-6, completion=10.00e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command-r-plus",
-        cost=Cost(prompt=2.50e-6, completion=10.00e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command-r-03-2024",
-        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command-r-08-2024",
-        cost=Cost(prompt=0.15e-6, completion=0.60e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command-r",
-        cost=Cost(prompt=0.15e-6, completion=0.60e-6),
-        context_length=128000,
-        completion_length=4000,
-    ),
-    CohereModel(
-        name="command",
-        cost=Cost(prompt=1.00e-6, completion=2.00e-6),
-        context_length=4000,
-        completion_length=4000,
-        supports_json_output=False,
-        supports_tools=False,
-    ),
-    CohereModel(
-        name="command-nightly",
-        cost=Cost(prompt=1.00e-6, completion=2.00e-6),
-        context_length=128000,
-        completion_length=128000,
-    ),
-    CohereModel(
-        name="command-light",
-        cost=Cost(prompt=0.30e-6, completion=0.60e-6),
-        context_length=4000,
-        completion_length=4000,
-        supports_json_output=False,
-        supports_tools=False,
-    ),
-    CohereModel(
-        name="command-light-nightly",
-        cost=Cost(prompt=0.30e-6, completion=0.60e-6),
-        context_length=4000,
-        completion_length=4000,
-        supports_json_output=False,
-        supports_tools=False,
-    ),
-    CohereModel(
-        name="c4ai-aya-expanse-8b",
-        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
-        context_length=8000,
-        completion_length=4000,
-        supports_json_output=False,
-        supports_tools=False,
-    ),
-    CohereModel(
-        name="c4ai-aya-expanse-32b",
-        cost=Cost(prompt=0.50e-6, completion=1.50e-6),
-        context_length=128000,
-        completion_length=4000,
-        supports_json_output=False,
-        supports_tools=False,
-    ),
-]
-
-
 class CohereFinishReason(str, Enum):
     complete = "COMPLETE"
     max_tokens = "MAX_TOKENS"
@@ -198,10 +93,30 @@ class CohereSDKChatProviderAdapter(SDKChatAdapter[ClientV2, AsyncClientV2]):
         raise NotImplementedError
 
     def _create_client_sync(self, base_url: str, api_key: str) -> ClientV2:
-        return ClientV2(base_url=base_url, api_key=api_key)  # type: ignore
+        return ClientV2(  # type: ignore
+            base_url=base_url,
+            api_key=api_key,
+            timeout=self._get_transport_config().read_timeout,
+            httpx_client=self._create_http_client_sync(
+                base_url, api_key, follow_redirects=True
+            ),
+        )
 
     def _create_client_async(self, base_url: str, api_key: str) -> AsyncClientV2:
-        return AsyncClientV2(base_url=base_url, api_key=api_key)  # type: ignore
+        return AsyncClientV2(  # type: ignore
+            base_url=base_url,
+            api_key=api_key,
+            timeout=self._get_transport_config().read_timeout,
+            httpx_client=self._create_http_client_async(
+                base_url, api_key, follow_redirects=True
+            ),
+        )
+
+    def _get_timeout_params(self, stream: bool) -> dict[str, Any]:
+        # Cohere passes timeout_in_seconds to httpx as is, so an httpx.Timeout keeps
+        # the connect, write and pool timeouts, which a number would replace
+        timeout = self._get_transport_config(per_model=True).get_timeout(stream)
+        return {"request_options": {"timeout_in_seconds": timeout}}
 
     def _adjust_temperature(self, temperature: float) -> float:
         return temperature / 2
@@ -328,16 +243,19 @@ class CohereSDKChatProviderAdapter(SDKChatAdapter[ClientV2, AsyncClientV2]):
 
     def _extract_stream_response(
         self, request: Any, response: StreamedChatResponseV2, state: dict[str, Any]
-    ) -> AdapterChatCompletionChunk:
-        choice_chunk = ChoiceChunk(
-            index=0,
-            delta=ChoiceDelta(role=ConversationRole.assistant.value, content=""),
-        )
+    ) -> Optional[AdapterChatCompletionChunk]:
+        content = ""
+        finish_reason: Optional[str] = None
+        usage: Optional[CompletionUsage] = None
+        cost: Optional[float] = None
 
         # TODO: Add citation support
         if isinstance(response, MessageStartStreamedChatResponseV2):
-            state["id"] = response.id
-            state["created"] = int(time.time())
+            state["chunk_template"] = ChunkTemplate(
+                id=response.id or "",
+                created=int(time.time()),
+                model=self.get_model().name,
+            )
         elif (
             isinstance(response, ContentDeltaStreamedChatResponseV2)
             and isinstance(response.delta, ChatContentDeltaEventDelta)
@@ -347,27 +265,42 @@ class CohereSDKChatProviderAdapter(SDKChatAdapter[ClientV2, AsyncClientV2]):
             )
             and isinstance(response.delta.message.content.text, str)
         ):
-            choice_chunk.delta.content = response.delta.message.content.text
+            content = response.delta.message.content.text
         elif isinstance(response, MessageEndStreamedChatResponseV2):
-            choice_chunk.finish_reason = AdapterFinishReason.stop.value
+            finish_reason = AdapterFinishReason.stop.value
+
+            billed_units = (
+                response.delta.usage.billed_units
+                if response.delta and response.delta.usage
+                else None
+            )
+            usage, cost = self._get_stream_usage(
+                int(billed_units.input_tokens or 0) if billed_units else 0,
+                int(billed_units.output_tokens or 0) if billed_units else 0,
+            )
 
             if isinstance(response.delta, ChatMessageEndEventDelta) and isinstance(
                 response.delta.finish_reason, ChatMessageEndEventDelta
             ):
-                choice_chunk.finish_reason = FINISH_REASON_MAPPING.get(
+                finish_reason = FINISH_REASON_MAPPING.get(
                     CohereFinishReason(response.delta.finish_reason),
                     AdapterFinishReason.stop,
                 ).value
         # else:
         # raise ValueError("Unsupported response")
 
-        return AdapterChatCompletionChunk(
-            id=state["id"],
-            choices=[choice_chunk],
-            created=state["created"],
-            model=self.get_model().name,
-            object="chat.completion.chunk",
-        )
+        # The message start chunk is kept, it is the first one and carries the role
+        if (
+            state.get("drop_empty_chunks")
+            and not content
+            and finish_reason is None
+            and usage is None
+            and not isinstance(response, MessageStartStreamedChatResponseV2)
+        ):
+            return None
+
+        chunk_template: ChunkTemplate = state["chunk_template"]
+        return chunk_template.create(content, finish_reason, usage, cost)
 
     def _extract_completion_response(
         self,
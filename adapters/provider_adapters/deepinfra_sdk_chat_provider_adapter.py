@@ -8,6 +8,7 @@ class DeepInfraModel(Model):
     supports_vision: bool = False
     supports_tools: bool = False
     supports_json_content: bool = False
+    supports_stream_usage: bool = True
 
     can_system_only: bool = False
     can_min_p: bool = False
@@ -1,3 +1,8 @@
+from typing import Optional
+
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletionChunk
+
 from adapters.abstract_adapters.openai_sdk_chat_adapter import OpenAISDKChatAdapter
 from adapters.types import Cost, Model, Provider, Vendor
 
@@ -78,3 +83,11 @@ class GroqSDKChatProviderAdapter(OpenAISDKChatAdapter):
 
     def get_base_sdk_url(self) -> str:
         return "https://api.groq.com/openai/v1"
+
+    def _get_chunk_usage(self, chunk: ChatCompletionChunk) -> Optional[CompletionUsage]:
+        # Groq reports the usage of streams in x_groq
+        if chunk.usage is not None:
+            return chunk.usage
+        x_groq = (chunk.model_extra or {}).get("x_groq")
+        usage = x_groq.get("usage") if isinstance(x_groq, dict) else None
+        return CompletionUsage.model_validate(usage) if usage else None
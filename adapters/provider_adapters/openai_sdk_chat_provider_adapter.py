@@ -1,5 +1,9 @@
+from typing import Optional
+
 from adapters.abstract_adapters.openai_sdk_chat_adapter import OpenAISDKChatAdapter
-from adapters.types import Cost, Model, Provider, Vendor
+from adapters.batch_jobs import BatchAPI, OpenAIBatchAPI
+from adapters.image_processing import ImageLimits
+from adapters.types import Cost, ImageDetailsType, Model, Provider, Vendor
 
 
 class OpenAIModel(Model):
@@ -7,6 +11,7 @@ class OpenAIModel(Model):
     vendor_name: str = Vendor.openai.value
 
     supports_completion: bool = False
+    supports_stream_usage: bool = True
     can_min_p: bool = False
     can_top_k: bool = False
 
@@ -144,6 +149,14 @@ MODELS: list[Model] = [
     ),
 ]
 
+# Low detail images are downscaled to 512x512, others to fit 2048x2048 and then to a
+# shortest side of 768 by OpenAI, auto never uses more than high
+OPENAI_IMAGE_LIMITS: dict[str, ImageLimits] = {
+    ImageDetailsType.low.value: ImageLimits(max_long_side=512),
+    ImageDetailsType.high.value: ImageLimits(max_long_side=2048, max_short_side=768),
+    ImageDetailsType.auto.value: ImageLimits(max_long_side=2048, max_short_side=768),
+}
+
 
 class OpenAISDKChatProviderAdapter(OpenAISDKChatAdapter):
     @staticmethod
@@ -156,3 +169,9 @@ class OpenAISDKChatProviderAdapter(OpenAISDKChatAdapter):
 
     def get_base_sdk_url(self) -> str:
         return "https://api.openai.com/v1"
+
+    def _get_image_limits(self, detail: str) -> Optional[ImageLimits]:
+        return OPENAI_IMAGE_LIMITS.get(detail)
+
+    def _get_batch_api(self) -> BatchAPI:
+        return OpenAIBatchAPI(self)
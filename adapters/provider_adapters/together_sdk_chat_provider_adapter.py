@@ -202,17 +202,34 @@ class TogetherSDKChatProviderAdapter(OpenAISDKChatAdapter):
         if params.get("n") and params.get("temperature") is None:
             params["temperature"] = DEFAULT_TEMPERATURE
 
-        # Keep only last image_url for vision
+        # Keep only last image_url for vision, rewritten messages are copies
+        together_messages: list[Any] = list(params["messages"])
         skiped_image = False
-        for message in reversed(params["messages"]):
-            if isinstance(message["content"], list):
-                for content in reversed(message["content"]):
-                    if content["type"] == "image_url":
-                        if skiped_image:
-                            content["type"] = "text"
-                            content["text"] = content["image_url"]["url"]
-                            del content["image_url"]
-                        else:
-                            skiped_image = True
+        for message_index in reversed(range(len(together_messages))):
+            message = together_messages[message_index]
+            if not isinstance(message["content"], list):
+                continue
+
+            message_content = list(message["content"])
+            rewritten = False
+            for content_index in reversed(range(len(message_content))):
+                content = message_content[content_index]
+                if content["type"] == "image_url":
+                    if skiped_image:
+                        message_content[content_index] = {
+                            "type": "text",
+                            "text": content["image_url"]["url"],
+                        }
+                        rewritten = True
+                    else:
+                        skiped_image = True
+
+            if rewritten:
+                together_messages[message_index] = {
+                    **message,
+                    "content": message_content,
+                }
+
+        params["messages"] = together_messages
 
         return params
@@ -0,0 +1,72 @@
+from typing import NamedTuple
+
+
+class ProviderManifestEntry(NamedTuple):
+    # Module and class name of the adapter, imported on first use
+    adapter_module: str
+    adapter_class: str
+    # Module exposing MODELS, must not import any provider SDK
+    models_module: str
+    # Also register models by their bare name (e.g. "gpt-4o")
+    register_model_names: bool = False
+
+
+def _entry(
+    module: str,
+    adapter_class: str,
+    models_module: str | None = None,
+    register_model_names: bool = False,
+) -> ProviderManifestEntry:
+    return ProviderManifestEntry(
+        adapter_module=f"adapters.provider_adapters.{module}",
+        adapter_class=adapter_class,
+        models_module=f"adapters.provider_adapters.{models_module or module}",
+        register_model_names=register_model_names,
+    )
+
+
+# Static list of provider adapters. OpenAI compatible adapters only depend on the
+# openai SDK, which is always loaded, so their adapter module doubles as the models
+# module. Adapters built on other SDKs keep their models in a separate module so the
+# SDK is only imported once an adapter is requested.
+PROVIDER_MANIFEST: list[ProviderManifestEntry] = [
+    _entry("ai21_sdk_chat_provider_adapter", "AI21SDKChatProviderAdapter"),
+    _entry(
+        "anthropic_sdk_chat_provider_adapter",
+        "AnthropicSDKChatProviderAdapter",
+        models_module="anthropic_models",
+        register_model_names=True,
+    ),
+    _entry("bigmodel_provider_adapter", "BigModelSDKChatProviderAdapter"),
+    _entry("cerebras_sdk_chat_provider_adapter", "CerebrasSDKChatProviderAdapter"),
+    _entry(
+        "cohere_sdk_chat_provider_adapter",
+        "CohereSDKChatProviderAdapter",
+        models_module="cohere_models",
+    ),
+    _entry("deepinfra_sdk_chat_provider_adapter", "DeepInfraSDKChatProviderAdapter"),
+    _entry("fireworks_sdk_chat_provider_adapter", "FireworksSDKChatProviderAdapter"),
+    _entry(
+        "gemini_sdk_chat_provider_adapter",
+        "GeminiSDKChatProviderAdapter",
+        register_model_names=True,
+    ),
+    _entry("groq_sdk_chat_provider_adapter", "GroqSDKChatProviderAdapter"),
+    _entry("lepton_sdk_chat_provider_adapter", "LeptonSDKChatProviderAdapter"),
+    _entry("moescape_sdk_chat_provider_adapter", "MoescapeSDKChatProviderAdapter"),
+    _entry("moonshot_sdk_chat_provider_adapter", "MoonshotSDKChatProviderAdapter"),
+    _entry("octoai_sdk_chat_provider_adapter", "OctoaiSDKChatProviderAdapter"),
+    _entry(
+        "openai_sdk_chat_provider_adapter",
+        "OpenAISDKChatProviderAdapter",
+        register_model_names=True,
+    ),
+    _entry("openrouter_sdk_chat_provider_adapter", "OpenRouterSDKChatProviderAdapter"),
+    _entry("perplexity_sdk_chat_provider_adapter", "PerplexitySDKChatProviderAdapter"),
+    _entry(
+        "tensoropera_sdk_chat_provider_adapter", "TensorOperaSDKChatProviderAdapter"
+    ),
+    _entry("together_sdk_chat_provider_adapter", "TogetherSDKChatProviderAdapter"),
+]
+
+__all__ = ["ProviderManifestEntry", "PROVIDER_MANIFEST"]
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from typing import AsyncGenerator, AsyncIterator, Callable, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from adapters.types import AdapterChatCompletionChunk
+
+
+class StreamCoalescing(BaseModel):
+    """How consecutive content chunks of a stream are merged.
+
+    A chunk is sent once window seconds have passed since the last chunk sent, or
+    once max_bytes of content are held back. Content arriving in between is held
+    back and merged into one chunk, sent with the next chunk, at a finish reason or
+    tool call, or at the end of the stream. Async streams also send it once the
+    window has passed while waiting for the next chunk; sync streams wait for the
+    next chunk.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    window: Optional[float] = 0.02
+    max_bytes: Optional[int] = None
+
+
+def _is_mergeable(chunk: AdapterChatCompletionChunk) -> bool:
+    # Only plain content deltas, finish reasons, tool calls and usage are kept as is
+    if len(chunk.choices) != 1 or chunk.usage is not None:
+        return False
+    choice = chunk.choices[0]
+    delta = choice.delta
+    return (
+        choice.finish_reason is None
+        and choice.logprobs is None
+        and not delta.tool_calls
+        and delta.function_call is None
+        and delta.refusal is None
+    )
+
+
+class ChunkCoalescer:
+    """Merges the content deltas of a stream, see StreamCoalescing.
+
+    Chunks are added as received, add and flush return the chunks to send.
+    """
+
+    def __init__(
+        self,
+        coalescing: StreamCoalescing,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._window = coalescing.window
+        self._max_bytes = coalescing.max_bytes
+        self._clock = clock
+        self._pending: list[AdapterChatCompletionChunk] = []
+        self._pending_bytes = 0
+        self._last_sent: Optional[float] = None
+        # Chunks merged into others rather than sent
+        self.merged_chunks = 0
+
+    def add(
+        self, chunk: AdapterChatCompletionChunk
+    ) -> list[AdapterChatCompletionChunk]:
+        if not _is_mergeable(chunk):
+            chunks = self.flush()
+            chunks.append(chunk)
+            self._last_sent = self._clock()
+            return chunks
+
+        chunks = []
+        if self._pending and not self._is_continuation(chunk):
+            chunks = self.flush()
+
+        self._pending.append(chunk)
+        if self._max_bytes is not None:
+            self._pending_bytes += len(
+                (chunk.choices[0].delta.content or "").encode("utf-8")
+            )
+
+        now = self._clock()
+        if (
+            self._window is not None
+            and (self._last_sent is None or now - self._last_sent >= self._window)
+        ) or (self._max_bytes is not None and self._pending_bytes >= self._max_bytes):
+            chunks.extend(self.flush())
+            self._last_sent = now
+
+        return chunks
+
+    def get_flush_delay(self) -> Optional[float]:
+        """returns the seconds until held back content is due, None if none is held
+        back or it waits for the next chunk"""
+        if not self._pending or self._window is None or self._last_sent is None:
+            return None
+        return max(self._last_sent + self._window - self._clock(), 0.0)
+
+    def flush_due(self) -> list[AdapterChatCompletionChunk]:
+        """returns the held back content once the window has passed"""
+        if self.get_flush_delay() != 0:
+            return []
+        self._last_sent = self._clock()
+        return self.flush()
+
+    def flush(self) -> list[AdapterChatCompletionChunk]:
+        if not self._pending:
+            return []
+
+        pending = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+        if len(pending) == 1:
+            return pending
+
+        self.merged_chunks += len(pending) - 1
+        first = pending[0]
+        choice = first.choices[0]
+        delta = choice.delta.model_copy(
+            update={
+                "content": "".join(
+                    chunk.choices[0].delta.content or "" for chunk in pending
+                )
+            }
+        )
+        return [
+            first.model_copy(
+                update={"choices": [choice.model_copy(update={"delta": delta})]}
+            )
+        ]
+
+    def _is_continuation(self, chunk: AdapterChatCompletionChunk) -> bool:
+        first = self._pending[0]
+        role = chunk.choices[0].delta.role
+        return (
+            chunk.id == first.id
+            and chunk.choices[0].index == first.choices[0].index
+            and (role is None or role == first.choices[0].delta.role)
+        )
+
+
+async def coalesce_async(
+    chunks: AsyncIterator[AdapterChatCompletionChunk], coalescer: ChunkCoalescer
+) -> AsyncGenerator[AdapterChatCompletionChunk, None]:
+    """yields the coalesced chunks of a stream, sending held back content when the
+    window passes while the stream stalls
+
+    Args:
+        chunks: chunks of the stream
+        coalescer: coalescer of the stream
+    """
+    next_chunk: Optional[asyncio.Future[AdapterChatCompletionChunk]] = None
+    try:
+        while True:
+            delay = coalescer.get_flush_delay()
+            if delay is None and next_chunk is None:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+            else:
+                if next_chunk is None:
+                    next_chunk = asyncio.ensure_future(chunks.__anext__())
+                # Waited for in a task, so the wait can end at the deadline
+                done, _ = await asyncio.wait({next_chunk}, timeout=delay)
+                if not done:
+                    for coalesced in coalescer.flush_due():
+                        yield coalesced
+                    continue
+
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_chunk = None
+
+            for coalesced in coalescer.add(chunk):
+                yield coalesced
+
+        for coalesced in coalescer.flush():
+            yield coalesced
+    finally:
+        if next_chunk is not None:
+            next_chunk.cancel()
+            await asyncio.wait({next_chunk})
+            if not next_chunk.cancelled():
+                next_chunk.exception()
+
+
+__all__ = ["StreamCoalescing", "ChunkCoalescer", "coalesce_async"]
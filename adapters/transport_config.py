@@ -0,0 +1,156 @@
+import json
+import threading
+from typing import Any, Optional
+
+from httpx import Limits, Timeout
+from pydantic import BaseModel, ConfigDict
+
+from adapters.constants import (
+    HTTP2,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TIMEOUT,
+    KEEPALIVE_EXPIRY,
+    MAX_CONNECTIONS_PER_PROCESS,
+    MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS,
+    TRANSPORT_CONFIG,
+)
+
+# ADAPTERS_HTTP2 values enabling HTTP/2 for every provider
+HTTP2_ALL_PROVIDERS = ("1", "true", "all", "*")
+
+
+def is_http2_enabled(provider: str, setting: str = HTTP2) -> bool:
+    """Whether ADAPTERS_HTTP2 enables HTTP/2 for the provider
+
+    Args:
+        provider: provider name, e.g. "openai"
+        setting: value of ADAPTERS_HTTP2
+    """
+    setting = setting.strip().lower()
+    if setting in HTTP2_ALL_PROVIDERS:
+        return True
+    return provider.lower() in {name.strip() for name in setting.split(",")}
+
+
+class TransportConfig(BaseModel):
+    """HTTP settings of a provider or model.
+
+    Pool limits, keep-alive expiry and http2 apply to the connection pool of a
+    provider. Timeouts apply per request, so they can also differ between models.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    max_connections: int = MAX_CONNECTIONS_PER_PROCESS
+    max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS_PER_PROCESS
+    keepalive_expiry: float = KEEPALIVE_EXPIRY
+    http2: bool = False
+    # Maximum requests in flight from batches, defaults to max_connections
+    max_concurrency: Optional[int] = None
+
+    connect_timeout: float = HTTP_CONNECT_TIMEOUT
+    read_timeout: float = HTTP_TIMEOUT
+    write_timeout: float = HTTP_TIMEOUT
+    pool_timeout: float = HTTP_TIMEOUT
+    # Maximum wait between two chunks of a stream, defaults to read_timeout. It
+    # replaces read_timeout for streams, so it also bounds the wait for the first
+    # chunk.
+    stream_idle_timeout: Optional[float] = None
+
+    def get_max_concurrency(self) -> int:
+        return self.max_concurrency or self.max_connections
+
+    def get_limits(self) -> Limits:
+        return Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def get_timeout(self, stream: bool = False) -> Timeout:
+        # For streams, httpx applies the read timeout to every chunk, the first one
+        # included
+        read_timeout = self.read_timeout
+        if stream and self.stream_idle_timeout is not None:
+            read_timeout = self.stream_idle_timeout
+
+        return Timeout(
+            connect=self.connect_timeout,
+            read=read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+# Built-in overrides, by provider name or model path. ADAPTERS_TRANSPORT_CONFIG takes
+# precedence over them. Empty: every provider starts from the ADAPTERS_* defaults.
+DEFAULT_TRANSPORT_CONFIGS: dict[str, dict[str, Any]] = {}
+
+
+class TransportConfigRegistry:
+    """Resolves transport configs, model overrides taking precedence over provider
+    overrides, which take precedence over the ADAPTERS_* defaults."""
+
+    def __init__(self, overrides: Optional[dict[str, dict[str, Any]]] = None) -> None:
+        self._overrides: dict[str, dict[str, Any]] = {
+            name: dict(values) for name, values in DEFAULT_TRANSPORT_CONFIGS.items()
+        }
+        self._configs: dict[tuple[str, Optional[str]], TransportConfig] = {}
+        self._lock = threading.Lock()
+
+        for name, values in (overrides or {}).items():
+            self.set_config(name, **values)
+
+    def set_config(self, name: str, **overrides: Any) -> None:
+        """overrides transport settings of a provider or model
+
+        Args:
+            name: provider name (e.g. "groq") or model path (e.g.
+                "openai/openai/o1-mini")
+            overrides: TransportConfig fields to override
+        """
+        # Validates the overrides
+        TransportConfig(**overrides)
+
+        with self._lock:
+            self._overrides[name] = {**self._overrides.get(name, {}), **overrides}
+            self._configs.clear()
+
+    def get_config(
+        self, provider: str, model_path: Optional[str] = None
+    ) -> TransportConfig:
+        """returns the transport config of a provider, or of one of its models
+
+        Args:
+            provider: provider name, e.g. "openai"
+            model_path: model path, e.g. "openai/openai/gpt-4o"
+        """
+        key = (provider, model_path)
+
+        with self._lock:
+            config = self._configs.get(key)
+
+            if config is None:
+                config = TransportConfig(
+                    **{
+                        "http2": is_http2_enabled(provider),
+                        **self._overrides.get(provider, {}),
+                        **(self._overrides.get(model_path, {}) if model_path else {}),
+                    }
+                )
+                self._configs[key] = config
+
+            return config
+
+
+transport_configs = TransportConfigRegistry(
+    json.loads(TRANSPORT_CONFIG) if TRANSPORT_CONFIG else None
+)
+
+__all__ = [
+    "DEFAULT_TRANSPORT_CONFIGS",
+    "TransportConfig",
+    "TransportConfigRegistry",
+    "is_http2_enabled",
+    "transport_configs",
+]
@@ -0,0 +1,243 @@
+import asyncio
+import importlib.util
+import threading
+from typing import Any, Optional, Union
+import warnings
+import weakref
+
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    BaseTransport,
+    Client,
+    HTTPTransport,
+    Request,
+    Response,
+    URL,
+)
+
+from adapters.transport_config import TransportConfig
+
+H2_MISSING_WARNING = (
+    "HTTP/2 requires the h2 package, install it with "
+    "`pip install martian-adapters[http2]`. Using HTTP/1.1 instead."
+)
+
+# (scheme, host, port)
+Origin = tuple[str, str, int]
+# Origin and pool settings of a transport
+PoolKey = tuple[Origin, int, int, float, bool]
+LoopRef = weakref.ref[asyncio.AbstractEventLoop]
+
+
+def get_origin(base_url: str) -> Origin:
+    url = URL(base_url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    return (url.scheme, url.host, port)
+
+
+class SharedTransport(BaseTransport):
+    """Forwards requests to a pooled transport, closing it is left to the pool"""
+
+    def __init__(self, transport: BaseTransport) -> None:
+        self._transport = transport
+
+    def handle_request(self, request: Request) -> Response:
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncSharedTransport(AsyncBaseTransport):
+    """Forwards requests to a pooled transport, closing it is left to the pool"""
+
+    def __init__(self, transport: AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: Request) -> Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class TransportPool:
+    """One connection pool per upstream host, shared by the clients of every api key.
+
+    SDK clients are still created per api key, since they send the key as a request
+    header, but their http clients all go through the transport of their host so
+    keep-alive connections are reused across keys.
+    """
+
+    def __init__(self) -> None:
+        self._transports_sync: dict[PoolKey, HTTPTransport] = {}
+        # Async connections belong to the event loop they were opened on, so async
+        # transports are kept per running loop. Open connections reference their
+        # loop, which is never collected while they are kept, so transports are
+        # dropped once their loop is closed rather than along with it.
+        self._transports_async: dict[LoopRef, dict[PoolKey, AsyncHTTPTransport]] = {}
+        self._transports_async_unbound: dict[PoolKey, AsyncHTTPTransport] = {}
+        self._lock = threading.Lock()
+
+    def _get_loop_transports_async(
+        self, loop: Optional[asyncio.AbstractEventLoop]
+    ) -> dict[PoolKey, AsyncHTTPTransport]:
+        # Must hold the lock
+        if loop is None:
+            return self._transports_async_unbound
+        self._drop_closed_loops()
+        return self._transports_async.setdefault(weakref.ref(loop), {})
+
+    def _drop_closed_loops(self) -> None:
+        # Must hold the lock. Transports of a closed loop cannot be closed anymore,
+        # their connections are released once dropped.
+        for loop_ref in list(self._transports_async):
+            loop = loop_ref()
+            if loop is None or loop.is_closed():
+                del self._transports_async[loop_ref]
+
+    @staticmethod
+    def _get_pool_key(base_url: str, config: TransportConfig) -> PoolKey:
+        # Only the pool settings of the config, timeouts are set per request
+        return (
+            get_origin(base_url),
+            config.max_connections,
+            config.max_keepalive_connections,
+            config.keepalive_expiry,
+            config.http2,
+        )
+
+    # HTTP/2 transports still speak HTTP/1.1 with servers that do not negotiate h2
+    # through ALPN. httpcore offers h2 through ALPN whether or not the h2 package is
+    # installed, and fails once a server picks it, so without h2 HTTP/1.1
+    # transports are used instead, with a warning pointing to the http2 extra.
+    # h2 is only looked up here, never imported by adapters (httpcore itself loads
+    # it along with httpx when it is installed).
+    @staticmethod
+    def _use_http2(config: TransportConfig) -> bool:
+        if not config.http2:
+            return False
+        if importlib.util.find_spec("h2") is None:
+            warnings.warn(H2_MISSING_WARNING, RuntimeWarning, stacklevel=4)
+            return False
+        return True
+
+    def _create_transport_sync(self, config: TransportConfig) -> HTTPTransport:
+        return HTTPTransport(limits=config.get_limits(), http2=self._use_http2(config))
+
+    def _create_transport_async(self, config: TransportConfig) -> AsyncHTTPTransport:
+        return AsyncHTTPTransport(
+            limits=config.get_limits(), http2=self._use_http2(config)
+        )
+
+    def get_transport_sync(
+        self, base_url: str, config: Optional[TransportConfig] = None
+    ) -> HTTPTransport:
+        config = config or TransportConfig()
+        key = self._get_pool_key(base_url, config)
+        with self._lock:
+            transport = self._transports_sync.get(key)
+            if transport is None:
+                transport = self._create_transport_sync(config)
+                self._transports_sync[key] = transport
+            return transport
+
+    def get_transport_async(
+        self, base_url: str, config: Optional[TransportConfig] = None
+    ) -> AsyncHTTPTransport:
+        config = config or TransportConfig()
+        key = self._get_pool_key(base_url, config)
+        try:
+            loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            transports = self._get_loop_transports_async(loop)
+            transport = transports.get(key)
+            if transport is None:
+                transport = self._create_transport_async(config)
+                transports[key] = transport
+            return transport
+
+    def create_http_client_sync(
+        self, base_url: str, config: Optional[TransportConfig] = None, **kwargs: Any
+    ) -> Client:
+        """Creates an http client sending its requests through the pool of base_url
+
+        Args:
+            base_url: url of the upstream the client talks to
+            config: pool settings and default timeouts of the client
+            kwargs: extra arguments for httpx.Client
+        """
+        config = config or TransportConfig()
+        return Client(
+            transport=SharedTransport(self.get_transport_sync(base_url, config)),
+            timeout=config.get_timeout(),
+            **kwargs,
+        )
+
+    def create_http_client_async(
+        self, base_url: str, config: Optional[TransportConfig] = None, **kwargs: Any
+    ) -> AsyncClient:
+        """Creates an async http client sending its requests through the pool of base_url
+
+        Args:
+            base_url: url of the upstream the client talks to
+            config: pool settings and default timeouts of the client
+            kwargs: extra arguments for httpx.AsyncClient
+        """
+        config = config or TransportConfig()
+        return AsyncClient(
+            transport=AsyncSharedTransport(self.get_transport_async(base_url, config)),
+            timeout=config.get_timeout(),
+            **kwargs,
+        )
+
+    def shutdown(self) -> None:
+        """closes the sync connection pools, async ones are dropped
+
+        Use `ashutdown` from async code to close the async pools of its loop.
+        """
+        with self._lock:
+            transports = list(self._transports_sync.values())
+            self._transports_sync.clear()
+            self._transports_async.clear()
+            self._transports_async_unbound.clear()
+
+        for transport in transports:
+            transport.close()
+
+    async def ashutdown(self) -> None:
+        """closes the sync connection pools and the async ones of the running loop,
+        async pools of other loops are dropped"""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            transports: list[Union[HTTPTransport, AsyncHTTPTransport]] = [
+                *self._transports_sync.values(),
+                *self._transports_async.get(weakref.ref(loop), {}).values(),
+                *self._transports_async_unbound.values(),
+            ]
+            self._transports_sync.clear()
+            self._transports_async.clear()
+            self._transports_async_unbound.clear()
+
+        for transport in transports:
+            if isinstance(transport, HTTPTransport):
+                transport.close()
+            else:
+                await transport.aclose()
+
+
+transport_pool = TransportPool()
+
+__all__ = [
+    "AsyncSharedTransport",
+    "SharedTransport",
+    "TransportPool",
+    "get_origin",
+    "transport_pool",
+]
@@ -1,24 +1,31 @@
 from enum import Enum
+import functools
 from typing import (
+    TYPE_CHECKING,
     Any,
     AsyncGenerator,
+    Awaitable,
+    Callable,
     Dict,
     Generator,
     Iterable,
     List,
     Literal,
     Optional,
+    Self,
     Union,
 )
 
 from openai.types.completion import Completion
+from openai.types.completion_usage import CompletionUsage
 from openai.types.chat import (
     ChatCompletion,
     ChatCompletionChunk,
     ChatCompletionMessageToolCall,
 )
 from openai.types.chat.chat_completion_message import FunctionCall
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter
+from pydantic_core import PydanticUndefined
 from openai.types.chat import ChatCompletionMessageParam
 
 
@@ -177,6 +184,8 @@ class Model(BaseModel):
     supports_functions: bool = False  # Deprecated, move to tools
 
     supports_streaming: bool = True
+    # Reports the usage of streams when asked with stream_options
+    supports_stream_usage: bool = False
     supports_vision: bool = True
     supports_n: bool = True
     supports_tools: bool = True
@@ -231,8 +240,23 @@ TurnType = Union[
 ]
 
 
+_turn_adapter: TypeAdapter[TurnType] = TypeAdapter(TurnType)
+
+
 class Conversation(BaseModel):
+    """Turns of a conversation.
+
+    convert_to_openai_format caches the dumped form of each turn, so resending a
+    growing conversation only dumps its new turns. Turns replaced through
+    `conversation[index] = turn`, `turns` assignment or appends are picked up,
+    turns modified in place are not. The cached dicts are shared between calls
+    and must not be modified.
+    """
+
     turns: List[TurnType]
+    # Turns dumped by the last convert_to_openai_format, and their dumped form
+    _dumped_turns: List[TurnType] = PrivateAttr(default_factory=list)
+    _dumps: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
 
     def __init__(
         self,
@@ -256,9 +280,26 @@ class Conversation(BaseModel):
             raise ValueError("Value must be an instance of Turn")
         self.turns[index] = value
 
+    def __eq__(self, other: object) -> bool:
+        # The serialization cache is not part of the value
+        if not isinstance(other, Conversation):
+            return NotImplemented
+        return type(self) is type(other) and self.turns == other.turns
+
     def __len__(self) -> int:
         return len(self.turns)
 
+    def append(self, turn: Union[TurnType, Dict[str, Any]]) -> None:
+        """appends a turn, validating it if given as a dict"""
+        self.turns.append(_turn_adapter.validate_python(turn))
+
+    def extend(self, turns: Iterable[Union[TurnType, Dict[str, Any]]]) -> None:
+        """appends turns, validating those given as dicts
+
+        Only the new turns are dumped by the next convert_to_openai_format.
+        """
+        self.turns.extend(_turn_adapter.validate_python(turn) for turn in turns)
+
     def __iter__(self) -> Any:
         return iter(self.turns)
 
@@ -279,13 +320,140 @@ class Conversation(BaseModel):
         return Prompt("".join([f"{turn.role}: {turn.content}" for turn in self.turns]))
 
     def convert_to_openai_format(self) -> Iterable[ChatCompletionMessageParam]:
-        return self.model_dump()["turns"]  # type: ignore
+        turns = list(self.turns)
+        dumped_turns, dumps = self._dumped_turns, self._dumps
+        count = len(dumped_turns)
+
+        if turns[:count] == dumped_turns:
+            # Only appended turns, the common case, compared by identity first
+            dumps = dumps + [turn.model_dump() for turn in turns[count:]]
+        else:
+            dumps = [
+                dumps[index]
+                if index < count and dumped_turns[index] is turn
+                else turn.model_dump()
+                for index, turn in enumerate(turns)
+            ]
+
+        self._dumped_turns, self._dumps = turns, dumps
+        return list(dumps)  # type: ignore[arg-type]
+
+
+# Responses
+
+
+@functools.cache
+def _get_added_defaults(
+    model: type[BaseModel], source: type[BaseModel]
+) -> tuple[tuple[str, Any], ...]:
+    # Defaults of the fields a wrapping model adds to the model it wraps
+    return tuple(
+        (name, field.default)
+        for name, field in model.model_fields.items()
+        if name not in source.model_fields and field.default is not PydanticUndefined
+    )
+
+
+class LazyFieldsModel(BaseModel):
+    """Response model sharing the fields of the SDK object it wraps.
+
+    Wrapping copies no field values, fields passed as resolvers are computed on
+    first access and on serialization.
+    """
+
+    _lazy_fields: Dict[str, Callable[[], Any]] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def wrap(cls, source: BaseModel, **lazy_fields: Callable[[], Any]) -> Self:
+        """Wraps a parsed response without dumping and rebuilding it.
+
+        Args:
+            source: the parsed response, an instance of a base class of cls.
+            lazy_fields: resolvers for the fields source does not have, or
+                replacing fields of source.
+
+        Returns:
+            An instance of cls sharing the field values of source.
+        """
+        fields = dict(source.__dict__)
+        for name in lazy_fields:
+            fields.pop(name, None)
+        for name, default in _get_added_defaults(cls, source.__class__):
+            if name not in lazy_fields:
+                fields[name] = default
+
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "__dict__", fields)
+        object.__setattr__(
+            instance,
+            "__pydantic_extra__",
+            None
+            if source.__pydantic_extra__ is None
+            else dict(source.__pydantic_extra__),
+        )
+        object.__setattr__(
+            instance,
+            "__pydantic_fields_set__",
+            source.__pydantic_fields_set__ | lazy_fields.keys(),
+        )
+        object.__setattr__(
+            instance, "__pydantic_private__", {"_lazy_fields": lazy_fields}
+        )
+        return instance
+
+    def _resolve_lazy_fields(self) -> None:
+        # Private attributes are unset on instances built by model_construct
+        private = self.__pydantic_private__
+        for name in list(private.get("_lazy_fields", ()) if private else ()):
+            getattr(self, name)
+
+    if not TYPE_CHECKING:
+
+        def __getattr__(self, item: str) -> Any:
+            private = object.__getattribute__(self, "__pydantic_private__")
+            lazy_fields = private.get("_lazy_fields") if private else None
+            if not lazy_fields or item not in lazy_fields:
+                return super().__getattr__(item)
+
+            value = lazy_fields[item]()
+            self.__dict__[item] = value
+            # Replaced rather than updated, copies share the resolvers
+            private["_lazy_fields"] = {
+                name: resolver for name, resolver in lazy_fields.items() if name != item
+            }
+            return value
+
+    def model_dump(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self._resolve_lazy_fields()
+        return super().model_dump(*args, **kwargs)
+
+    def model_dump_json(self, *args: Any, **kwargs: Any) -> str:
+        self._resolve_lazy_fields()
+        return super().model_dump_json(*args, **kwargs)
+
+    def __eq__(self, other: Any) -> bool:
+        self._resolve_lazy_fields()
+        if isinstance(other, LazyFieldsModel):
+            other._resolve_lazy_fields()
+        return super().__eq__(other)
+
+    def __iter__(self) -> Any:
+        self._resolve_lazy_fields()
+        return super().__iter__()
+
+    def __repr_args__(self) -> Any:
+        self._resolve_lazy_fields()
+        return super().__repr_args__()
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        self._resolve_lazy_fields()
+        return super().__getstate__()
 
 
 # Chat
 
 
-class AdapterChatCompletion(ChatCompletion):
+class AdapterChatCompletion(LazyFieldsModel, ChatCompletion):
     cost: float
 
     # Deprecated. Use choices
@@ -294,8 +462,9 @@ class AdapterChatCompletion(ChatCompletion):
     token_counts: Optional[Cost] = None
 
 
-class AdapterChatCompletionChunk(ChatCompletionChunk):
-    pass
+class AdapterChatCompletionChunk(LazyFieldsModel, ChatCompletionChunk):
+    # Set on the chunk carrying the usage of the stream, usually the last one
+    cost: Optional[float] = None
 
 
 class AdapterStreamChatCompletion(BaseModel):
@@ -303,6 +472,8 @@ class AdapterStreamChatCompletion(BaseModel):
         Generator[AdapterChatCompletionChunk, Any, None],
         AsyncGenerator[AdapterChatCompletionChunk, Any],
     ]
+    # Chunks merged into others when coalescing, counted as the stream is consumed
+    merged_chunks: int = 0
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -318,11 +489,11 @@ class AdapterStreamAsyncChatCompletion(AdapterStreamChatCompletion):
 # Completion
 
 
-class AdapterCompletion(Completion):
+class AdapterCompletion(LazyFieldsModel, Completion):
     cost: float
 
 
-class AdapterCompletionChunk(Completion):
+class AdapterCompletionChunk(LazyFieldsModel, Completion):
     pass
 
 
@@ -343,6 +514,79 @@ class AdapterStreamAsyncCompletion(AdapterStreamCompletion):
     response: AsyncGenerator[AdapterCompletionChunk, Any]
 
 
+# Raw
+
+
+class AdapterRawResponse(BaseModel):
+    """Upstream response body, returned as received.
+
+    usage and cost are None if the body has no usage.
+    """
+
+    body: bytes
+    status_code: int
+    headers: Dict[str, str]
+    usage: Optional[CompletionUsage] = None
+    cost: Optional[float] = None
+
+
+class AdapterRawStream(BaseModel):
+    """Upstream SSE stream, yielded as received.
+
+    usage and cost are set once the stream is consumed, if it has usage. Streams
+    not consumed to the end must be closed, to release their connection.
+    """
+
+    response: Union[
+        Generator[bytes, Any, None],
+        AsyncGenerator[bytes, Any],
+    ]
+    status_code: int
+    headers: Dict[str, str]
+    usage: Optional[CompletionUsage] = None
+    cost: Optional[float] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class AdapterRawSyncStream(AdapterRawStream):
+    response: Generator[bytes, Any, None]
+    # Closes the HTTP response, open before the stream is iterated
+    _close_response: Optional[Callable[[], None]] = PrivateAttr(default=None)
+
+    def close(self) -> None:
+        """closes the stream and its HTTP response"""
+        if self._close_response is not None:
+            self._close_response()
+        # Pydantic wraps generators in iterators validating their items
+        close = getattr(self.response, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class AdapterRawAsyncStream(AdapterRawStream):
+    response: AsyncGenerator[bytes, Any]
+    _close_response: Optional[Callable[[], Awaitable[None]]] = PrivateAttr(default=None)
+
+    async def aclose(self) -> None:
+        """closes the stream and its HTTP response"""
+        if self._close_response is not None:
+            await self._close_response()
+        await self.response.aclose()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+
 # Other
 
 
@@ -392,6 +636,10 @@ __all__ = [
     "AdapterStreamCompletion",
     "AdapterStreamSyncCompletion",
     "AdapterStreamAsyncCompletion",
+    "AdapterRawResponse",
+    "AdapterRawStream",
+    "AdapterRawSyncStream",
+    "AdapterRawAsyncStream",
     "Provider",
     "Vendor",
     "ConversationRole",
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Optional
+
+from openai.types.completion_usage import CompletionUsage
+from pydantic import ValidationError
+
+_USAGE_KEY = b'"usage"'
+# Bytes kept after a usage key waiting for its value, usage objects are far smaller
+_MAX_USAGE_SIZE = 4096
+_decoder = json.JSONDecoder()
+
+
+class _Incomplete:
+    pass
+
+
+_INCOMPLETE = _Incomplete()
+
+
+def _decode_usage(data: bytes, index: int) -> Any:
+    colon = data.find(b":", index + len(_USAGE_KEY))
+    if colon == -1:
+        return _INCOMPLETE
+
+    text = data[colon + 1 :].decode("utf-8", "ignore").lstrip()
+    try:
+        value, _ = _decoder.raw_decode(text)
+    except json.JSONDecodeError:
+        return _INCOMPLETE
+    return value
+
+
+class UsageScanner:
+    """Finds the usage of a raw response without parsing the response.
+
+    Bytes are fed as received, from a JSON body or an SSE stream. Only the object
+    following the last "usage" key seen is decoded, e.g. the usage of the final
+    chunk of an OpenAI stream, or the x_groq usage of a Groq stream.
+    """
+
+    def __init__(self) -> None:
+        self.usage: Optional[CompletionUsage] = None
+        # Bytes from an undecoded usage key on, or enough to find a split key
+        self._buffer = b""
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._buffer + chunk if self._buffer else chunk
+        index = data.rfind(_USAGE_KEY)
+        if index != -1:
+            value = _decode_usage(data, index)
+            if value is _INCOMPLETE:
+                # Gives up on a value that never ends, later keys are still found
+                if len(data) - index <= _MAX_USAGE_SIZE:
+                    self._buffer = data[index:]
+                    return
+
+            # Chunks before the last one carry "usage": null
+            if isinstance(value, dict):
+                try:
+                    self.usage = CompletionUsage.model_validate(value)
+                except ValidationError:
+                    pass
+
+        self._buffer = data[-(len(_USAGE_KEY) - 1) :]
+
+
+def extract_usage(body: bytes) -> Optional[CompletionUsage]:
+    """returns the usage of a raw JSON response body
+
+    Args:
+        body: response body, e.g. of a chat completion
+    """
+    scanner = UsageScanner()
+    scanner.feed(body)
+    return scanner.usage
+
+
+__all__ = ["UsageScanner", "extract_usage"]
@@ -0,0 +1,126 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from httpx import URL, Response
+
+from adapters.transport_config import TransportConfig
+from adapters.transport_pool import transport_pool
+
+
+class WarmupTarget(NamedTuple):
+    base_url: str
+    config: Optional[TransportConfig] = None
+
+
+def get_warmup_host(target: WarmupTarget) -> str:
+    return URL(target.base_url).host
+
+
+# Connections are opened by keeping N requests in flight at once, so the pool cannot
+# reuse a connection between them. Once released, they stay in the pool as keep-alive
+# connections. Any response status counts, the request only has to reach the host.
+
+
+def _warmup_host_sync(target: WarmupTarget, connections: int) -> float:
+    start = time.perf_counter()
+
+    with transport_pool.create_http_client_sync(
+        target.base_url, target.config
+    ) as client:
+
+        def open_connection() -> Response:
+            return client.send(
+                client.build_request("HEAD", target.base_url), stream=True
+            )
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            futures = [executor.submit(open_connection) for _ in range(connections)]
+
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                if future.exception() is None:
+                    future.result().close()
+
+    return time.perf_counter() - start
+
+
+async def _warmup_host_async(target: WarmupTarget, connections: int) -> float:
+    start = time.perf_counter()
+
+    async with transport_pool.create_http_client_async(
+        target.base_url, target.config
+    ) as client:
+        results = await asyncio.gather(
+            *(
+                client.send(client.build_request("HEAD", target.base_url), stream=True)
+                for _ in range(connections)
+            ),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, Response):
+                await result.aclose()
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    return time.perf_counter() - start
+
+
+def warmup_sync(targets: Iterable[WarmupTarget], connections: int) -> dict[str, float]:
+    """opens keep-alive connections to every target in parallel
+
+    Args:
+        targets: hosts to connect to
+        connections: number of connections to open per host
+
+    Returns:
+        dict[str, float]: seconds spent warming up each host
+    """
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        durations = list(
+            executor.map(lambda target: _warmup_host_sync(target, connections), targets)
+        )
+
+    return {
+        get_warmup_host(target): duration
+        for target, duration in zip(targets, durations)
+    }
+
+
+async def warmup_async(
+    targets: Iterable[WarmupTarget], connections: int
+) -> dict[str, float]:
+    """opens keep-alive connections to every target concurrently
+
+    Args:
+        targets: hosts to connect to
+        connections: number of connections to open per host
+
+    Returns:
+        dict[str, float]: seconds spent warming up each host
+    """
+    targets = list(dict.fromkeys(targets))
+
+    durations = await asyncio.gather(
+        *(_warmup_host_async(target, connections) for target in targets)
+    )
+
+    return {
+        get_warmup_host(target): duration
+        for target, duration in zip(targets, durations)
+    }
+
+
+__all__ = ["WarmupTarget", "warmup_async", "warmup_sync"]
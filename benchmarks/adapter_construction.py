@@ -0,0 +1,51 @@
+"""Measures per-request adapter acquisition overhead.
+
+Compares creating a fresh adapter with AdapterFactory.get_adapter_by_path
+against fetching a shared one from the adapter pool. Clients are already cached
+in both cases, so this isolates adapter construction.
+
+    poetry run python benchmarks/adapter_construction.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+from adapters import AdapterFactory
+
+MODEL_PATHS = (
+    "openai/openai/gpt-4o-mini",
+    "anthropic/anthropic/claude-3-5-sonnet-latest",
+    "cohere/cohere/command-r",
+)
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "COHERE_API_KEY"):
+        os.environ.setdefault(name, "benchmark-key")
+
+    for model_path in MODEL_PATHS:
+        # Warm up the client cache and the adapter pool
+        AdapterFactory.get_adapter_by_path(model_path)
+        AdapterFactory.get_adapter_by_path(model_path, pooled=True)
+
+        fresh = timeit.timeit(
+            lambda: AdapterFactory.get_adapter_by_path(model_path),
+            number=iterations,
+        )
+        pooled = timeit.timeit(
+            lambda: AdapterFactory.get_adapter_by_path(model_path, pooled=True),
+            number=iterations,
+        )
+
+        print(
+            f"{model_path:<48} fresh {fresh / iterations * 1e6:8.2f} us  "
+            f"pooled {pooled / iterations * 1e6:8.2f} us  "
+            f"({fresh / pooled:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Compares HTTP/1.1 and HTTP/2 connection pools under concurrent streaming.
+
+Starts local stand-in servers streaming server-sent events, one speaking HTTP/1.1
+and one speaking HTTP/2 (cleartext, prior knowledge, standing in for h2 negotiated
+through TLS ALPN), then opens the given number of concurrent streams through each
+and reports the connections accepted by the server and the request latency.
+
+Requires the h2 package:
+
+    pip install "martian-adapters[http2]"
+    poetry run python benchmarks/http2.py [streams]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from typing import NamedTuple
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import ConnectionTerminated, StreamEnded
+from h2.exceptions import StreamClosedError
+from httpx import AsyncClient, AsyncHTTPTransport
+
+from adapters.transport_config import TransportConfig
+
+CHUNKS = 5
+CHUNK_INTERVAL = 0.01
+CHUNK = b'data: {"choices":[{"delta":{"content":"hello"}}]}\n\n'
+
+
+class Result(NamedTuple):
+    connections: int
+    total: float
+    p50: float
+    p99: float
+
+
+class Http1Server:
+    def __init__(self) -> None:
+        self.connections = 0
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                content_length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.lower() == b"content-length":
+                        content_length = int(value)
+                await reader.readexactly(content_length)
+
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: text/event-stream\r\n"
+                    b"Transfer-Encoding: chunked\r\n\r\n"
+                )
+                for _ in range(CHUNKS):
+                    await asyncio.sleep(CHUNK_INTERVAL)
+                    writer.write(b"%x\r\n%s\r\n" % (len(CHUNK), CHUNK))
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class Http2Server:
+    def __init__(self) -> None:
+        self.connections = 0
+
+    async def respond(
+        self, connection: H2Connection, writer: asyncio.StreamWriter, stream_id: int
+    ) -> None:
+        try:
+            connection.send_headers(
+                stream_id,
+                [(":status", "200"), ("content-type", "text/event-stream")],
+            )
+            writer.write(connection.data_to_send())
+            for index in range(CHUNKS):
+                await asyncio.sleep(CHUNK_INTERVAL)
+                connection.send_data(stream_id, CHUNK, end_stream=index == CHUNKS - 1)
+                writer.write(connection.data_to_send())
+        except StreamClosedError:
+            pass
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        connection = H2Connection(H2Configuration(client_side=False))
+        connection.local_settings.max_concurrent_streams = 1000
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+
+        tasks: set[asyncio.Task[None]] = set()
+        try:
+            while data := await reader.read(65536):
+                for event in connection.receive_data(data):
+                    if isinstance(event, StreamEnded):
+                        task = asyncio.create_task(
+                            self.respond(connection, writer, event.stream_id)
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    elif isinstance(event, ConnectionTerminated):
+                        return
+                writer.write(connection.data_to_send())
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run_streams(
+    url: str, transport: AsyncHTTPTransport, streams: int
+) -> list[float]:
+    async with AsyncClient(transport=transport, timeout=60) as client:
+
+        async def stream() -> float:
+            start = time.perf_counter()
+            async with client.stream("POST", url, json={"stream": True}) as response:
+                async for _ in response.aiter_bytes():
+                    pass
+            return time.perf_counter() - start
+
+        return await asyncio.gather(*(stream() for _ in range(streams)))
+
+
+async def benchmark(http2: bool, streams: int) -> Result:
+    server = Http2Server() if http2 else Http1Server()
+    tcp_server = await asyncio.start_server(
+        server.handle, "127.0.0.1", 0, backlog=streams * 2
+    )
+    port = tcp_server.sockets[0].getsockname()[1]
+
+    limits = TransportConfig().get_limits()
+    transport = (
+        AsyncHTTPTransport(limits=limits, http1=False, http2=True)
+        if http2
+        else AsyncHTTPTransport(limits=limits)
+    )
+
+    start = time.perf_counter()
+    latencies = sorted(
+        await run_streams(f"http://127.0.0.1:{port}/v1/chat", transport, streams)
+    )
+    total = time.perf_counter() - start
+
+    tcp_server.close()
+
+    return Result(
+        connections=server.connections,
+        total=total,
+        p50=statistics.median(latencies),
+        p99=latencies[int(len(latencies) * 0.99) - 1],
+    )
+
+
+def main() -> None:
+    streams = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    for name, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+        result = asyncio.run(benchmark(http2, streams))
+        print(
+            f"{name:<8} {streams} streams  connections {result.connections:4d}  "
+            f"total {result.total * 1000:7.1f} ms  "
+            f"p50 {result.p50 * 1000:7.1f} ms  p99 {result.p99 * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
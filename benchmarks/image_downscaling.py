@@ -0,0 +1,51 @@
+"""Measures the upload size of vision images downscaled to the OpenAI limits.
+
+Builds a photo-like JPEG data: url and compares its size with the data url sent for
+each detail level, along with the time spent downscaling. Requires Pillow
+(`pip install "martian-adapters[images]"`).
+
+    poetry run python benchmarks/image_downscaling.py [width] [height]
+"""
+
+import base64
+import io
+import sys
+import time
+
+from PIL import Image
+
+from adapters.image_processing import ImageProcessor
+from adapters.provider_adapters.openai_sdk_chat_provider_adapter import (
+    OPENAI_IMAGE_LIMITS,
+)
+
+
+def get_data_url(width: int, height: int) -> str:
+    # Noise compresses about as badly as a photo
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return "data:image/jpeg;base64," + base64.b64encode(output.getvalue()).decode()
+
+
+def main() -> None:
+    width = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    height = int(sys.argv[2]) if len(sys.argv) > 2 else 3000
+
+    url = get_data_url(width, height)
+    print(f"{'original':<10} {width}x{height}  {len(url) / 1e6:7.2f} MB")
+
+    # Without a cache, every request downscales its images again
+    processor = ImageProcessor()
+    for detail, limits in OPENAI_IMAGE_LIMITS.items():
+        start = time.perf_counter()
+        downscaled = processor.downscale_data_url(url, limits)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{detail:<10} {len(downscaled) / 1e6:7.2f} MB  "
+            f"{elapsed * 1e3:7.1f} ms to downscale"
+        )
+
+
+if __name__ == "__main__":
+    main()
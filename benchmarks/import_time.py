@@ -0,0 +1,91 @@
+"""Measures `import adapters` time and peak memory in a fresh interpreter.
+
+Compares the lazy default against eagerly importing every provider adapter,
+which is what `import adapters` used to do, and against `import httpx` alone, whose
+share includes h2 when it is installed, as httpcore loads it along with httpx.
+
+    poetry run python benchmarks/import_time.py [runs]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from typing import NamedTuple
+
+HTTPX = "import httpx"
+LAZY = "import adapters"
+EAGER = (
+    "import adapters\n"
+    "from adapters.provider_manifest import PROVIDER_MANIFEST\n"
+    "import importlib\n"
+    "for entry in PROVIDER_MANIFEST:\n"
+    "    importlib.import_module(entry.adapter_module)"
+)
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "sdks": sorted(m for m in ("anthropic", "cohere", "h2", "openai") if m in sys.modules),
+}}))
+"""
+
+
+class Result(NamedTuple):
+    median_ms: float
+    max_rss_mb: float
+    modules: int
+    sdks: list[str]
+
+
+def measure(code: str, runs: int) -> Result:
+    samples = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", PROBE.format(code=code)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    return Result(
+        median_ms=statistics.median(s["seconds"] for s in samples) * 1000,
+        max_rss_mb=statistics.median(s["max_rss_kb"] for s in samples) / 1024,
+        modules=samples[-1]["modules"],
+        sdks=samples[-1]["sdks"],
+    )
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # Warm up the bytecode cache so the first run is not an outlier
+    measure(EAGER, 1)
+
+    lazy = measure(LAZY, runs)
+    eager = measure(EAGER, runs)
+    httpx = measure(HTTPX, runs)
+
+    for name, result in (("eager", eager), ("lazy", lazy), ("httpx", httpx)):
+        print(
+            f"{name:>5}: {result.median_ms:8.1f} ms  "
+            f"{result.max_rss_mb:6.1f} MB  "
+            f"{result.modules:5d} modules  sdks={result.sdks}"
+        )
+
+    print(
+        f"saved: {eager.median_ms - lazy.median_ms:.1f} ms, "
+        f"{eager.max_rss_mb - lazy.max_rss_mb:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compares recursive and schema-aware None pruning of request payloads.
+
+Builds a request with 50 tools, each with a nested JSON schema, and a
+conversation holding 1 MB base64 images, then times delete_none_values, which
+walks and rebuilds every nested dict and list, against prune_none_values, which
+only visits the keys that can hold unset values.
+
+    poetry run python benchmarks/none_pruning.py [tools] [images] [iterations]
+"""
+
+import sys
+import timeit
+from typing import Any
+
+from adapters.general_utils import (
+    REQUEST_PRUNE_SCHEMA,
+    delete_none_values,
+    prune_none_values,
+)
+
+
+def get_tool(index: int) -> dict[str, Any]:
+    return {
+        "type": "function",
+        "function": {
+            "name": f"tool_{index}",
+            "description": f"Tool number {index}",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    f"field_{field}": {
+                        "type": "object",
+                        "description": f"Field {field}",
+                        "properties": {
+                            "value": {"type": "string", "enum": ["a", "b", "c"]},
+                            "count": {"type": "integer", "minimum": 0},
+                        },
+                        "required": ["value"],
+                    }
+                    for field in range(10)
+                },
+                "required": ["field_0"],
+            },
+        },
+    }
+
+
+def get_request(tools: int, images: int) -> dict[str, Any]:
+    image_url = "data:image/png;base64," + "A" * 1024 * 1024
+    messages: list[dict[str, Any]] = [{"role": "system", "content": "Be helpful."}]
+    for index in range(images):
+        messages.append(
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": f"Image {index}"},
+                    {"type": "image_url", "image_url": {"url": image_url}},
+                ],
+            }
+        )
+        messages.append({"role": "assistant", "content": f"Answer {index}"})
+
+    return {
+        "messages": messages,
+        "tools": [get_tool(index) for index in range(tools)],
+        "tool_choice": "auto",
+        "temperature": 0.5,
+        "max_tokens": None,
+        "top_p": None,
+    }
+
+
+def main() -> None:
+    tools = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    images = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    recursive_request = get_request(tools, images)
+    schema_request = get_request(tools, images)
+
+    # delete_none_values prunes in place, later calls still walk the whole payload
+    recursive = timeit.timeit(
+        lambda: delete_none_values(recursive_request), number=iterations
+    )
+    schema_aware = timeit.timeit(
+        lambda: prune_none_values(schema_request, REQUEST_PRUNE_SCHEMA),
+        number=iterations,
+    )
+
+    print(
+        f"{tools} tools, {images} x 1 MB images  "
+        f"delete_none_values {recursive / iterations * 1e6:8.1f} us  "
+        f"prune_none_values {schema_aware / iterations * 1e6:8.1f} us  "
+        f"({recursive / schema_aware:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures request normalization on long conversations.
+
+Builds a 500-turn conversation (system prompt, alternating user and assistant
+turns, a few empty and repeated turns) and times SDKChatAdapter._get_params for
+models needing different sets of transforms.
+
+    poetry run python benchmarks/normalization.py [turns] [iterations]
+"""
+
+import copy
+import os
+import sys
+import time
+from typing import Any
+
+from adapters import AdapterFactory
+
+MODEL_PATHS = (
+    # Accepts any conversation
+    "openai/openai/gpt-4o",
+    # Empty content and role placement rules
+    "anthropic/anthropic/claude-3-5-sonnet-latest",
+    # Also joins repeating roles
+    "lepton/mistralai/mixtral-8x7b",
+)
+
+
+def get_conversation(turns: int) -> list[dict[str, Any]]:
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "You are a helpful assistant."}
+    ]
+    for index in range(turns):
+        role = "user" if index % 2 == 0 else "assistant"
+        content = "" if index % 50 == 49 else f"Turn {index}: " + "lorem ipsum " * 20
+        messages.append({"role": role, "content": content})
+        if index % 100 == 0:
+            messages.append({"role": role, "content": "Repeated turn"})
+    return messages
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    for name in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "LEPTON_API_KEY"):
+        os.environ.setdefault(name, "benchmark-key")
+
+    conversation = get_conversation(turns)
+
+    for model_path in MODEL_PATHS:
+        adapter = AdapterFactory.get_adapter_by_path(model_path)
+        assert adapter
+
+        # Normalization may rewrite messages, every call gets its own copy
+        conversations = [copy.deepcopy(conversation) for _ in range(iterations)]
+
+        start = time.perf_counter()
+        for messages in conversations:
+            adapter._get_params(messages)  # type: ignore[attr-defined]
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{model_path:<48} {turns} turns  "
+            f"{elapsed / iterations * 1e6:9.1f} us per call"
+        )
+
+
+if __name__ == "__main__":
+    main()
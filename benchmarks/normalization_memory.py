@@ -0,0 +1,81 @@
+"""Measures the memory allocated by request normalization.
+
+Builds a conversation holding a multi-MB base64 image and reports the peak memory
+allocated by SDKChatAdapter._get_params, which leaves the caller's messages
+untouched, against deep copying the conversation first as callers had to when
+normalization rewrote messages in place.
+
+    poetry run python benchmarks/normalization_memory.py [image_megabytes]
+"""
+
+import copy
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+from adapters import AdapterFactory
+
+MODEL_PATHS = (
+    "openai/openai/gpt-4o",
+    "together/meta-llama/Llama-3.2-11B-Vision-Instruct-Turbo",
+)
+
+
+def get_conversation(image_megabytes: int) -> list[dict[str, Any]]:
+    image_url = "data:image/png;base64," + "A" * image_megabytes * 1024 * 1024
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": "You are a helpful assistant."}
+    ]
+    for index in range(200):
+        messages.append({"role": "user", "content": f"Question {index}"})
+        messages.append({"role": "assistant", "content": f"Answer {index}"})
+    messages.append(
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "What is in this image?"},
+                {"type": "image_url", "image_url": {"url": image_url}},
+            ],
+        }
+    )
+    return messages
+
+
+def measure(call: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+def main() -> None:
+    image_megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    for name in ("OPENAI_API_KEY", "TOGETHER_API_KEY"):
+        os.environ.setdefault(name, "benchmark-key")
+
+    conversation = get_conversation(image_megabytes)
+
+    for model_path in MODEL_PATHS:
+        adapter: Any = AdapterFactory.get_adapter_by_path(model_path)
+        assert adapter
+
+        # Warm up lazily compiled state
+        adapter._get_params(list(conversation))
+
+        in_place = measure(lambda: adapter._get_params(list(conversation)))
+        deep_copy = measure(lambda: adapter._get_params(copy.deepcopy(conversation)))
+
+        print(
+            f"{model_path:<56} {image_megabytes} MB image  "
+            f"copy-free {in_place / 1024:10.1f} KiB  "
+            f"deepcopy {deep_copy / 1024:10.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
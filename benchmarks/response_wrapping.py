@@ -0,0 +1,93 @@
+"""Measures the cost of turning SDK stream chunks into adapter chunks.
+
+Parses a 2k-token chat completion stream into ChatCompletionChunk objects, as
+the OpenAI SDK does, then compares rebuilding every chunk from model_dump with
+model_construct against wrapping it with LazyFieldsModel.wrap, which shares the
+parsed fields. Reports the memory allocated and the CPU time spent per chunk.
+
+    poetry run python benchmarks/response_wrapping.py [tokens] [iterations]
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from openai.types.chat import ChatCompletionChunk
+
+from adapters.types import AdapterChatCompletionChunk
+
+
+def get_chunks(tokens: int) -> list[ChatCompletionChunk]:
+    return [
+        ChatCompletionChunk.model_validate(
+            {
+                "id": "chatcmpl-benchmark",
+                "object": "chat.completion.chunk",
+                "created": 1700000000,
+                "model": "gpt-4o",
+                "system_fingerprint": "fp_benchmark",
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": f" token{index}"},
+                        "logprobs": None,
+                        "finish_reason": "stop" if index == tokens - 1 else None,
+                    }
+                ],
+            }
+        )
+        for index in range(tokens)
+    ]
+
+
+def rebuild(chunk: ChatCompletionChunk) -> AdapterChatCompletionChunk:
+    return AdapterChatCompletionChunk.model_construct(**chunk.model_dump())
+
+
+def wrap(chunk: ChatCompletionChunk) -> AdapterChatCompletionChunk:
+    return AdapterChatCompletionChunk.wrap(chunk)
+
+
+def measure_memory(
+    convert: Callable[[ChatCompletionChunk], Any], chunks: list[ChatCompletionChunk]
+) -> float:
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    # Chunks are kept alive, as consumers collecting a stream do
+    converted = [convert(chunk) for chunk in chunks]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del converted
+    return (end - start) / len(chunks)
+
+
+def measure_cpu(
+    convert: Callable[[ChatCompletionChunk], Any],
+    chunks: list[ChatCompletionChunk],
+    iterations: int,
+) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        for chunk in chunks:
+            convert(chunk)
+    return (time.process_time() - start) / (iterations * len(chunks))
+
+
+def main() -> None:
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    chunks = get_chunks(tokens)
+
+    for name, convert in (("model_dump rebuild", rebuild), ("wrap", wrap)):
+        memory = measure_memory(convert, chunks)
+        cpu = measure_cpu(convert, chunks, iterations)
+        print(
+            f"{name:<20} {tokens} chunks  "
+            f"{memory:8.0f} B per chunk  {cpu * 1e6:7.2f} us per chunk"
+        )
+
+
+if __name__ == "__main__":
+    main()
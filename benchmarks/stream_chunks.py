@@ -0,0 +1,144 @@
+"""Measures converting Anthropic and Cohere stream events into chunks.
+
+Builds a long stream of text delta events, already parsed by the provider SDK,
+and times _extract_stream_response, which builds chunks from a template
+validated once per stream, against validating a delta, choice and chunk for
+every event as the adapters did before.
+
+    poetry run python benchmarks/stream_chunks.py [tokens] [iterations]
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable
+
+from anthropic.types import (
+    Message,
+    RawContentBlockDeltaEvent,
+    RawMessageStartEvent,
+    TextDelta,
+    Usage,
+)
+from cohere import (
+    ChatContentDeltaEventDelta,
+    ChatContentDeltaEventDeltaMessage,
+    ChatContentDeltaEventDeltaMessageContent,
+    ContentDeltaStreamedChatResponseV2,
+    MessageStartStreamedChatResponseV2,
+)
+from openai.types.chat.chat_completion_chunk import Choice as ChoiceChunk, ChoiceDelta
+
+from adapters import AdapterFactory
+from adapters.types import AdapterChatCompletionChunk
+
+MODEL_PATHS = {
+    "anthropic": "anthropic/anthropic/claude-3-5-sonnet-latest",
+    "cohere": "cohere/cohere/command-r-plus",
+}
+
+
+def get_anthropic_events(tokens: int) -> tuple[Any, list[Any]]:
+    start = RawMessageStartEvent(
+        type="message_start",
+        message=Message(
+            id="msg_benchmark",
+            type="message",
+            role="assistant",
+            model="claude-3-5-sonnet-latest",
+            content=[],
+            usage=Usage(input_tokens=10, output_tokens=1),
+        ),
+    )
+    events = [
+        RawContentBlockDeltaEvent(
+            type="content_block_delta",
+            index=0,
+            delta=TextDelta(type="text_delta", text=f" token{index}"),
+        )
+        for index in range(tokens)
+    ]
+    return start, events
+
+
+def get_cohere_events(tokens: int) -> tuple[Any, list[Any]]:
+    start = MessageStartStreamedChatResponseV2(type="message-start", id="benchmark")
+    events = [
+        ContentDeltaStreamedChatResponseV2(
+            type="content-delta",
+            index=0,
+            delta=ChatContentDeltaEventDelta(
+                message=ChatContentDeltaEventDeltaMessage(
+                    content=ChatContentDeltaEventDeltaMessageContent(
+                        text=f" token{index}"
+                    )
+                )
+            ),
+        )
+        for index in range(tokens)
+    ]
+    return start, events
+
+
+def validate_chunk(content: str, state: dict[str, Any]) -> AdapterChatCompletionChunk:
+    # Per event validation, as _extract_stream_response did before
+    choice_chunk = ChoiceChunk(index=0, delta=ChoiceDelta(role="assistant", content=""))
+    choice_chunk.delta.content = content
+    return AdapterChatCompletionChunk(
+        id="benchmark",
+        choices=[choice_chunk],
+        created=state["created"],
+        model="benchmark",
+        object="chat.completion.chunk",
+    )
+
+
+def measure(convert: Callable[[Any], Any], events: list[Any], iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        for event in events:
+            convert(event)
+    return (time.process_time() - start) / (iterations * len(events))
+
+
+def main() -> None:
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    for name in ("ANTHROPIC_API_KEY", "COHERE_API_KEY"):
+        os.environ.setdefault(name, "benchmark-key")
+
+    for provider, get_events in (
+        ("anthropic", get_anthropic_events),
+        ("cohere", get_cohere_events),
+    ):
+        adapter: Any = AdapterFactory.get_adapter_by_path(MODEL_PATHS[provider])
+        assert adapter
+
+        start, events = get_events(tokens)
+        state: dict[str, Any] = {}
+        adapter._extract_stream_response(None, start, state)
+        state["created"] = 0
+
+        template = measure(
+            lambda event: adapter._extract_stream_response(None, event, state),
+            events,
+            iterations,
+        )
+        validated = measure(
+            lambda event: validate_chunk(event.delta.text, state)
+            if provider == "anthropic"
+            else validate_chunk(event.delta.message.content.text, state),
+            events,
+            iterations,
+        )
+
+        print(
+            f"{provider:<10} {tokens} tokens  "
+            f"validated {validated * 1e6:6.2f} us  "
+            f"template {template * 1e6:6.2f} us per token"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
-from adapters import AdapterFactory
+from concurrent.futures import ThreadPoolExecutor
+import subprocess
+import sys
+
+import pytest
+
+from adapters import AdapterException, AdapterFactory, SDKChatAdapter
+from adapters.adapter_pool import adapter_pool
 
 
 def test_supported_models_length_nonzero() -> None:
@@ -14,3 +21,114 @@ def test_supported_models_work() -> None:
 def test_non_zero_length() -> None:
     for model in AdapterFactory.get_supported_models():
         assert model.context_length > 0
+
+
+def test_model_name_aliases() -> None:
+    for name in ("gpt-4o", "claude-3-5-sonnet-latest", "gemini-1.5-flash"):
+        model = AdapterFactory.get_model_by_path(name)
+        assert model is not None
+        assert AdapterFactory.get_adapter_by_path(name)
+
+
+def test_provider_sdks_imported_lazily() -> None:
+    code = (
+        "import sys\n"
+        "from adapters import AdapterFactory\n"
+        "assert 'anthropic' not in sys.modules\n"
+        "assert 'cohere' not in sys.modules\n"
+        "assert AdapterFactory.get_adapter_by_path("
+        "'anthropic/anthropic/claude-3-haiku-20240307')\n"
+        "assert 'anthropic' in sys.modules\n"
+        "assert 'cohere' not in sys.modules\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_supported_models_filters() -> None:
+    models = AdapterFactory._model_list
+
+    assert AdapterFactory.get_supported_models(
+        supports_vision=True, supports_tools=True
+    ) == [model for model in models if model.supports_vision and model.supports_tools]
+
+    assert AdapterFactory.get_supported_models(
+        capabilities={"can_system": False, "supports_streaming": True}
+    ) == [
+        model for model in models if not model.can_system and model.supports_streaming
+    ]
+
+    assert AdapterFactory.get_supported_models(
+        provider=["openai", "anthropic"], min_context_length=128000
+    ) == [
+        model
+        for model in models
+        if model.provider_name in ("openai", "anthropic")
+        and model.context_length >= 128000
+    ]
+
+    assert AdapterFactory.get_supported_models(
+        vendor="meta-llama", max_context_length=8192
+    ) == [
+        model
+        for model in models
+        if model.vendor_name == "meta-llama" and model.context_length <= 8192
+    ]
+
+    assert AdapterFactory.get_supported_models(min_context_length=10**9) == []
+
+
+def test_supported_models_unknown_capability() -> None:
+    with pytest.raises(ValueError):
+        AdapterFactory.get_supported_models(capabilities={"can_fly": True})
+
+
+def test_supported_models_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("ADAPTER_DISABLED_MODELS", "gpt-4o,gpt-4o-mini")
+
+    names = {model.name for model in AdapterFactory.get_supported_models()}
+
+    assert "gpt-4o" not in names
+    assert "gpt-4o-mini" not in names
+    assert "gpt-4-turbo" in names
+
+
+def test_pooled_adapters_are_shared() -> None:
+    path = "openai/openai/gpt-4o-mini"
+
+    adapter = AdapterFactory.get_adapter_by_path(path, pooled=True)
+
+    assert adapter is AdapterFactory.get_adapter_by_path(path, pooled=True)
+    assert adapter is not AdapterFactory.get_adapter_by_path(path)
+    assert adapter is not AdapterFactory.get_adapter_by_path(
+        path, api_key="other-key", pooled=True
+    )
+    assert AdapterFactory.get_adapter_by_path("unknown/model", pooled=True) is None
+
+
+def test_pooled_adapters_are_immutable() -> None:
+    adapter = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-haiku-20240307", pooled=True
+    )
+    assert isinstance(adapter, SDKChatAdapter)
+
+    with pytest.raises(AdapterException):
+        adapter.set_api_key("other-key")
+
+    with pytest.raises(AdapterException):
+        adapter._set_current_model(adapter.get_model())
+
+
+def test_pooled_adapters_concurrent_creation() -> None:
+    path = "groq/meta-llama/llama3-8b-8192"
+    adapter_pool.clear()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        adapters = list(
+            executor.map(
+                lambda _: AdapterFactory.get_adapter_by_path(path, pooled=True),
+                range(32),
+            )
+        )
+
+    assert all(adapter is adapters[0] for adapter in adapters)
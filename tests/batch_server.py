@@ -0,0 +1,338 @@
+"""Local stand-in for the OpenAI and Anthropic batch APIs.
+
+Implements the endpoints used by BatchJob: OpenAI file uploads, batches and file
+contents, and Anthropic message batches and their results. Batches end after being
+polled polls_until_ended times, requests are answered with "echo: <last message>",
+and fail if their last message contains "fail".
+
+    with BatchServer() as server:
+        adapter base url -> server.url (Anthropic) or server.url + "/v1" (OpenAI)
+"""
+
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import re
+import threading
+import time
+from types import TracebackType
+from typing import Any, Optional
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, bytes]:
+    message: Any = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(
+            decode=True
+        )
+        for part in message.iter_parts()
+    }
+
+
+def _get_text(messages: list[Any]) -> str:
+    content = messages[-1]["content"]
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") for part in content)
+
+
+def _get_jsonl(lines: list[Any]) -> bytes:
+    return b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+
+class BatchServer:
+    def __init__(self, polls_until_ended: int = 1) -> None:
+        self.polls_until_ended = polls_until_ended
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._get_handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            # Polled for shutdown, which is otherwise noticed after half a second
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def __enter__(self) -> "BatchServer":
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _get_id(self, prefix: str) -> str:
+        return f"{prefix}_{len(self.files) + len(self.batches)}"
+
+    # OpenAI
+
+    def _create_file(self, content: bytes) -> dict[str, Any]:
+        file_id = self._get_id("file")
+        self.files[file_id] = content
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": "batch.jsonl",
+            "purpose": "batch",
+            "status": "processed",
+        }
+
+    def _get_openai_batch(self, batch: dict[str, Any]) -> dict[str, Any]:
+        return {key: value for key, value in batch.items() if key != "polls"}
+
+    def _end_openai_batch(self, batch: dict[str, Any], cancelled: bool) -> None:
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            body = request["body"]
+            text = _get_text(body["messages"])
+            result: dict[str, Any] = {
+                "id": f"batch_req_{request['custom_id']}",
+                "custom_id": request["custom_id"],
+                "error": None,
+            }
+            if cancelled:
+                result["response"] = None
+                result["error"] = {"code": "batch_cancelled", "message": "Cancelled"}
+                errors.append(result)
+            elif "fail" in text:
+                result["response"] = {
+                    "status_code": 400,
+                    "body": {"error": {"message": "Invalid request", "type": "fail"}},
+                }
+                errors.append(result)
+            else:
+                result["response"] = {
+                    "status_code": 200,
+                    "body": {
+                        "id": f"chatcmpl-{request['custom_id']}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {
+                                    "role": "assistant",
+                                    "content": f"echo: {text}",
+                                },
+                                "finish_reason": "stop",
+                                "logprobs": None,
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": 10,
+                            "completion_tokens": 5,
+                            "total_tokens": 15,
+                        },
+                    },
+                }
+                outputs.append(result)
+
+        batch["status"] = "cancelled" if cancelled else "completed"
+        batch["request_counts"] = {
+            "total": len(outputs) + len(errors),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+        if outputs:
+            batch["output_file_id"] = self._create_file(_get_jsonl(outputs))["id"]
+        if errors:
+            batch["error_file_id"] = self._create_file(_get_jsonl(errors))["id"]
+
+    def _retrieve_openai_batch(self, batch: dict[str, Any]) -> dict[str, Any]:
+        batch["polls"] += 1
+        if batch["status"] == "cancelling":
+            self._end_openai_batch(batch, cancelled=True)
+        elif batch["status"] == "in_progress":
+            if batch["polls"] >= self.polls_until_ended:
+                self._end_openai_batch(batch, cancelled=False)
+        return self._get_openai_batch(batch)
+
+    # Anthropic
+
+    def _get_anthropic_batch(self, batch: dict[str, Any]) -> dict[str, Any]:
+        return {
+            key: value
+            for key, value in batch.items()
+            if key not in ("polls", "requests", "results")
+        }
+
+    def _end_anthropic_batch(self, batch: dict[str, Any], cancelled: bool) -> None:
+        results = []
+        counts = {"processing": 0, "succeeded": 0, "errored": 0, "canceled": 0}
+        for request in batch["requests"]:
+            params = request["params"]
+            text = _get_text(params["messages"])
+            result: dict[str, Any]
+            if cancelled:
+                result = {"type": "canceled"}
+                counts["canceled"] += 1
+            elif "fail" in text:
+                result = {
+                    "type": "errored",
+                    "error": {
+                        "type": "error",
+                        "error": {"type": "invalid_request_error", "message": "fail"},
+                    },
+                }
+                counts["errored"] += 1
+            else:
+                result = {
+                    "type": "succeeded",
+                    "message": {
+                        "id": f"msg_{request['custom_id']}",
+                        "type": "message",
+                        "role": "assistant",
+                        "model": params["model"],
+                        "content": [{"type": "text", "text": f"echo: {text}"}],
+                        "stop_reason": "end_turn",
+                        "stop_sequence": None,
+                        "usage": {"input_tokens": 10, "output_tokens": 5},
+                    },
+                }
+                counts["succeeded"] += 1
+            results.append({"custom_id": request["custom_id"], "result": result})
+
+        batch["results"] = _get_jsonl(results)
+        batch["processing_status"] = "ended"
+        batch["ended_at"] = batch["created_at"]
+        batch["request_counts"] = {**counts, "expired": 0}
+        batch["results_url"] = f"{self.url}/v1/messages/batches/{batch['id']}/results"
+
+    def _retrieve_anthropic_batch(self, batch: dict[str, Any]) -> dict[str, Any]:
+        batch["polls"] += 1
+        if batch["processing_status"] == "canceling":
+            self._end_anthropic_batch(batch, cancelled=True)
+        elif batch["processing_status"] == "in_progress":
+            if batch["polls"] >= self.polls_until_ended:
+                self._end_anthropic_batch(batch, cancelled=False)
+        return self._get_anthropic_batch(batch)
+
+    def _create_anthropic_batch(self, requests: list[Any]) -> dict[str, Any]:
+        batch_id = self._get_id("msgbatch")
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "in_progress",
+            "request_counts": {
+                "processing": len(requests),
+                "succeeded": 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": "2024-10-01T00:00:00Z",
+            "expires_at": "2024-10-02T00:00:00Z",
+            "ended_at": None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": None,
+            "polls": 0,
+            "requests": requests,
+        }
+        return self._get_anthropic_batch(self.batches[batch_id])
+
+    def _create_openai_batch(self, input_file_id: str) -> dict[str, Any]:
+        batch_id = self._get_id("batch")
+        self.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": input_file_id,
+            "completion_window": "24h",
+            "status": "in_progress",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "polls": 0,
+        }
+        return self._get_openai_batch(self.batches[batch_id])
+
+    def handle(self, method: str, path: str, headers: Any, body: bytes) -> Any:
+        """returns the JSON answer of a request, or the bytes of a results file"""
+        self.requests.append((method, path))
+
+        if method == "POST" and path == "/v1/files":
+            return self._create_file(
+                _parse_multipart(headers["content-type"], body)["file"]
+            )
+        if method == "GET" and (match := re.fullmatch(r"/v1/files/(.+)/content", path)):
+            return self.files[match[1]]
+        if method == "POST" and path == "/v1/batches":
+            return self._create_openai_batch(json.loads(body)["input_file_id"])
+        if match := re.fullmatch(r"/v1/batches/([^/]+)(/cancel)?", path):
+            batch = self.batches[match[1]]
+            if match[2]:
+                batch["status"] = "cancelling"
+                return self._get_openai_batch(batch)
+            return self._retrieve_openai_batch(batch)
+
+        if method == "POST" and path == "/v1/messages/batches":
+            return self._create_anthropic_batch(json.loads(body)["requests"])
+        if match := re.fullmatch(r"/v1/messages/batches/([^/]+)(/\w+)?", path):
+            batch = self.batches[match[1]]
+            if match[2] == "/results":
+                return batch["results"]
+            if match[2] == "/cancel":
+                batch["processing_status"] = "canceling"
+                batch["cancel_initiated_at"] = batch["created_at"]
+                return self._get_anthropic_batch(batch)
+            return self._retrieve_anthropic_batch(batch)
+
+        raise KeyError(path)
+
+    def _get_handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method: str) -> None:
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length)
+                path = self.path.split("?")[0]
+                try:
+                    with server._lock:
+                        answer = server.handle(method, path, self.headers, body)
+                except KeyError:
+                    self.send_response(404)
+                    self.send_header("content-length", "0")
+                    self.end_headers()
+                    return
+
+                content = (
+                    answer if isinstance(answer, bytes) else json.dumps(answer).encode()
+                )
+                self.send_response(200)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self) -> None:
+                self._respond("GET")
+
+            def do_POST(self) -> None:
+                self._respond("POST")
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
@@ -0,0 +1,121 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adapters import AdapterFactory, SDKChatAdapter
+from adapters.api_key_scheduler import (
+    ApiKeyScheduler,
+    WeightedApiKey,
+    parse_weighted_api_key,
+)
+
+
+def test_parse_weighted_api_key() -> None:
+    assert parse_weighted_api_key("sk-1") == WeightedApiKey("sk-1", 1.0)
+    assert parse_weighted_api_key(" sk-1:3 ") == WeightedApiKey("sk-1", 3.0)
+    assert parse_weighted_api_key("sk:abc") == WeightedApiKey("sk:abc", 1.0)
+    assert parse_weighted_api_key("sk-1:0") == WeightedApiKey("sk-1:0", 1.0)
+
+
+def test_scheduler_weights() -> None:
+    scheduler = ApiKeyScheduler([WeightedApiKey("a", 3), WeightedApiKey("b")])
+
+    assert Counter(scheduler.acquire() for _ in range(400)) == {"a": 300, "b": 100}
+
+
+def test_scheduler_headroom() -> None:
+    scheduler = ApiKeyScheduler([WeightedApiKey("a"), WeightedApiKey("b")])
+
+    scheduler.observe(
+        "a",
+        200,
+        {"x-ratelimit-limit-requests": "100", "x-ratelimit-remaining-requests": "10"},
+    )
+    scheduler.observe(
+        "b",
+        200,
+        {
+            "anthropic-ratelimit-tokens-limit": "1000",
+            "anthropic-ratelimit-tokens-remaining": "900",
+        },
+    )
+
+    counts = Counter(scheduler.acquire() for _ in range(100))
+    assert counts["b"] > counts["a"] * 8
+
+    # Exhausted keys are skipped until their limits reset
+    scheduler.observe(
+        "b",
+        200,
+        {
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "1m",
+        },
+    )
+    assert {scheduler.acquire() for _ in range(10)} == {"a"}
+
+    scheduler.observe(
+        "b",
+        200,
+        {
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "0s",
+        },
+    )
+    assert "b" in {scheduler.acquire() for _ in range(10)}
+
+
+def test_scheduler_cooldown(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr("adapters.api_key_scheduler.time.time", lambda: now[0])
+    scheduler = ApiKeyScheduler([WeightedApiKey("a"), WeightedApiKey("b")], cooldown=60)
+
+    scheduler.observe("a", 429, {"retry-after": "20"})
+    assert {scheduler.acquire() for _ in range(10)} == {"b"}
+
+    scheduler.observe("b", 429, {})
+    # Every key is cooling down, the one available first is used
+    assert scheduler.acquire() == "a"
+
+    now[0] += 21
+    assert {scheduler.acquire() for _ in range(10)} == {"a"}
+
+    now[0] += 60
+    assert {scheduler.acquire() for _ in range(10)} == {"a", "b"}
+
+
+def test_scheduler_thread_safe() -> None:
+    scheduler = ApiKeyScheduler([WeightedApiKey(key) for key in "abcd"])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        keys = list(executor.map(lambda _: scheduler.acquire(), range(4000)))
+
+    assert Counter(keys) == {key: 1000 for key in "abcd"}
+
+
+def test_api_keys_per_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY_LIST", "openai-1,openai-2:2")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "anthropic-1")
+    monkeypatch.delenv("ANTHROPIC_API_KEY_LIST", raising=False)
+
+    openai_adapter = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    anthropic_adapter = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-haiku-20240307"
+    )
+    assert isinstance(openai_adapter, SDKChatAdapter)
+    assert isinstance(anthropic_adapter, SDKChatAdapter)
+
+    assert {anthropic_adapter._get_request_api_key() for _ in range(10)} == {
+        "anthropic-1"
+    }
+    assert {openai_adapter._get_request_api_key() for _ in range(10)} == {
+        "openai-1",
+        "openai-2",
+    }
+
+    # Api keys set by the user are always used
+    openai_adapter.set_api_key("user-key")
+    assert {openai_adapter._get_request_api_key() for _ in range(10)} == {"user-key"}
@@ -0,0 +1,255 @@
+import asyncio
+import itertools
+import threading
+import time
+from typing import Any, Iterator
+
+import pytest
+
+from adapters import AdapterFactory
+from adapters.batch_execution import (
+    BatchProgress,
+    BatchResult,
+    ConcurrencyLimiters,
+    run_batch_async,
+    run_batch_sync,
+)
+from adapters.types import AdapterException
+
+
+class Tracker:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.pulled = 0
+
+    def enter(self) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def exit(self) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+    def inputs(self, count: int | None = None) -> Iterator[int]:
+        for value in itertools.count() if count is None else range(count):
+            self.pulled += 1
+            yield value
+
+
+def get_delay(value: int) -> float:
+    # Earlier inputs complete last
+    return 0.001 * (10 - value % 10)
+
+
+def test_run_batch_async() -> None:
+    tracker = Tracker()
+
+    async def execute(value: int) -> int:
+        tracker.enter()
+        await asyncio.sleep(get_delay(value))
+        tracker.exit()
+        return value * 2
+
+    async def run(ordered: bool) -> list[BatchResult[int]]:
+        return [
+            result
+            async for result in run_batch_async(
+                execute, tracker.inputs(50), 5, ordered=ordered
+            )
+        ]
+
+    unordered = asyncio.run(run(False))
+    ordered = asyncio.run(run(True))
+
+    assert tracker.max_in_flight == 5
+    assert sorted(unordered) == ordered
+    assert unordered != ordered
+    assert ordered == [BatchResult(index, index * 2, None) for index in range(50)]
+
+
+def test_run_batch_async_consumes_inputs_lazily() -> None:
+    tracker = Tracker()
+
+    async def execute(value: int) -> int:
+        await asyncio.sleep(0)
+        return value
+
+    async def run() -> list[int]:
+        values = []
+        batch = run_batch_async(execute, tracker.inputs(), 10)
+        async for result in batch:
+            values.append(result.input_index)
+            if len(values) == 100:
+                break
+        await batch.aclose()
+        return values
+
+    assert len(asyncio.run(run())) == 100
+    assert tracker.pulled <= 100 + 10
+
+
+def test_run_batch_async_exceptions() -> None:
+    cancelled: list[int] = []
+    error = ValueError("failed")
+
+    async def execute(value: int) -> int:
+        if value == 3:
+            raise error
+        try:
+            await asyncio.sleep(0.01 if value < 3 else 1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    async def run(return_exceptions: bool) -> list[BatchResult[int]]:
+        return [
+            result
+            async for result in run_batch_async(
+                execute, range(8), 4, return_exceptions=return_exceptions
+            )
+        ]
+
+    with pytest.raises(ValueError):
+        asyncio.run(run(False))
+    # Inputs in flight are cancelled
+    assert cancelled
+
+    progress: list[BatchProgress] = []
+
+    async def run_with_progress() -> list[BatchResult[int]]:
+        return [
+            result
+            async for result in run_batch_async(
+                execute,
+                range(4),
+                4,
+                ordered=True,
+                return_exceptions=True,
+                on_progress=progress.append,
+            )
+        ]
+
+    results = asyncio.run(run_with_progress())
+    assert [result.exception for result in results] == [None, None, None, error]
+    assert progress[-1] == BatchProgress(
+        submitted=4, completed=3, failed=1, in_flight=0, total=4
+    )
+
+
+def test_run_batch_async_limiter() -> None:
+    tracker = Tracker()
+
+    async def execute(value: int) -> int:
+        tracker.enter()
+        await asyncio.sleep(0.001)
+        tracker.exit()
+        return value
+
+    async def consume(limiter: asyncio.Semaphore) -> int:
+        batch = run_batch_async(execute, range(20), 10, limiter=limiter)
+        return len([result async for result in batch])
+
+    async def run() -> tuple[int, int]:
+        # Shared by both batches, as by the batches of a provider
+        limiter = asyncio.Semaphore(3)
+        return await asyncio.gather(consume(limiter), consume(limiter))
+
+    assert list(asyncio.run(run())) == [20, 20]
+    assert tracker.max_in_flight == 3
+
+
+def test_run_batch_sync() -> None:
+    tracker = Tracker()
+
+    def execute(value: int) -> int:
+        tracker.enter()
+        time.sleep(get_delay(value))
+        tracker.exit()
+        if value == 7:
+            raise ValueError("failed")
+        return value
+
+    results = list(
+        run_batch_sync(
+            execute, tracker.inputs(30), 4, ordered=True, return_exceptions=True
+        )
+    )
+
+    assert tracker.max_in_flight <= 4
+    assert [result.input_index for result in results] == list(range(30))
+    assert isinstance(results[7].exception, ValueError)
+
+    with pytest.raises(ValueError):
+        list(run_batch_sync(execute, range(30), 4))
+
+
+def test_concurrency_limiters() -> None:
+    limiters = ConcurrencyLimiters()
+
+    assert limiters.get_limiter_sync("a", 2) is limiters.get_limiter_sync("a", 5)
+    assert limiters.get_limiter_sync("a", 2) is not limiters.get_limiter_sync("b", 2)
+
+    async def get_limiter() -> asyncio.Semaphore:
+        return limiters.get_limiter_async("a", 2)
+
+    # Async limiters are bound to their loop
+    assert asyncio.run(get_limiter()) is not asyncio.run(get_limiter())
+
+
+def test_concurrency_limiters_of_closed_loops_released() -> None:
+    limiters = ConcurrencyLimiters()
+
+    async def wait_on_limiter() -> None:
+        limiter = limiters.get_limiter_async("a", 1)
+
+        async def hold() -> None:
+            async with limiter:
+                await asyncio.sleep(0)
+
+        # Waiting binds the semaphore to the loop
+        await asyncio.gather(hold(), hold())
+
+    for _ in range(5):
+        asyncio.run(wait_on_limiter())
+
+    assert len(limiters._limiters_async) == 1
+
+
+def test_execute_batch(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    calls: list[dict[str, Any]] = []
+
+    def execute_sync(llm_input: Any, **kwargs: Any) -> str:
+        calls.append(kwargs)
+        return str(llm_input[0]["content"])
+
+    async def execute_async(llm_input: Any, **kwargs: Any) -> str:
+        return execute_sync(llm_input, **kwargs)
+
+    monkeypatch.setattr(adapter, "execute_sync", execute_sync)
+    monkeypatch.setattr(adapter, "execute_async", execute_async)
+    inputs = [[{"role": "user", "content": str(index)}] for index in range(10)]
+
+    async def run() -> list[Any]:
+        return [
+            result.response
+            async for result in adapter.execute_batch_async(
+                inputs, max_concurrency=3, ordered=True, max_tokens=5
+            )
+        ]
+
+    expected = [str(index) for index in range(10)]
+    assert asyncio.run(run()) == expected
+    assert [
+        result.response
+        for result in adapter.execute_batch_sync(inputs, ordered=True, max_tokens=5)
+    ] == expected
+    assert calls[0] == {"stream": False, "max_tokens": 5}
+
+    with pytest.raises(AdapterException):
+        next(adapter.execute_batch_sync(inputs, stream=True))
@@ -0,0 +1,225 @@
+import asyncio
+import json
+import os
+from typing import Any, Iterator
+
+import pytest
+
+from adapters import AdapterFactory
+from adapters.batch_jobs import (
+    AnthropicBatchAPI,
+    BatchInput,
+    BatchJob,
+    BatchJobCheckpoint,
+    BatchJobStatus,
+)
+from adapters.provider_adapters.anthropic_sdk_chat_provider_adapter import (
+    AnthropicSDKChatProviderAdapter,
+)
+from adapters.provider_adapters.openai_sdk_chat_provider_adapter import (
+    OpenAISDKChatProviderAdapter,
+)
+from adapters.types import AdapterException, Conversation, ConversationRole, Turn
+from tests.batch_server import BatchServer
+
+OPENAI_MODEL_PATH = "openai/openai/gpt-4o"
+ANTHROPIC_MODEL_PATH = "anthropic/anthropic/claude-3-5-sonnet-latest"
+
+INPUTS: dict[str, BatchInput] = {
+    "a": [{"role": "user", "content": "hello"}],
+    "b": [{"role": "user", "content": "please fail"}],
+    "c": Conversation([Turn(role=ConversationRole.user, content="world")]),
+}
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch) -> Iterator[BatchServer]:
+    # Only sent to the stand-in server
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    with BatchServer(polls_until_ended=2) as batch_server:
+        monkeypatch.setattr(
+            OpenAISDKChatProviderAdapter,
+            "_get_base_url",
+            lambda self: f"{batch_server.url}/v1",
+        )
+        monkeypatch.setattr(
+            AnthropicSDKChatProviderAdapter,
+            "_get_base_url",
+            lambda self: batch_server.url,
+        )
+        yield batch_server
+
+
+def get_adapter(model_path: str) -> Any:
+    adapter = AdapterFactory.get_adapter_by_path(model_path)
+    assert adapter
+    return adapter
+
+
+@pytest.mark.parametrize("model_path", [OPENAI_MODEL_PATH, ANTHROPIC_MODEL_PATH])
+def test_batch_job(server: BatchServer, model_path: str) -> None:
+    job = BatchJob.submit(get_adapter(model_path), INPUTS, max_tokens=10)
+
+    assert job.state.status == BatchJobStatus.in_progress
+    with pytest.raises(AdapterException):
+        list(job.results())
+
+    state = job.wait(poll_interval=0)
+    assert state.status == BatchJobStatus.completed
+    assert (state.total, state.succeeded, state.failed) == (3, 2, 1)
+
+    results = {result.custom_id: result for result in job.results()}
+    assert sorted(results) == ["a", "b", "c"]
+    assert results["a"].response
+    assert results["a"].response.choices[0].message.content == "echo: hello"
+    assert results["c"].response
+    assert results["c"].response.choices[0].message.content == "echo: world"
+    assert results["b"].response is None
+    assert results["b"].error
+
+
+@pytest.mark.parametrize("model_path", [OPENAI_MODEL_PATH, ANTHROPIC_MODEL_PATH])
+def test_batch_cost(server: BatchServer, model_path: str) -> None:
+    adapter = get_adapter(model_path)
+    job = BatchJob.submit(adapter, INPUTS)
+    job.wait(poll_interval=0)
+
+    # The stand-in server reports 10 prompt and 5 completion tokens
+    cost = adapter.get_model().cost
+    synchronous_cost = cost.prompt * 10 + cost.completion * 5 + cost.request
+    assert synchronous_cost > 0
+    for result in job.results():
+        if result.response is not None:
+            assert result.response.cost == pytest.approx(synchronous_cost / 2)
+
+
+def test_openai_requests(server: BatchServer) -> None:
+    job = BatchJob.submit(
+        get_adapter(OPENAI_MODEL_PATH),
+        [[{"role": "user", "content": "hello"}]],
+        max_tokens=10,
+    )
+
+    batch = server.batches[job.batch_id]
+    request = json.loads(server.files[batch["input_file_id"]])
+    assert request["custom_id"] == "0"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"]["model"] == "gpt-4o"
+    assert request["body"]["max_tokens"] == 10
+    assert "stream" not in request["body"]
+
+
+def test_streaming_rejected(server: BatchServer) -> None:
+    with pytest.raises(AdapterException):
+        BatchJob.submit(get_adapter(OPENAI_MODEL_PATH), INPUTS, stream=True)
+    assert not server.requests
+
+
+def test_anthropic_batch_limit(
+    server: BatchServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(AnthropicBatchAPI, "max_requests", 2)
+
+    with pytest.raises(AdapterException, match="limited to 2 requests"):
+        BatchJob.submit(get_adapter(ANTHROPIC_MODEL_PATH), INPUTS)
+    assert not server.requests
+
+
+def test_unsupported_provider() -> None:
+    with pytest.raises(AdapterException):
+        BatchJob.submit(get_adapter("cohere/cohere/command-r-plus"), INPUTS)
+
+
+def test_checkpoint_resume(server: BatchServer, tmp_path: Any) -> None:
+    checkpoint_path = str(tmp_path / "job.json")
+    inputs: list[BatchInput] = [
+        [{"role": "user", "content": str(index)}] for index in range(5)
+    ]
+
+    job = BatchJob.submit(get_adapter(OPENAI_MODEL_PATH), inputs, checkpoint_path)
+    job.wait(poll_interval=0)
+
+    # Submitting again, e.g. after a restart, resumes the saved job
+    resubmitted = BatchJob.submit(
+        get_adapter(OPENAI_MODEL_PATH), inputs, checkpoint_path
+    )
+    assert resubmitted.batch_id == job.batch_id
+    assert len(server.batches) == 1
+
+    results = job.results()
+    read = [next(results).custom_id for _ in range(2)]
+    results.close()
+
+    with open(checkpoint_path, encoding="utf-8") as file:
+        checkpoint = BatchJobCheckpoint.model_validate_json(file.read())
+    assert checkpoint.model_path == OPENAI_MODEL_PATH
+    assert checkpoint.state.is_ended
+    # The result being handled when the job stopped is not counted as read
+    assert list(checkpoint.results_read.values()) == [1]
+
+    resumed = BatchJob.resume(checkpoint_path)
+    requests = len(server.requests)
+    assert resumed.state.is_ended
+    rest = [result.custom_id for result in resumed.results()]
+    assert rest[0] == read[1]
+    assert sorted(read[:1] + rest) == [str(index) for index in range(5)]
+    # The ended state is not fetched again
+    assert ("GET", f"/v1/batches/{job.batch_id}") not in server.requests[requests:]
+
+
+@pytest.mark.parametrize("model_path", [OPENAI_MODEL_PATH, ANTHROPIC_MODEL_PATH])
+def test_resume_after_partial_read(
+    server: BatchServer, model_path: str, tmp_path: Any
+) -> None:
+    checkpoint_path = str(tmp_path / "job.json")
+    inputs: dict[str, BatchInput] = {
+        str(index): [{"role": "user", "content": "a"}] for index in range(5)
+    }
+    job = BatchJob.submit(get_adapter(model_path), inputs, checkpoint_path)
+    job.wait(poll_interval=0)
+
+    # The consumer stops after handling the third result
+    delivered = []
+    for result in job.results():
+        delivered.append(result.custom_id)
+        if len(delivered) == 3:
+            break
+
+    resumed = BatchJob.resume(checkpoint_path, adapter=get_adapter(model_path))
+    delivered.extend(result.custom_id for result in resumed.results())
+
+    # Every result is delivered, the one handed out when the consumer stopped twice
+    assert sorted(set(delivered)) == sorted(inputs)
+    assert len(delivered) == len(inputs) + 1
+    assert delivered[2] == delivered[3]
+
+
+def test_resume_missing_checkpoint(tmp_path: Any) -> None:
+    with pytest.raises(OSError):
+        BatchJob.resume(os.path.join(tmp_path, "missing.json"))
+
+
+@pytest.mark.parametrize("model_path", [OPENAI_MODEL_PATH, ANTHROPIC_MODEL_PATH])
+def test_cancel(server: BatchServer, model_path: str) -> None:
+    job = BatchJob.submit(get_adapter(model_path), INPUTS)
+
+    state = job.cancel()
+    assert state.status == BatchJobStatus.cancelled
+    assert state.failed == 3
+    assert all(result.error for result in job.results())
+
+
+def test_wait_async(server: BatchServer) -> None:
+    job = BatchJob.submit(get_adapter(ANTHROPIC_MODEL_PATH), INPUTS)
+
+    state = asyncio.run(job.wait_async(poll_interval=0))
+    assert state.status == BatchJobStatus.completed
+
+
+def test_wait_timeout(server: BatchServer) -> None:
+    server.polls_until_ended = 100
+    job = BatchJob.submit(get_adapter(OPENAI_MODEL_PATH), INPUTS)
+
+    with pytest.raises(AdapterException):
+        job.wait(poll_interval=0.01, timeout=0.05)
@@ -0,0 +1,101 @@
+from typing import Any
+
+from anthropic.types import (
+    Message,
+    MessageDeltaUsage,
+    RawContentBlockDeltaEvent,
+    RawMessageDeltaEvent,
+    RawMessageStartEvent,
+    TextDelta,
+    Usage,
+)
+from anthropic.types.raw_message_delta_event import Delta
+from openai.types.chat.chat_completion_chunk import Choice as ChoiceChunk, ChoiceDelta
+
+from adapters import AdapterFactory
+from adapters.chunk_template import ChunkTemplate
+from adapters.types import AdapterChatCompletionChunk
+
+
+def validate_chunk(content: str, **choice: Any) -> AdapterChatCompletionChunk:
+    return AdapterChatCompletionChunk(
+        id="a",
+        choices=[
+            ChoiceChunk(
+                index=0, delta=ChoiceDelta(role="assistant", content=content), **choice
+            )
+        ],
+        created=1,
+        model="b",
+        object="chat.completion.chunk",
+    )
+
+
+def test_create_matches_validated_chunk() -> None:
+    template = ChunkTemplate(id="a", created=1, model="b")
+
+    for chunk, validated in (
+        (template.create(), validate_chunk("")),
+        (template.create("c"), validate_chunk("c")),
+        (
+            template.create(finish_reason="stop"),
+            validate_chunk("", finish_reason="stop"),
+        ),
+    ):
+        assert chunk == validated
+        assert chunk.model_dump(exclude_unset=True) == validated.model_dump(
+            exclude_unset=True
+        )
+        assert chunk.model_dump_json() == validated.model_dump_json()
+
+
+def test_create_does_not_share_state() -> None:
+    template = ChunkTemplate(id="a", created=1, model="b")
+
+    first = template.create("c")
+    template.create("d", finish_reason="stop")
+
+    assert first.choices[0].delta.content == "c"
+    assert first.choices[0].finish_reason is None
+    assert template.create().choices[0].delta.content == ""
+
+
+def test_anthropic_stream_chunks() -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-5-sonnet-latest"
+    )
+    assert adapter
+    state: dict[str, Any] = {}
+
+    events = [
+        RawMessageStartEvent(
+            type="message_start",
+            message=Message(
+                id="msg",
+                type="message",
+                role="assistant",
+                model="claude",
+                content=[],
+                usage=Usage(input_tokens=1, output_tokens=1),
+            ),
+        ),
+        RawContentBlockDeltaEvent(
+            type="content_block_delta",
+            index=0,
+            delta=TextDelta(type="text_delta", text="Hi"),
+        ),
+        RawMessageDeltaEvent(
+            type="message_delta",
+            delta=Delta(stop_reason="max_tokens"),
+            usage=MessageDeltaUsage(output_tokens=1),
+        ),
+    ]
+    chunks = [adapter._extract_stream_response(None, event, state) for event in events]
+
+    assert [chunk.id for chunk in chunks] == ["msg"] * 3
+    assert [chunk.choices[0].delta.content for chunk in chunks] == ["", "Hi", ""]
+    assert [chunk.choices[0].finish_reason for chunk in chunks] == [
+        None,
+        None,
+        "length",
+    ]
@@ -0,0 +1,128 @@
+import asyncio
+from typing import Any
+
+from adapters.client_cache import ClientCache, ClientCacheStats
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_client_cache_lru_eviction() -> None:
+    cache = ClientCache(max_size=2, ttl=None)
+    clients = [FakeClient() for _ in range(3)]
+
+    cache.set_client("url", "key-0", "sync", clients[0])
+    cache.set_client("url", "key-1", "sync", clients[1])
+    assert cache.get_client("url", "key-0", "sync") is clients[0]
+
+    cache.set_client("url", "key-2", "sync", clients[2])
+
+    assert cache.get_client("url", "key-1", "sync") is None
+    assert cache.get_client("url", "key-0", "sync") is clients[0]
+    assert clients[1].closed
+    assert not clients[0].closed and not clients[2].closed
+    assert cache.get_stats() == ClientCacheStats(hits=2, misses=1, evictions=1, size=2)
+
+
+def test_client_cache_ttl_eviction(monkeypatch: Any) -> None:
+    now = [0.0]
+    monkeypatch.setattr("adapters.client_cache.time.monotonic", lambda: now[0])
+
+    cache = ClientCache(max_size=10, ttl=10)
+    client = FakeClient()
+    cache.set_client("url", "key", "sync", client)
+
+    now[0] = 5
+    assert cache.get_client("url", "key", "sync") is client
+
+    # Idle time is measured from the last access
+    now[0] = 14
+    assert cache.get_client("url", "key", "sync") is client
+
+    now[0] = 30
+    assert cache.get_client("url", "key", "sync") is None
+    assert client.closed
+    assert cache.get_stats().evictions == 1
+
+
+def test_client_cache_shutdown() -> None:
+    cache = ClientCache()
+    sync_client = FakeClient()
+    async_client = FakeAsyncClient()
+    cache.set_client("url", "key", "sync", sync_client)
+    cache.set_client("url", "key", "async", async_client)
+
+    cache.shutdown()
+
+    assert sync_client.closed and async_client.closed
+    assert cache.get_stats().size == 0
+
+
+def test_client_cache_ashutdown() -> None:
+    cache = ClientCache(max_size=1)
+    evicted_client = FakeAsyncClient()
+    async_client = FakeAsyncClient()
+
+    async def run() -> None:
+        cache.set_client("url", "key-0", "async", evicted_client)
+        cache.set_client("url", "key-1", "async", async_client)
+        await cache.ashutdown()
+
+    asyncio.run(run())
+
+    assert evicted_client.closed and async_client.closed
+    assert cache.get_stats().size == 0
+
+
+def test_client_cache_async_clients_per_loop() -> None:
+    cache = ClientCache()
+
+    async def get_or_set() -> Any:
+        client = cache.get_client("url", "key", "async")
+        if client is None:
+            client = FakeAsyncClient()
+            cache.set_client("url", "key", "async", client)
+        assert cache.get_client("url", "key", "async") is client
+        return client
+
+    first = asyncio.run(get_or_set())
+    second = asyncio.run(get_or_set())
+    assert first is not second
+
+    # Clients of closed loops are dropped
+    assert cache.get_stats().size == 1
+
+    loop = asyncio.new_event_loop()
+    try:
+        third = loop.run_until_complete(get_or_set())
+        assert loop.run_until_complete(get_or_set()) is third
+    finally:
+        loop.close()
+
+    assert cache.get_stats().size == 1
+    assert cache.get_client("url", "key", "sync") is None
+
+
+def test_client_cache_sync_clients_shared_across_loops() -> None:
+    cache = ClientCache()
+    client = FakeClient()
+    cache.set_client("url", "key", "sync", client)
+
+    async def get() -> Any:
+        return cache.get_client("url", "key", "sync")
+
+    assert asyncio.run(get()) is client
+    assert asyncio.run(get()) is client
@@ -1,4 +1,8 @@
-from adapters.types import Conversation, ConversationRole, Turn
+from typing import Any
+
+import pytest
+
+from adapters.types import Conversation, ConversationRole, ToolOutputTurn, Turn
 
 
 def test_conversation_creation_with_array() -> None:
@@ -15,3 +19,66 @@ def test_conversation_creation_with_dict() -> None:
     )
     assert conversation.turns[0].role == ConversationRole.user
     assert conversation.turns[0].content == "How many toes does a dog have?"
+
+
+def test_convert_to_openai_format_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    conversation = Conversation(
+        [
+            Turn(role=ConversationRole.system, content="Be brief."),
+            Turn(role=ConversationRole.user, content="Hi"),
+        ]
+    )
+    assert conversation.convert_to_openai_format() == conversation.model_dump()["turns"]
+
+    dumped: list[Any] = []
+    model_dump = Turn.model_dump
+
+    def counting_model_dump(self: Turn, **kwargs: Any) -> dict[str, Any]:
+        dumped.append(self)
+        return model_dump(self, **kwargs)
+
+    monkeypatch.setattr(Turn, "model_dump", counting_model_dump)
+
+    # Appended turns are the only ones dumped
+    conversation.extend(
+        [
+            {"role": "assistant", "content": "Hello"},
+            Turn(role=ConversationRole.user, content="How are you?"),
+        ]
+    )
+    assert list(conversation.convert_to_openai_format())[2:] == [
+        {"role": "assistant", "content": "Hello"},
+        {"role": "user", "content": "How are you?"},
+    ]
+    assert dumped == conversation.turns[2:]
+
+    # Replaced turns are dumped again
+    dumped.clear()
+    conversation[1] = Turn(role=ConversationRole.user, content="Hey")
+    assert list(conversation.convert_to_openai_format())[1] == {
+        "role": "user",
+        "content": "Hey",
+    }
+    assert dumped == [conversation.turns[1]]
+
+    conversation.turns = [Turn(role=ConversationRole.user, content="Restart")]
+    assert conversation.convert_to_openai_format() == [
+        {"role": "user", "content": "Restart"}
+    ]
+
+
+def test_conversation_append() -> None:
+    conversation = Conversation([])
+    conversation.append({"role": "tool", "tool_call_id": "1", "content": "42"})
+    conversation.append(Turn(role=ConversationRole.user, content="Thanks"))
+
+    assert isinstance(conversation.turns[0], ToolOutputTurn)
+    assert conversation.turns[1].content == "Thanks"
+
+
+def test_conversation_equality_ignores_cache() -> None:
+    conversation = Conversation([Turn(role=ConversationRole.user, content="Hi")])
+    other = Conversation([Turn(role=ConversationRole.user, content="Hi")])
+    conversation.convert_to_openai_format()
+
+    assert conversation == other
@@ -0,0 +1,180 @@
+from typing import Any, Iterator
+
+import pytest
+from anthropic.types import (
+    Message,
+    MessageDeltaUsage,
+    RawContentBlockDeltaEvent,
+    RawContentBlockStartEvent,
+    RawContentBlockStopEvent,
+    RawMessageDeltaEvent,
+    RawMessageStartEvent,
+    RawMessageStopEvent,
+    TextBlock,
+    TextDelta,
+    Usage,
+)
+from anthropic.types.raw_message_delta_event import Delta
+from cohere import (
+    ChatContentDeltaEventDelta,
+    ChatContentDeltaEventDeltaMessage,
+    ChatContentDeltaEventDeltaMessageContent,
+    ContentDeltaStreamedChatResponseV2,
+    ContentEndStreamedChatResponseV2,
+    ContentStartStreamedChatResponseV2,
+    MessageEndStreamedChatResponseV2,
+    MessageStartStreamedChatResponseV2,
+)
+from openai.types.chat import ChatCompletionChunk
+
+from adapters import AdapterFactory
+
+ANTHROPIC_EVENTS = [
+    RawMessageStartEvent(
+        type="message_start",
+        message=Message(
+            id="msg",
+            type="message",
+            role="assistant",
+            model="claude",
+            content=[],
+            usage=Usage(input_tokens=1, output_tokens=1),
+        ),
+    ),
+    RawContentBlockStartEvent(
+        type="content_block_start",
+        index=0,
+        content_block=TextBlock(type="text", text=""),
+    ),
+    RawContentBlockDeltaEvent(
+        type="content_block_delta",
+        index=0,
+        delta=TextDelta(type="text_delta", text="Hi"),
+    ),
+    RawContentBlockStopEvent(type="content_block_stop", index=0),
+    RawMessageDeltaEvent(
+        type="message_delta",
+        delta=Delta(stop_reason="end_turn"),
+        usage=MessageDeltaUsage(output_tokens=1),
+    ),
+    RawMessageStopEvent(type="message_stop"),
+]
+
+COHERE_EVENTS = [
+    MessageStartStreamedChatResponseV2(type="message-start", id="a"),
+    ContentStartStreamedChatResponseV2(type="content-start", index=0),
+    ContentDeltaStreamedChatResponseV2(
+        type="content-delta",
+        index=0,
+        delta=ChatContentDeltaEventDelta(
+            message=ChatContentDeltaEventDeltaMessage(
+                content=ChatContentDeltaEventDeltaMessageContent(text="Hi")
+            )
+        ),
+    ),
+    ContentEndStreamedChatResponseV2(type="content-end", index=0),
+    MessageEndStreamedChatResponseV2(type="message-end"),
+]
+
+
+def get_contents(chunks: list[Any]) -> list[Any]:
+    return [
+        (chunk.choices[0].delta.content, chunk.choices[0].finish_reason)
+        for chunk in chunks
+    ]
+
+
+@pytest.mark.parametrize(
+    "model_path, events",
+    [
+        ("anthropic/anthropic/claude-3-5-sonnet-latest", ANTHROPIC_EVENTS),
+        ("cohere/cohere/command-r-plus", COHERE_EVENTS),
+    ],
+)
+def test_drop_empty_events(model_path: str, events: list[Any]) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(model_path)
+    assert adapter
+
+    state: dict[str, Any] = {}
+    chunks = [adapter._extract_stream_response(None, event, state) for event in events]
+    assert len(chunks) == len(events)
+
+    state = {"drop_empty_chunks": True}
+    chunks = [adapter._extract_stream_response(None, event, state) for event in events]
+    assert get_contents([chunk for chunk in chunks if chunk]) == [
+        ("", None),
+        ("Hi", None),
+        ("", "stop"),
+    ]
+
+
+def test_anthropic_usage_only_delta_dropped() -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-5-sonnet-latest"
+    )
+    assert adapter
+    events = [
+        *ANTHROPIC_EVENTS[:-2],
+        RawMessageDeltaEvent(
+            type="message_delta",
+            delta=Delta(),
+            usage=MessageDeltaUsage(output_tokens=2),
+        ),
+        RawMessageStopEvent(type="message_stop"),
+    ]
+
+    state: dict[str, Any] = {"drop_empty_chunks": True}
+    chunks = [adapter._extract_stream_response(None, event, state) for event in events]
+    sent = [chunk for chunk in chunks if chunk]
+
+    # The usage of the dropped delta is sent on the final chunk
+    assert chunks[-2] is None
+    assert sent[-1] is chunks[-1]
+    assert sent[-1].usage.completion_tokens == 2
+    assert [chunk.usage for chunk in sent[:-1]] == [None, None]
+
+
+class Stream:
+    def __init__(self, chunks: list[ChatCompletionChunk]) -> None:
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        return iter(self._chunks)
+
+    def close(self) -> None:
+        pass
+
+
+def get_chunk(delta: dict[str, Any], finish_reason: Any = None) -> Any:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "a",
+            "object": "chat.completion.chunk",
+            "created": 1,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+    )
+
+
+def test_execute_sync_drop_empty_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    chunks = [
+        get_chunk({"role": "assistant", "content": ""}),
+        get_chunk({"content": ""}),
+        get_chunk({"content": "Hi"}),
+        get_chunk({}),
+        get_chunk({}, "stop"),
+    ]
+    monkeypatch.setattr(adapter, "_call_sync", lambda: lambda **_: Stream(chunks))
+
+    stream = adapter.execute_sync(
+        [{"role": "user", "content": "a"}], stream=True, drop_empty_chunks=True
+    )
+
+    assert get_contents(list(stream.response)) == [
+        ("", None),
+        ("Hi", None),
+        (None, "stop"),
+    ]
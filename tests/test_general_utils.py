@@ -0,0 +1,76 @@
+from typing import Any
+
+from adapters import AdapterFactory
+from adapters.general_utils import REQUEST_PRUNE_SCHEMA, prune_none_values
+
+
+def test_prune_none_values() -> None:
+    parameters = {"type": "object", "properties": {"a": {"default": None}}}
+    image_part: dict[str, Any] = {
+        "type": "image_url",
+        "image_url": {"url": "a", "detail": None},
+    }
+    text_message = {"role": "user", "content": "a"}
+    request: dict[str, Any] = {
+        "messages": [
+            text_message,
+            {"role": "user", "content": [image_part], "name": None},
+        ],
+        "tools": [
+            {
+                "type": "function",
+                "function": {
+                    "name": "a",
+                    "description": None,
+                    "parameters": parameters,
+                },
+            }
+        ],
+        "temperature": None,
+        "stop": ["a"],
+    }
+
+    assert prune_none_values(request, REQUEST_PRUNE_SCHEMA) == {
+        "messages": [
+            text_message,
+            {
+                "role": "user",
+                "content": [{"type": "image_url", "image_url": {"url": "a"}}],
+            },
+        ],
+        "tools": [
+            {"type": "function", "function": {"name": "a", "parameters": parameters}}
+        ],
+        "stop": ["a"],
+    }
+
+    # Copied where it changes, the request is left as is
+    assert request["temperature"] is None
+    assert image_part["image_url"]["detail"] is None
+    pruned = prune_none_values(request, REQUEST_PRUNE_SCHEMA)
+    assert pruned["messages"][0] is text_message
+    # Tool schemas are not traversed
+    assert pruned["tools"][0]["function"]["parameters"] is parameters
+
+
+def test_prune_none_values_unchanged() -> None:
+    request = {"messages": [{"role": "user", "content": "a"}], "temperature": 1}
+    assert prune_none_values(request, REQUEST_PRUNE_SCHEMA) is request
+
+
+def test_params_without_none_values() -> None:
+    adapter = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+
+    params = adapter._get_params(  # type: ignore[attr-defined]
+        [{"role": "user", "content": "a", "name": None}],
+        temperature=None,
+        top_p=0.5,
+        tools=[{"type": "function", "function": {"name": "a", "strict": None}}],
+    )
+
+    assert params["messages"] == [{"role": "user", "content": "a"}]
+    assert params["extra_body"] == {
+        "top_p": 0.5,
+        "tools": [{"type": "function", "function": {"name": "a"}}],
+    }
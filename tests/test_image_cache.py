@@ -0,0 +1,100 @@
+import os
+from pathlib import Path
+
+import httpx
+
+from adapters.image_cache import (
+    ImageBlock,
+    ImageCache,
+    ImageCacheStats,
+    get_image_cache_key,
+)
+from adapters.image_resolver import ImageResolver
+
+
+def get_block(data: str) -> ImageBlock:
+    return {
+        "type": "image",
+        "source": {"type": "base64", "media_type": "image/png", "data": data},
+    }
+
+
+def test_get_image_cache_key() -> None:
+    data_url = "data:image/png;base64," + "A" * 1000
+
+    assert get_image_cache_key("https://a.b/c.png") == "https://a.b/c.png"
+    assert get_image_cache_key(data_url).startswith("sha256:")
+    assert len(get_image_cache_key(data_url)) == len("sha256:") + 64
+    assert get_image_cache_key(data_url) != get_image_cache_key(data_url + "A")
+
+
+def test_lru_bounded_by_bytes() -> None:
+    cache = ImageCache(max_bytes=25, directory=None)
+
+    cache.set("a", get_block("a" * 10))
+    cache.set("b", get_block("b" * 10))
+    assert cache.get("a") is not None
+    cache.set("c", get_block("c" * 10))
+    # Larger than the cache, never kept
+    cache.set("d", get_block("d" * 30))
+
+    assert cache.get("b") is None
+    assert cache.get("d") is None
+    assert cache.get("a") == get_block("a" * 10)
+    assert cache.get_stats() == ImageCacheStats(
+        hits=2, disk_hits=0, misses=2, evictions=1, size=2, bytes=20
+    )
+
+
+def test_disk_tier(tmp_path: Path) -> None:
+    cache = ImageCache(max_bytes=10, directory=str(tmp_path), disk_max_bytes=1000)
+
+    cache.set("a", get_block("a" * 10))
+    cache.set("b", get_block("b" * 10))
+
+    # Evicted from memory, found on disk and moved back to memory
+    assert cache.get("a") == get_block("a" * 10)
+    assert cache.get("a") == get_block("a" * 10)
+    assert cache.get("c") is None
+    assert cache.get_stats()[:3] == (1, 1, 1)
+
+    # Files are shared by other caches of the directory
+    assert ImageCache(directory=str(tmp_path)).get("b") == get_block("b" * 10)
+
+
+def test_disk_tier_eviction(tmp_path: Path) -> None:
+    # Files are about 150 bytes
+    cache = ImageCache(max_bytes=0, directory=str(tmp_path), disk_max_bytes=350)
+
+    for index, name in enumerate("abc"):
+        written = set(tmp_path.iterdir())
+        cache.set(name, get_block(name * 100))
+        for path in set(tmp_path.iterdir()) - written:
+            os.utime(path, (index, index))
+
+    assert len(list(tmp_path.iterdir())) == 2
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is not None
+
+
+def test_resolver_cache(tmp_path: Path) -> None:
+    requests: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        return httpx.Response(
+            200, content=b"image", headers={"content-type": "image/png"}
+        )
+
+    cache = ImageCache(directory=None)
+    resolver = ImageResolver(cache=cache)
+    resolver._client_sync = httpx.Client(transport=httpx.MockTransport(handler))
+
+    first = resolver.resolve_sync(["https://a.b/c", "data:image/gif;base64,AAAA"])
+    second = resolver.resolve_sync(["https://a.b/c"])
+
+    assert requests == ["https://a.b/c"]
+    assert second["https://a.b/c"] is first["https://a.b/c"]
+    # Data urls are decoded in place rather than cached
+    assert cache.get_stats().size == 1
@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import io
+from typing import Any
+
+import httpx
+import pytest
+
+from adapters import AdapterFactory
+from adapters.image_cache import ImageCache
+from adapters.image_processing import (
+    ImageLimits,
+    ImageProcessor,
+    downscale_image,
+    get_scaled_size,
+)
+from adapters.image_resolver import ImageResolver, get_image_details
+
+Image = pytest.importorskip("PIL.Image")
+
+OPENAI_HIGH = ImageLimits(max_long_side=2048, max_short_side=768)
+LOW = ImageLimits(max_long_side=512)
+
+
+def get_image(size: tuple[int, int], mode: str = "RGB", format: str = "JPEG") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, size, "red").save(output, format=format)
+    return output.getvalue()
+
+
+def get_size(content: bytes) -> tuple[int, int]:
+    size: tuple[int, int] = Image.open(io.BytesIO(content)).size
+    return size
+
+
+def get_data_url(content: bytes, media_type: str = "image/jpeg") -> str:
+    return f"data:{media_type};base64,{base64.b64encode(content).decode()}"
+
+
+def get_messages(url: str, detail: str = "low") -> list[Any]:
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "a"},
+                {"type": "image_url", "image_url": {"url": url, "detail": detail}},
+            ],
+        }
+    ]
+
+
+def test_get_scaled_size() -> None:
+    assert get_scaled_size(4000, 3000, OPENAI_HIGH) == (1024, 768)
+    assert get_scaled_size(1000, 500, OPENAI_HIGH) == (1000, 500)
+    assert get_scaled_size(4000, 3000, LOW) == (512, 384)
+    assert get_scaled_size(2000, 2000, ImageLimits(1568, max_pixels=1_000_000)) == (
+        1000,
+        1000,
+    )
+
+
+def test_downscale_image() -> None:
+    downscaled = downscale_image(get_image((3000, 2000)), LOW)
+
+    assert downscaled is not None
+    assert downscaled[1] == "image/jpeg"
+    assert get_size(downscaled[0]) == (512, 341)
+    assert downscale_image(get_image((500, 300)), LOW) is None
+    assert downscale_image(b"not an image", LOW) is None
+
+
+def test_downscale_image_keeps_transparency() -> None:
+    downscaled = downscale_image(get_image((2000, 2000), "RGBA", "PNG"), LOW)
+
+    assert downscaled is not None
+    assert downscaled[1] == "image/png"
+    assert Image.open(io.BytesIO(downscaled[0])).mode == "RGBA"
+
+
+def test_downscale_image_exif_orientation() -> None:
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    output = io.BytesIO()
+    Image.new("RGB", (2000, 1000)).save(output, format="JPEG", exif=exif)
+
+    downscaled = downscale_image(output.getvalue(), LOW)
+
+    assert downscaled is not None
+    assert get_size(downscaled[0]) == (256, 512)
+
+
+def test_downscale_image_without_pillow(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("adapters.image_processing._load_pillow", lambda: None)
+
+    assert downscale_image(get_image((3000, 2000)), LOW) is None
+
+
+def test_get_image_details() -> None:
+    messages = [
+        *get_messages("a", "low"),
+        *get_messages("a", "high"),
+        *get_messages("b", "low"),
+        {
+            "role": "user",
+            "content": [
+                {"type": "image_url", "image_url": {"url": "c", "details": "high"}}
+            ],
+        },
+    ]
+
+    assert get_image_details(messages) == {"a": "high", "b": "low", "c": "high"}
+
+
+def test_downscale_messages() -> None:
+    cache = ImageCache(directory=None)
+    processor = ImageProcessor(cache=cache)
+    url = get_data_url(get_image((3000, 2000)))
+    messages = get_messages(url) + get_messages("https://a.b/c.png")
+
+    def get_limits(detail: str) -> ImageLimits:
+        return LOW
+
+    downscaled = processor.downscale_messages_sync(messages, get_limits)
+    downscaled_async = asyncio.run(
+        processor.downscale_messages_async(messages, get_limits)
+    )
+    processor.shutdown()
+
+    downscaled_url = downscaled[0]["content"][1]["image_url"]["url"]
+    assert downscaled_url.startswith("data:image/jpeg;base64,")
+    assert len(downscaled_url) < len(url)
+    assert downscaled == downscaled_async
+    assert downscaled[1] is messages[1]
+    # The caller's messages are left untouched
+    assert messages[0]["content"][1]["image_url"]["url"] == url
+    assert cache.get_stats().hits == 1
+
+
+def test_openai_execute_sync_downscales(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    calls: list[dict[str, Any]] = []
+
+    def create(**kwargs: Any) -> None:
+        calls.append(kwargs)
+        raise RuntimeError("sent")
+
+    monkeypatch.setattr(adapter, "_call_sync", lambda: create)
+    url = get_data_url(get_image((3000, 2000)))
+
+    with pytest.raises(RuntimeError):
+        adapter.execute_sync(get_messages(url, "high"))
+
+    sent_url = calls[0]["messages"][0]["content"][1]["image_url"]["url"]
+    assert get_size(base64.b64decode(sent_url.partition(",")[2])) == (1152, 768)
+
+
+def test_resolver_downscales_remote_images() -> None:
+    content = get_image((3000, 2000))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, content=content, headers={"content-type": "image/jpeg"}
+        )
+
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        return handler(request)
+
+    resolver = ImageResolver(cache=ImageCache(directory=None))
+    resolver._client_sync = httpx.Client(transport=httpx.MockTransport(handler))
+    resolver._get_client_kwargs = lambda: {  # type: ignore[method-assign]
+        "transport": httpx.MockTransport(async_handler)
+    }
+
+    block = resolver.fetch_sync("https://a.b/c.jpg", LOW)
+    block_async = asyncio.run(resolver.fetch_async("https://a.b/c.jpg", LOW))
+    original = resolver.fetch_sync("https://a.b/c.jpg")
+
+    assert get_size(base64.b64decode(block["source"]["data"])) == (512, 341)
+    assert block_async == block
+    assert get_size(base64.b64decode(original["source"]["data"])) == (3000, 2000)
@@ -0,0 +1,212 @@
+import asyncio
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from typing import Any, Iterator
+
+import httpx
+import pytest
+
+from adapters import AdapterFactory
+from adapters.image_resolver import ImageResolver, get_image_urls
+from adapters.types import AdapterException
+
+PNG = b"\x89PNG" + b"\x00" * 100
+
+
+def get_resolver(
+    monkeypatch: pytest.MonkeyPatch, requests: list[str], **kwargs: Any
+) -> ImageResolver:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(str(request.url))
+        if request.url.path == "/missing.png":
+            return httpx.Response(404)
+        return httpx.Response(200, content=PNG, headers={"content-type": "image/png"})
+
+    async def async_handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return handler(request)
+
+    resolver = ImageResolver(**kwargs)
+    get_client_kwargs = resolver._get_client_kwargs
+
+    def get_client_kwargs_sync() -> dict[str, Any]:
+        return {**get_client_kwargs(), "transport": httpx.MockTransport(handler)}
+
+    def get_client_kwargs_async() -> dict[str, Any]:
+        return {**get_client_kwargs(), "transport": httpx.MockTransport(async_handler)}
+
+    resolver._client_sync = httpx.Client(**get_client_kwargs_sync())
+    monkeypatch.setattr(resolver, "_get_client_kwargs", get_client_kwargs_async)
+    return resolver
+
+
+def test_get_image_urls() -> None:
+    image = {"type": "image_url", "image_url": {"url": "https://a.b/c.png"}}
+    messages = [
+        {"role": "system", "content": "a"},
+        {"role": "user", "content": [{"type": "text", "text": "b"}, image]},
+        {"role": "user", "content": [image]},
+    ]
+
+    assert get_image_urls(messages) == ["https://a.b/c.png"]
+
+
+def test_fetch_sync(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[str] = []
+    resolver = get_resolver(monkeypatch, requests)
+
+    blocks = resolver.resolve_sync(
+        ["https://a.b/c", "https://a.b/c", "data:image/gif;base64,AAAA"]
+    )
+
+    assert requests == ["https://a.b/c"]
+    assert blocks["https://a.b/c"]["source"] == {
+        "type": "base64",
+        "media_type": "image/png",
+        "data": base64.b64encode(PNG).decode(),
+    }
+    assert blocks["data:image/gif;base64,AAAA"]["source"]["media_type"] == "image/gif"
+
+
+def test_fetch_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver = get_resolver(monkeypatch, [], max_bytes=10)
+
+    with pytest.raises(AdapterException, match="larger than 10 bytes"):
+        resolver.fetch_sync("https://a.b/c.png")
+    with pytest.raises(AdapterException, match="Failed to fetch"):
+        resolver.fetch_sync("https://a.b/missing.png")
+
+
+def test_media_type_from_url() -> None:
+    resolver = ImageResolver()
+    resolver._client_sync = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=PNG))
+    )
+
+    block = resolver.fetch_sync("https://a.b/c.JPG?size=large")
+    assert block["source"]["media_type"] == "image/jpeg"
+    for url in ("https://a.b/c", "https://a.b/c.php"):
+        with pytest.raises(AdapterException, match="Unknown media type"):
+            resolver.fetch_sync(url)
+
+
+class StalledHandler(BaseHTTPRequestHandler):
+    # Sends part of the body, a chunk every 0.1 second, then stalls
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("content-type", "image/png")
+        self.send_header("content-length", str(len(PNG)))
+        self.end_headers()
+        for index in range(4):
+            self.wfile.write(PNG[index : index + 1])
+            self.wfile.flush()
+            time.sleep(0.1)
+        time.sleep(2)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def stalled_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StalledHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host!s}:{port}/c.png"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_sync_deadline(stalled_url: str) -> None:
+    resolver = ImageResolver(timeout=0.5)
+
+    start = time.monotonic()
+    with pytest.raises(AdapterException, match="Timed out"):
+        resolver.fetch_sync(stalled_url)
+    # Each read is within the timeout, the fetch as a whole is not
+    assert time.monotonic() - start < 0.7
+    resolver.shutdown()
+
+
+def test_resolve_async_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[str] = []
+    resolver = get_resolver(monkeypatch, requests, concurrency=8)
+    urls = [f"https://a.b/{index}.png" for index in range(8)]
+
+    async def resolve() -> tuple[dict[str, Any], float]:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        blocks = await resolver.resolve_async(urls + urls)
+        elapsed = loop.time() - start
+        await resolver.ashutdown()
+        return blocks, elapsed
+
+    blocks, elapsed = asyncio.run(resolve())
+
+    assert list(blocks) == urls
+    assert sorted(requests) == sorted(urls)
+    # Fetched at once rather than one after the other
+    assert elapsed < 0.01 * len(urls)
+
+
+def test_anthropic_params_async(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-5-sonnet-latest"
+    )
+    assert adapter
+    adapter._set_current_model(
+        adapter.get_model().model_copy(update={"supports_vision": True})
+    )
+    resolver = get_resolver(monkeypatch, [])
+    monkeypatch.setattr(
+        "adapters.provider_adapters.anthropic_sdk_chat_provider_adapter.image_resolver",
+        resolver,
+    )
+    messages = [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "a"},
+                {"type": "image_url", "image_url": {"url": "https://a.b/c.png"}},
+            ],
+        }
+    ]
+
+    params = asyncio.run(adapter._get_params_async(messages))
+    params_sync = adapter._get_params(messages)
+
+    # Iterable params are dumped as iterators
+    content = list(next(iter(params["messages"]))["content"])
+    assert [part["type"] for part in content] == ["text", "image"]
+    assert content == list(next(iter(params_sync["messages"]))["content"])
+
+
+def test_async_clients_of_closed_loops_released(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    resolver = get_resolver(monkeypatch, [])
+
+    for _ in range(5):
+        asyncio.run(resolver.fetch_async("https://a.b/c.png"))
+
+    assert len(resolver._clients_async) == 1
+
+
+def test_shutdown_closes_async_clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    resolver = get_resolver(monkeypatch, [])
+
+    async def fetch_and_shutdown() -> bool:
+        await resolver.fetch_async("https://a.b/c.png")
+        client = resolver._get_client_async()
+        # Closed on the running loop, from sync code
+        resolver.shutdown()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return client.is_closed
+
+    assert asyncio.run(fetch_and_shutdown())
+    assert not resolver._clients_async
@@ -0,0 +1,184 @@
+import copy
+from typing import Any
+
+import pytest
+
+from adapters import AdapterFactory
+from adapters.general_utils import EMPTY_CONTENT
+from adapters.message_normalizer import MessageNormalizer
+from adapters.types import AdapterException, Model
+
+EMPTY_USER = {"role": "user", "content": EMPTY_CONTENT}
+
+
+def get_model(**flags: bool) -> Model:
+    model = AdapterFactory.get_model_by_path("openai/openai/gpt-4o")
+    assert model
+    return model.model_copy(update=flags)
+
+
+def test_noop_returns_messages() -> None:
+    messages: list[Any] = [{"role": "assistant", "content": ""}]
+    assert MessageNormalizer(get_model()).normalize(messages) is messages
+
+
+def test_empty_messages() -> None:
+    assert MessageNormalizer(get_model()).normalize([]) == [EMPTY_USER]
+
+
+def test_system_to_user() -> None:
+    messages: list[Any] = [
+        {"role": "system", "content": "a"},
+        {"role": "user", "content": "b"},
+        {"role": "system", "content": "c"},
+    ]
+
+    assert MessageNormalizer(get_model(can_system_multiple=False)).normalize(
+        list(messages)
+    ) == [messages[0], messages[1], {"role": "user", "content": "c"}]
+    assert MessageNormalizer(get_model(can_system=False)).normalize(list(messages)) == [
+        {"role": "user", "content": "a"},
+        messages[1],
+        {"role": "user", "content": "c"},
+    ]
+
+
+def test_assistant_placement() -> None:
+    normalizer = MessageNormalizer(
+        get_model(can_assistant_first=False, can_assistant_last=False)
+    )
+    messages: list[Any] = [
+        {"role": "assistant", "content": "a"},
+        {"role": "user", "content": "b"},
+        {"role": "assistant", "content": "c"},
+    ]
+
+    assert normalizer.normalize(messages) == [EMPTY_USER, *messages, EMPTY_USER]
+
+
+def test_system_last_sent_as_user() -> None:
+    # A last system message sent as user does not need a user message after it
+    normalizer = MessageNormalizer(get_model(can_system=False, can_system_last=False))
+    messages: list[Any] = [
+        {"role": "user", "content": "a"},
+        {"role": "system", "content": "b"},
+    ]
+
+    assert normalizer.normalize(messages) == [
+        messages[0],
+        {"role": "user", "content": "b"},
+    ]
+
+
+def test_repeating_roles() -> None:
+    normalizer = MessageNormalizer(
+        get_model(can_repeating_roles=False, can_system_only=False)
+    )
+    messages: list[Any] = [
+        {"role": "system", "content": "a"},
+        {"role": "user", "content": "b"},
+        {"role": "user", "content": [{"type": "text", "text": "c"}]},
+    ]
+
+    # The empty user message appended for a leading system message is joined too
+    assert normalizer.normalize(messages) == [
+        {"role": "system", "content": "a"},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "b"},
+                {"type": "text", "text": "c"},
+                {"type": "text", "text": EMPTY_CONTENT},
+            ],
+        },
+    ]
+
+
+def test_empty_content() -> None:
+    normalizer = MessageNormalizer(get_model(can_empty_content=False))
+    messages: list[Any] = [
+        {"role": "user", "content": " "},
+        {"role": "user", "content": [{"type": "text", "text": ""}]},
+    ]
+
+    assert normalizer.normalize(messages) == [
+        {"role": "user", "content": EMPTY_CONTENT},
+        {"role": "user", "content": [{"type": "text", "text": EMPTY_CONTENT}]},
+    ]
+
+
+@pytest.mark.parametrize(
+    "flag, content, error",
+    [
+        ("supports_json_content", [{"type": "text", "text": "a"}], "JSON content"),
+        (
+            "supports_vision",
+            [{"type": "image_url", "image_url": {"url": "https://a.b/c.png"}}],
+            "Vision",
+        ),
+    ],
+)
+def test_unsupported_content(flag: str, content: Any, error: str) -> None:
+    normalizer = MessageNormalizer(get_model(**{flag: False}))
+
+    with pytest.raises(AdapterException, match=error):
+        normalizer.normalize([{"role": "user", "content": content}])
+
+
+def test_compiled_once_per_model() -> None:
+    adapter = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+
+    normalizer = adapter._get_message_normalizer()  # type: ignore[attr-defined]
+    assert adapter._get_message_normalizer() is normalizer  # type: ignore[attr-defined]
+
+    adapter._set_current_model(get_model(can_system=False))  # type: ignore[attr-defined]
+    assert adapter._get_message_normalizer() is not normalizer  # type: ignore[attr-defined]
+
+
+def test_messages_not_modified() -> None:
+    normalizer = MessageNormalizer(
+        get_model(can_empty_content=False, can_repeating_roles=False, can_system=False)
+    )
+    image = {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}}
+    messages: list[Any] = [
+        {"role": "system", "content": ""},
+        {"role": "user", "content": [{"type": "text", "text": " "}, image]},
+        {"role": "user", "content": [image]},
+        {"role": "user", "content": "a"},
+    ]
+    original = copy.deepcopy(messages)
+
+    result: list[Any] = normalizer.normalize(messages)
+
+    assert messages == original
+    assert result == [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": EMPTY_CONTENT},
+                {"type": "text", "text": EMPTY_CONTENT},
+                image,
+                image,
+                {"type": "text", "text": "a"},
+            ],
+        }
+    ]
+    # Unchanged parts are shared rather than copied
+    assert result[0]["content"][2] is image
+
+    # Joins leaving the content as is still copy it, so later joins do not extend
+    # the caller's content
+    text_a = {"type": "text", "text": "a"}
+    text_b = {"type": "text", "text": "b"}
+    messages = [
+        {"role": "assistant", "content": [text_a]},
+        {"role": "assistant", "content": None, "tool_calls": []},
+        {"role": "assistant", "content": [text_b]},
+    ]
+    original = copy.deepcopy(messages)
+
+    result = MessageNormalizer(get_model(can_repeating_roles=False)).normalize(messages)
+
+    assert messages == original
+    assert result[-1]["content"] == [text_a, text_b]
@@ -0,0 +1,232 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Iterator
+
+import httpx
+import pytest
+from openai import AsyncOpenAI, OpenAI
+
+from adapters import AdapterFactory
+from adapters.usage_scanner import UsageScanner, extract_usage
+
+USAGE = {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
+BODY = json.dumps(
+    {
+        "id": "a",
+        "object": "chat.completion",
+        "created": 1,
+        "model": "gpt-4o",
+        "choices": [
+            {
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": 'The "usage" key'},
+            }
+        ],
+        "usage": USAGE,
+    }
+).encode()
+STREAM = (
+    b"".join(
+        b"data: " + json.dumps(event).encode() + b"\n\n"
+        for event in (
+            {"choices": [{"index": 0, "delta": {"content": "a"}}], "usage": None},
+            {"choices": [], "usage": USAGE},
+        )
+    )
+    + b"data: [DONE]\n\n"
+)
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if json.loads(request.content).get("stream"):
+        return httpx.Response(
+            200, content=STREAM, headers={"content-type": "text/event-stream"}
+        )
+    return httpx.Response(200, content=BODY, headers={"x-request-id": "a"})
+
+
+def get_adapter(
+    monkeypatch: pytest.MonkeyPatch,
+    handle: Callable[[httpx.Request], httpx.Response] = handler,
+) -> Any:
+    adapter = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+
+    client = OpenAI(
+        api_key="a", http_client=httpx.Client(transport=httpx.MockTransport(handle))
+    )
+    async_client = AsyncOpenAI(
+        api_key="a",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handle)),
+    )
+    monkeypatch.setattr(
+        adapter,
+        "_call_raw_sync",
+        lambda: client.chat.completions.with_streaming_response.create,
+    )
+    monkeypatch.setattr(
+        adapter,
+        "_call_raw_async",
+        lambda: async_client.chat.completions.with_streaming_response.create,
+    )
+    return adapter
+
+
+def get_cost(adapter: Any) -> float:
+    cost = adapter.get_model().cost
+    return float(cost.prompt * 10 + cost.completion * 20 + cost.request)
+
+
+def test_usage_scanner() -> None:
+    assert extract_usage(BODY) == extract_usage(STREAM)
+    assert extract_usage(b'{"usage": null}') is None
+
+    # Keys and usage objects split between chunks
+    for size in (1, 3, 7):
+        scanner = UsageScanner()
+        for index in range(0, len(STREAM), size):
+            scanner.feed(STREAM[index : index + size])
+        assert scanner.usage and scanner.usage.total_tokens == 30
+
+
+def test_usage_scanner_buffer_bounded() -> None:
+    scanner = UsageScanner()
+    # A usage value that does not end
+    scanner.feed(b'data: {"usage": {"prompt_tokens": "')
+    for _ in range(100):
+        scanner.feed(b"a" * 1000)
+        assert len(scanner._buffer) <= 5000
+
+    scanner.feed(b'"}}\n\n' + STREAM)
+    assert scanner.usage and scanner.usage.total_tokens == 30
+
+
+def test_execute_sync_raw(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = get_adapter(monkeypatch)
+
+    response = adapter.execute_sync_raw([{"role": "user", "content": "a"}])
+
+    assert response.body == BODY
+    assert response.headers["x-request-id"] == "a"
+    assert response.usage.prompt_tokens == 10
+    assert response.cost == get_cost(adapter)
+
+
+def test_execute_sync_raw_stream(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = get_adapter(monkeypatch)
+
+    stream = adapter.execute_sync_raw([{"role": "user", "content": "a"}], stream=True)
+
+    assert stream.cost is None
+    assert b"".join(stream.response) == STREAM
+    assert stream.usage.completion_tokens == 20
+    assert stream.cost == get_cost(adapter)
+
+
+def test_execute_async_raw_stream(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = get_adapter(monkeypatch)
+
+    async def consume() -> tuple[Any, bytes]:
+        response = await adapter.execute_async_raw([{"role": "user", "content": "a"}])
+        assert response.body == BODY
+
+        stream = await adapter.execute_async_raw(
+            [{"role": "user", "content": "a"}], stream=True
+        )
+        return stream, b"".join([chunk async for chunk in stream.response])
+
+    stream, body = asyncio.run(consume())
+
+    assert body == STREAM
+    assert stream.cost == get_cost(adapter)
+
+
+def test_raw_params(monkeypatch: pytest.MonkeyPatch) -> None:
+    requests: list[Any] = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return handler(request)
+
+    adapter = get_adapter(monkeypatch, record)
+    downscaled = [{"role": "user", "content": "downscaled"}]
+
+    async def downscale_images_async(messages: Any) -> Any:
+        return downscaled
+
+    # Images are downscaled as by execute_sync
+    monkeypatch.setattr(adapter, "_downscale_images_sync", lambda messages: downscaled)
+    monkeypatch.setattr(adapter, "_downscale_images_async", downscale_images_async)
+
+    b"".join(
+        adapter.execute_sync_raw(
+            [{"role": "user", "content": "a"}], stream=True
+        ).response
+    )
+    asyncio.run(adapter.execute_async_raw([{"role": "user", "content": "a"}]))
+
+    assert [request["messages"] for request in requests] == [downscaled, downscaled]
+    # Streams ask for usage
+    assert requests[0]["stream_options"] == {"include_usage": True}
+    assert "stream_options" not in requests[1]
+
+
+def test_raw_without_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    def handle(request: httpx.Request) -> httpx.Response:
+        if json.loads(request.content).get("stream"):
+            return httpx.Response(200, content=STREAM.split(b"\n\n")[0] + b"\n\n")
+        return httpx.Response(200, content=BODY.replace(b'"usage"', b'"other"'))
+
+    adapter = get_adapter(monkeypatch, handle)
+
+    response = adapter.execute_sync_raw([{"role": "user", "content": "a"}])
+    assert response.usage is None
+    assert response.cost is None
+
+    stream = adapter.execute_sync_raw([{"role": "user", "content": "a"}], stream=True)
+    assert b"".join(stream.response)
+    assert stream.usage is None
+    assert stream.cost is None
+
+
+class ClosingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self) -> None:
+        self.closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield STREAM
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield STREAM
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_raw_stream_closed_unconsumed(monkeypatch: pytest.MonkeyPatch) -> None:
+    streams: list[ClosingStream] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        streams.append(ClosingStream())
+        return httpx.Response(200, stream=streams[-1])
+
+    adapter = get_adapter(monkeypatch, handle)
+
+    with adapter.execute_sync_raw([{"role": "user", "content": "a"}], stream=True):
+        pass
+
+    async def consume() -> None:
+        stream = await adapter.execute_async_raw(
+            [{"role": "user", "content": "a"}], stream=True
+        )
+        assert not streams[-1].closed
+        await stream.aclose()
+
+    asyncio.run(consume())
+
+    # Responses are released without the streams being iterated
+    assert [stream.closed for stream in streams] == [True, True]
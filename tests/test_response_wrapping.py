@@ -0,0 +1,103 @@
+import copy
+import pickle
+from typing import Any
+
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from adapters import AdapterFactory
+from adapters.types import AdapterChatCompletion, AdapterChatCompletionChunk
+
+COMPLETION = {
+    "id": "a",
+    "object": "chat.completion",
+    "created": 1,
+    "model": "gpt-4o",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "Hello"},
+        }
+    ],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30},
+    "provider_field": "a",
+}
+
+
+def get_response() -> Any:
+    adapter = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    return adapter._extract_response(  # type: ignore[attr-defined]
+        {}, ChatCompletion.model_validate(COMPLETION)
+    )
+
+
+def test_wrap_shares_fields() -> None:
+    chunk = ChatCompletionChunk.model_validate(
+        {
+            "id": "a",
+            "object": "chat.completion.chunk",
+            "created": 1,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": {"content": "a"}}],
+        }
+    )
+
+    wrapped = AdapterChatCompletionChunk.wrap(chunk)
+
+    assert isinstance(wrapped, AdapterChatCompletionChunk)
+    assert wrapped.choices is chunk.choices
+    assert wrapped.model_dump() == {**chunk.model_dump(), "cost": None}
+
+
+def test_lazy_fields() -> None:
+    calls: list[str] = []
+
+    def get_cost() -> float:
+        calls.append("cost")
+        return 1.0
+
+    response = AdapterChatCompletion.wrap(
+        ChatCompletion.model_validate(COMPLETION), cost=get_cost
+    )
+
+    assert calls == []
+    assert response.cost == 1.0
+    assert response.cost == 1.0
+    assert calls == ["cost"]
+
+
+def test_extract_response() -> None:
+    model = AdapterFactory.get_model_by_path("openai/openai/gpt-4o")
+    assert model
+    response = get_response()
+
+    assert response.cost == (
+        model.cost.prompt * 10 + model.cost.completion * 20 + model.cost.request
+    )
+    assert response.response.content == "Hello"
+    assert response.token_counts.completion == 20
+    assert response.provider_field == "a"
+
+    dumped = get_response().model_dump()
+    assert dumped["cost"] == response.cost
+    assert dumped["response"] == {"role": "assistant", "content": "Hello"}
+    assert dumped["provider_field"] == "a"
+
+
+def test_iter_resolves_lazy_fields() -> None:
+    response = get_response()
+
+    fields = dict(response)
+    assert fields["cost"] == response.cost
+    assert fields["response"].content == "Hello"
+    assert {"cost", "response", "token_counts"} <= response.model_fields_set
+
+
+def test_lazy_fields_copied() -> None:
+    response = get_response()
+
+    assert copy.copy(response).cost == response.cost
+    assert copy.deepcopy(response) == response
+    assert pickle.loads(pickle.dumps(get_response())) == response
+    assert "cost=" in repr(get_response())
@@ -0,0 +1,233 @@
+import asyncio
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import pytest
+from openai.types.chat import ChatCompletionChunk
+
+from adapters import AdapterFactory
+from adapters.chunk_template import ChunkTemplate
+from adapters.stream_coalescing import ChunkCoalescer, StreamCoalescing
+from adapters.types import AdapterChatCompletionChunk
+
+template = ChunkTemplate(id="a", created=1, model="b")
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_contents(chunks: list[AdapterChatCompletionChunk]) -> list[Any]:
+    return [
+        (chunk.choices[0].delta.content, chunk.choices[0].finish_reason)
+        for chunk in chunks
+    ]
+
+
+def test_coalesce_by_window() -> None:
+    clock = Clock()
+    coalescer = ChunkCoalescer(StreamCoalescing(window=0.02), clock=clock)
+
+    # The first chunk is sent right away, the next ones within the window are held
+    assert get_contents(coalescer.add(template.create("a"))) == [("a", None)]
+    clock.now = 0.01
+    assert coalescer.add(template.create("b")) == []
+    assert coalescer.add(template.create("c")) == []
+    clock.now = 0.03
+    assert get_contents(coalescer.add(template.create("d"))) == [("bcd", None)]
+    assert coalescer.merged_chunks == 2
+
+    clock.now = 0.04
+    assert coalescer.add(template.create("e")) == []
+    assert get_contents(coalescer.add(template.create(finish_reason="stop"))) == [
+        ("e", None),
+        ("", "stop"),
+    ]
+    assert coalescer.flush() == []
+
+
+def test_flush_due() -> None:
+    clock = Clock()
+    coalescer = ChunkCoalescer(StreamCoalescing(window=0.02), clock=clock)
+
+    assert coalescer.get_flush_delay() is None
+    coalescer.add(template.create("a"))
+    clock.now = 0.01
+    assert coalescer.add(template.create("b")) == []
+    assert coalescer.get_flush_delay() == pytest.approx(0.01)
+    assert coalescer.flush_due() == []
+
+    clock.now = 0.02
+    assert get_contents(coalescer.flush_due()) == [("b", None)]
+    assert coalescer.get_flush_delay() is None
+    # The window restarts from the flush
+    clock.now = 0.03
+    assert coalescer.add(template.create("c")) == []
+
+
+def test_coalesce_by_bytes() -> None:
+    coalescer = ChunkCoalescer(StreamCoalescing(window=None, max_bytes=4))
+
+    assert coalescer.add(template.create("ab")) == []
+    assert get_contents(coalescer.add(template.create("cd"))) == [("abcd", None)]
+    assert coalescer.add(template.create("e")) == []
+    assert get_contents(coalescer.flush()) == [("e", None)]
+    assert coalescer.merged_chunks == 1
+
+
+def test_tool_calls_not_merged() -> None:
+    coalescer = ChunkCoalescer(StreamCoalescing(window=None, max_bytes=100))
+    tool_call = AdapterChatCompletionChunk.model_validate(
+        {
+            "id": "a",
+            "object": "chat.completion.chunk",
+            "created": 1,
+            "model": "b",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {
+                        "tool_calls": [
+                            {"index": 0, "function": {"name": "f", "arguments": ""}}
+                        ]
+                    },
+                }
+            ],
+        }
+    )
+
+    assert coalescer.add(template.create("a")) == []
+    assert coalescer.add(template.create("b")) == []
+    chunks = coalescer.add(tool_call)
+    assert get_contents(chunks) == [("ab", None), (None, None)]
+    assert chunks[1] is tool_call
+
+
+class Stream:
+    def __init__(self, chunks: list[ChatCompletionChunk]) -> None:
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        return iter(self._chunks)
+
+    def close(self) -> None:
+        pass
+
+
+def get_chunk(content: Optional[str], finish_reason: Optional[str] = None) -> Any:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "a",
+            "object": "chat.completion.chunk",
+            "created": 1,
+            "model": "gpt-4o",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+        }
+    )
+
+
+def test_execute_sync_coalesce(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    chunks = [get_chunk(content) for content in "abcde"] + [get_chunk(None, "stop")]
+    monkeypatch.setattr(adapter, "_call_sync", lambda: lambda **_: Stream(chunks))
+
+    stream = adapter.execute_sync(
+        [{"role": "user", "content": "a"}],
+        stream=True,
+        coalesce=StreamCoalescing(window=None, max_bytes=2),
+    )
+
+    assert get_contents(list(stream.response)) == [
+        ("ab", None),
+        ("cd", None),
+        ("e", None),
+        (None, "stop"),
+    ]
+    assert stream.merged_chunks == 2
+
+
+class StalledStream:
+    """Sends its chunks, stalling before the chunk at stall_index"""
+
+    def __init__(self, chunks: list[ChatCompletionChunk], stall_index: int) -> None:
+        self._chunks = chunks
+        self._stall_index = stall_index
+        self.resume = asyncio.Event()
+
+    async def __aiter__(self) -> AsyncIterator[ChatCompletionChunk]:
+        for index, chunk in enumerate(self._chunks):
+            if index == self._stall_index:
+                await self.resume.wait()
+            yield chunk
+
+    async def close(self) -> None:
+        pass
+
+
+def test_execute_async_coalesce_stalled(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    chunks = [get_chunk(content) for content in "abc"] + [get_chunk(None, "stop")]
+    stalled = StalledStream(chunks, stall_index=3)
+
+    async def call(**_: Any) -> StalledStream:
+        return stalled
+
+    monkeypatch.setattr(adapter, "_call_async", lambda: call)
+
+    async def consume() -> list[Any]:
+        stream = await adapter.execute_async(
+            [{"role": "user", "content": "a"}],
+            stream=True,
+            coalesce=StreamCoalescing(window=0.05),
+        )
+        received = [await stream.response.__anext__()]
+        # Held back content is sent once the window passes, though the stream
+        # stalls
+        received.append(await asyncio.wait_for(stream.response.__anext__(), timeout=1))
+        stalled.resume.set()
+        received.extend([chunk async for chunk in stream.response])
+        return received
+
+    assert get_contents(asyncio.run(consume())) == [
+        ("a", None),
+        ("bc", None),
+        (None, "stop"),
+    ]
+
+
+def test_execute_async_coalesce_closed_while_stalled(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    stalled = StalledStream([get_chunk(content) for content in "abc"], stall_index=2)
+
+    async def call(**_: Any) -> StalledStream:
+        return stalled
+
+    monkeypatch.setattr(adapter, "_call_async", lambda: call)
+
+    async def consume() -> set[Any]:
+        stream = await adapter.execute_async(
+            [{"role": "user", "content": "a"}],
+            stream=True,
+            coalesce=StreamCoalescing(window=0.01),
+        )
+        await stream.response.__anext__()
+        await stream.response.__anext__()
+        await stream.response.aclose()
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    # The wait for the next chunk is cancelled with the stream
+    assert asyncio.run(consume()) == set()
@@ -0,0 +1,176 @@
+from typing import Any, Iterator
+
+import pytest
+from cohere import (
+    ChatMessageEndEventDelta,
+    MessageEndStreamedChatResponseV2,
+    Usage,
+    UsageBilledUnits,
+)
+from openai.types.chat import ChatCompletionChunk
+
+from adapters import AdapterFactory
+from tests.test_drop_empty_chunks import ANTHROPIC_EVENTS, COHERE_EVENTS
+
+
+def get_cost(adapter: Any, prompt_tokens: int, completion_tokens: int) -> float:
+    cost = adapter.get_model().cost
+    return float(
+        cost.prompt * prompt_tokens + cost.completion * completion_tokens + cost.request
+    )
+
+
+def test_anthropic_stream_usage() -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(
+        "anthropic/anthropic/claude-3-5-sonnet-latest"
+    )
+    assert adapter
+    state: dict[str, Any] = {}
+
+    chunks = [
+        adapter._extract_stream_response(None, event, state)
+        for event in ANTHROPIC_EVENTS
+    ]
+
+    # Usage is on the message_stop chunk, the last one
+    final = chunks[-1]
+    assert chunks[-2].choices[0].finish_reason == "stop"
+    assert final.usage.prompt_tokens == 1
+    assert final.usage.completion_tokens == 1
+    assert final.cost == get_cost(adapter, 1, 1)
+    assert [chunk.usage for chunk in chunks[:-1]] == [None] * 5
+
+    # Without the empty message_stop chunk, the stop reason chunk is the last one
+    state = {"drop_empty_chunks": True}
+    chunks = [
+        adapter._extract_stream_response(None, event, state)
+        for event in ANTHROPIC_EVENTS
+    ]
+    assert chunks[-1] is None
+    assert chunks[-2].choices[0].finish_reason == "stop"
+    assert chunks[-2].cost == get_cost(adapter, 1, 1)
+
+
+def test_cohere_stream_usage() -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("cohere/cohere/command-r-plus")
+    assert adapter
+    state: dict[str, Any] = {}
+    events = [
+        *COHERE_EVENTS[:-1],
+        MessageEndStreamedChatResponseV2(
+            type="message-end",
+            delta=ChatMessageEndEventDelta(
+                finish_reason="COMPLETE",
+                usage=Usage(
+                    billed_units=UsageBilledUnits(input_tokens=3, output_tokens=4)
+                ),
+            ),
+        ),
+    ]
+
+    chunks = [adapter._extract_stream_response(None, event, state) for event in events]
+
+    assert chunks[-1].usage.total_tokens == 7
+    assert chunks[-1].cost == get_cost(adapter, 3, 4)
+
+
+class Stream:
+    def __init__(self, chunks: list[ChatCompletionChunk]) -> None:
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[ChatCompletionChunk]:
+        return iter(self._chunks)
+
+    def close(self) -> None:
+        pass
+
+
+def get_chunk(choices: list[Any], **fields: Any) -> Any:
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "a",
+            "object": "chat.completion.chunk",
+            "created": 1,
+            "model": "a",
+            "choices": choices,
+            **fields,
+        }
+    )
+
+
+USAGE = {"prompt_tokens": 5, "completion_tokens": 6, "total_tokens": 11}
+CHOICE = {"index": 0, "delta": {"content": "Hi"}}
+
+
+def test_openai_stream_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path("openai/openai/gpt-4o")
+    assert adapter
+    requests: list[dict[str, Any]] = []
+
+    def create(**params: Any) -> Stream:
+        requests.append(params)
+        return Stream([get_chunk([CHOICE]), get_chunk([], usage=USAGE)])
+
+    monkeypatch.setattr(adapter, "_call_sync", lambda: create)
+
+    stream = adapter.execute_sync([{"role": "user", "content": "a"}], stream=True)
+    chunks = list(stream.response)
+
+    assert requests[0]["extra_body"]["stream_options"] == {"include_usage": True}
+    assert chunks[0].usage is None and chunks[0].cost is None
+    assert chunks[1].usage.total_tokens == 11
+    assert chunks[1].cost == get_cost(adapter, 5, 6)
+    assert chunks[1].model_dump()["cost"] == chunks[1].cost
+
+
+@pytest.mark.parametrize(
+    "model_path, stream_options",
+    [
+        # Asked for usage
+        ("deepinfra/meta-llama/Meta-Llama-3.1-405B-Instruct", {"include_usage": True}),
+        # Reports usage on its last chunk unasked
+        ("together/meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo", None),
+    ],
+)
+def test_compatible_stream_usage(
+    monkeypatch: pytest.MonkeyPatch, model_path: str, stream_options: Any
+) -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(model_path)
+    assert adapter
+    requests: list[dict[str, Any]] = []
+
+    def create(**params: Any) -> Stream:
+        requests.append(params)
+        return Stream(
+            [
+                get_chunk([CHOICE]),
+                get_chunk([{**CHOICE, "finish_reason": "stop"}], usage=USAGE),
+            ]
+        )
+
+    monkeypatch.setattr(adapter, "_call_sync", lambda: create)
+
+    stream = adapter.execute_sync([{"role": "user", "content": "a"}], stream=True)
+    chunks = list(stream.response)
+
+    assert requests[0]["extra_body"].get("stream_options") == stream_options
+    assert chunks[-1].cost == get_cost(adapter, 5, 6)
+
+
+def test_groq_stream_usage() -> None:
+    adapter: Any = AdapterFactory.get_adapter_by_path(
+        "groq/meta-llama/llama-3.1-70b-versatile"
+    )
+    assert adapter
+
+    chunk = adapter._extract_stream_response(
+        None,
+        get_chunk(
+            [{**CHOICE, "finish_reason": "stop"}],
+            x_groq={"id": "a", "usage": {**USAGE, "queue_time": 0.1}},
+        ),
+        {},
+    )
+
+    assert chunk.usage.completion_tokens == 6
+    assert chunk.cost == get_cost(adapter, 5, 6)
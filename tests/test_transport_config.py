@@ -0,0 +1,152 @@
+from typing import Any
+
+from cohere.core.http_client import HttpClient
+import httpx
+from httpx import Timeout
+import pytest
+
+from adapters import AdapterFactory
+from adapters.transport_config import (
+    TransportConfig,
+    TransportConfigRegistry,
+    is_http2_enabled,
+    transport_configs,
+)
+
+
+def test_is_http2_enabled() -> None:
+    assert not is_http2_enabled("openai", "")
+    assert not is_http2_enabled("openai", "0")
+    assert is_http2_enabled("openai", "1")
+    assert is_http2_enabled("openai", "true")
+    assert is_http2_enabled("openai", "anthropic, OpenAI")
+    assert not is_http2_enabled("cohere", "anthropic,openai")
+
+
+def test_get_timeout() -> None:
+    config = TransportConfig(
+        connect_timeout=1,
+        read_timeout=30,
+        write_timeout=5,
+        pool_timeout=2,
+        stream_idle_timeout=10,
+    )
+
+    assert config.get_timeout() == Timeout(connect=1, read=30, write=5, pool=2)
+    assert config.get_timeout(stream=True) == Timeout(
+        connect=1, read=10, write=5, pool=2
+    )
+    # Streams fall back to the read timeout
+    assert TransportConfig(read_timeout=30).get_timeout(stream=True).read == 30
+
+
+def test_stream_idle_timeout_bounds_first_chunk() -> None:
+    # httpx has a single read timeout per request, so the idle timeout of a stream
+    # also bounds the wait for its first chunk
+    registry = TransportConfigRegistry(
+        {
+            "openai": {"stream_idle_timeout": 20},
+            "openai/openai/o1-mini": {"stream_idle_timeout": 1200},
+        }
+    )
+
+    timeout = registry.get_config("openai", "openai/openai/gpt-4o").get_timeout(True)
+    assert timeout.read == 20
+
+    # Models slow to send their first chunk need a model override
+    o1_config = registry.get_config("openai", "openai/openai/o1-mini")
+    assert o1_config.get_timeout(stream=True).read == 1200
+
+
+def test_registry_precedence() -> None:
+    registry = TransportConfigRegistry(
+        {
+            "openai": {"max_connections": 10, "read_timeout": 30},
+            "openai/openai/gpt-4o": {"read_timeout": 90},
+        }
+    )
+
+    provider_config = registry.get_config("openai")
+    assert provider_config.max_connections == 10
+    assert provider_config.read_timeout == 30
+
+    model_config = registry.get_config("openai", "openai/openai/gpt-4o")
+    assert model_config.max_connections == 10
+    assert model_config.read_timeout == 90
+
+    assert registry.get_config("anthropic") == TransportConfig()
+
+
+def test_registry_defaults() -> None:
+    # Nothing is tuned by default, overrides only come from the caller
+    registry = TransportConfigRegistry()
+    for provider, model_path in [
+        ("groq", "groq/meta-llama/llama3-8b-8192"),
+        ("openai", "openai/openai/o1-mini"),
+    ]:
+        assert registry.get_config(provider) == TransportConfig()
+        assert registry.get_config(provider, model_path) == TransportConfig()
+
+
+def test_registry_set_config() -> None:
+    registry = TransportConfigRegistry()
+    assert registry.get_config("openai").max_connections != 5
+
+    registry.set_config("openai", max_connections=5)
+    assert registry.get_config("openai").max_connections == 5
+
+    with pytest.raises(ValueError):
+        registry.set_config("openai", max_connections="many")
+
+
+@pytest.mark.parametrize(
+    "model_path, expected_key",
+    [
+        ("openai/openai/o1-mini", "timeout"),
+        ("groq/meta-llama/llama3-8b-8192", "timeout"),
+        ("cohere/cohere/command-r", "request_options"),
+    ],
+)
+def test_adapter_timeout_params(model_path: str, expected_key: str) -> None:
+    adapter = AdapterFactory.get_adapter_by_path(model_path)
+    assert adapter
+
+    provider = adapter._get_provider_name()  # type: ignore[attr-defined]
+    config = transport_configs.get_config(provider, model_path)
+    params: dict[str, Any] = adapter._get_timeout_params(  # type: ignore[attr-defined]
+        stream=True
+    )
+
+    if expected_key == "timeout":
+        assert params == {"timeout": config.get_timeout(stream=True)}
+    else:
+        assert params == {
+            "request_options": {"timeout_in_seconds": config.get_timeout(stream=True)}
+        }
+
+
+def test_cohere_timeout_forwarded() -> None:
+    # The Cohere SDK hands timeout_in_seconds to httpx as is, so every timeout of
+    # the config reaches the request
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200, json={})
+
+    config = TransportConfig(
+        connect_timeout=1, read_timeout=30, write_timeout=5, pool_timeout=2
+    )
+    client = HttpClient(
+        httpx_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        base_timeout=config.read_timeout,
+        base_headers={},
+        base_url="http://cohere.test",
+    )
+    client.request(
+        "v2/chat",
+        method="POST",
+        request_options={"timeout_in_seconds": config.get_timeout()},  # type: ignore[typeddict-item]
+    )
+
+    assert timeouts == [{"connect": 1, "read": 30, "write": 5, "pool": 2}]
@@ -0,0 +1,165 @@
+import asyncio
+import gc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import subprocess
+import sys
+import threading
+from typing import Any, Iterator
+import weakref
+
+from httpx import AsyncHTTPTransport, Client, MockTransport, Request, Response
+import pytest
+
+from adapters import AdapterFactory
+from adapters.transport_config import TransportConfig
+from adapters.transport_pool import (
+    SharedTransport,
+    TransportPool,
+    get_origin,
+    transport_pool,
+)
+
+
+def test_get_origin() -> None:
+    assert get_origin("https://api.openai.com/v1") == ("https", "api.openai.com", 443)
+    assert get_origin("http://localhost:8080/api") == ("http", "localhost", 8080)
+
+
+def test_transport_shared_across_api_keys() -> None:
+    model_path = "openai/openai/gpt-4o"
+    adapter_1 = AdapterFactory.get_adapter_by_path(model_path, api_key="key-1")
+    adapter_2 = AdapterFactory.get_adapter_by_path(model_path, api_key="key-2")
+    assert adapter_1 and adapter_2
+
+    http_client_1 = adapter_1._client_sync._client  # type: ignore[attr-defined]
+    http_client_2 = adapter_2._client_sync._client  # type: ignore[attr-defined]
+    assert http_client_1 is not http_client_2
+    assert http_client_1._transport._transport is http_client_2._transport._transport
+    assert http_client_1._transport._transport is transport_pool.get_transport_sync(
+        "https://api.openai.com/v1"
+    )
+
+
+def test_shared_transport_close() -> None:
+    requests: list[Request] = []
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+        return Response(200)
+
+    shared = MockTransport(handler)
+
+    with Client(transport=SharedTransport(shared)) as client:
+        client.get("https://example.com", headers={"Authorization": "Bearer 1"})
+
+    # Closing the client leaves the shared transport usable
+    with Client(transport=SharedTransport(shared)) as client:
+        client.get("https://example.com", headers={"Authorization": "Bearer 2"})
+
+    assert [request.headers["Authorization"] for request in requests] == [
+        "Bearer 1",
+        "Bearer 2",
+    ]
+
+
+def test_http2_transport_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Without the h2 package, HTTP/1.1 transports are used
+    monkeypatch.setitem(sys.modules, "h2", None)
+    pool = TransportPool()
+
+    config = TransportConfig(http2=True)
+    # The warning points to the extra installing h2
+    with pytest.warns(RuntimeWarning, match=r"martian-adapters\[http2\]"):
+        transport = pool.get_transport_sync("https://api.openai.com/v1", config)
+    assert not transport._pool._http2
+    assert transport is pool.get_transport_sync("https://api.openai.com/v1", config)
+    assert transport is not pool.get_transport_sync("https://api.openai.com/v1")
+    with pytest.warns(RuntimeWarning, match=r"martian-adapters\[http2\]"):
+        transport_async = pool.get_transport_async("https://api.openai.com/v1", config)
+    assert not transport_async._pool._http2
+
+
+def test_h2_not_required_on_import() -> None:
+    code = (
+        "import sys\n"
+        "sys.modules['h2'] = None\n"
+        "import adapters\n"
+        "from adapters.transport_config import TransportConfig\n"
+        "from adapters.transport_pool import TransportPool\n"
+        "config = TransportConfig(http2=True)\n"
+        "assert TransportPool().get_transport_sync('https://a.b', config)\n"
+        "assert sys.modules['h2'] is None\n"
+    )
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_transports_per_pool_settings() -> None:
+    pool = TransportPool()
+    url = "https://api.openai.com/v1"
+
+    transport = pool.get_transport_sync(url, TransportConfig(max_connections=10))
+    # Timeouts are set per request, they share the pool
+    assert transport is pool.get_transport_sync(
+        url, TransportConfig(max_connections=10, read_timeout=1)
+    )
+    assert transport is not pool.get_transport_sync(
+        url, TransportConfig(max_connections=20)
+    )
+
+
+def test_async_transports_per_loop() -> None:
+    pool = TransportPool()
+
+    async def get_transport() -> AsyncHTTPTransport:
+        transport = pool.get_transport_async("https://api.openai.com/v1")
+        assert transport is pool.get_transport_async("https://api.openai.com/v1")
+        return transport
+
+    assert asyncio.run(get_transport()) is not asyncio.run(get_transport())
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("content-length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def local_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_transports_of_closed_loops_released(local_url: str) -> None:
+    pool = TransportPool()
+    loops: list[weakref.ref[asyncio.AbstractEventLoop]] = []
+
+    async def request() -> None:
+        loops.append(weakref.ref(asyncio.get_running_loop()))
+        async with pool.create_http_client_async(local_url) as client:
+            assert (await client.get(local_url)).status_code == 200
+
+    for _ in range(5):
+        asyncio.run(request())
+
+    # Keep-alive connections reference their loop, which is closed but not collected
+    assert len(pool._transports_async) == 1
+    gc.collect()
+    assert sum(loop() is not None for loop in loops) <= 1
+
+    asyncio.run(request())
+    assert len(pool._transports_async) == 1
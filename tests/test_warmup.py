@@ -0,0 +1,74 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from typing import Generator
+
+import pytest
+
+from adapters import AdapterFactory
+
+
+class CountingServer(ThreadingHTTPServer):
+    connections = 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: CountingServer
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_HEAD(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture(name="server")
+def fixture_server(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Generator[CountingServer, None, None]:
+    server = CountingServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(
+        "adapters.abstract_adapters.sdk_chat_adapter.OVERRIDE_ALL_BASE_URLS",
+        f"http://127.0.0.1:{server.server_address[1]}/v1",
+    )
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_warmup(server: CountingServer) -> None:
+    durations = AdapterFactory.warmup(
+        ["openai/openai/gpt-4o", "anthropic/anthropic/claude-3-haiku-20240307"],
+        connections_per_host=3,
+    )
+
+    # Both models resolve to the same overridden host
+    assert list(durations) == ["127.0.0.1"]
+    assert durations["127.0.0.1"] > 0
+    assert server.connections == 3
+
+
+def test_warmup_async(server: CountingServer) -> None:
+    durations = asyncio.run(
+        AdapterFactory.warmup_async(["openai/openai/gpt-4o"], connections_per_host=4)
+    )
+
+    assert list(durations) == ["127.0.0.1"]
+    assert server.connections == 4
+
+
+def test_warmup_unknown_model() -> None:
+    with pytest.raises(ValueError):
+        AdapterFactory.warmup(["unknown/unknown/model"])